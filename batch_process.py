@@ -1,15 +1,21 @@
 import pandas as pd
 from tqdm import tqdm
-import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
 import numpy as np
 
 # Impor modul dan fungsi yang sudah ada dari proyek Anda
 from src.retriever import SemanticRetriever
-from src.utils import generate_translation_prompt
-from src.llm_handler import send_prompt_to_llm
-from src.evaluation_metrics import calculate_bleu, calculate_ter, calculate_chrf, calculate_meteor
+from src.utils import build_translation_prompt, build_batch_translation_prompt, parse_numbered_translations, estimate_tokens
+from src.llm_handler import get_default_client
+from src.http_client import LLMError, LLMHTTPError
+from src.rate_limiter import AdaptiveRateLimiter
+from src.result_writer import StreamingResultWriter, ERROR_TRANSLATION
+from src.evaluation_metrics import get_default_evaluator
+from src.telemetry import telemetry, format_snapshot
+from score_results import score_result_file
 import config
 
 # --- KONFIGURASI ---
@@ -20,11 +26,305 @@ TEST_DATA_PATH = 'dataset/test.csv'
 OUTPUT_DIR = 'results'
 RESULT_CSV_PATH = os.path.join(OUTPUT_DIR, 'result.csv')
 EVALUATION_SUMMARY_PATH = os.path.join(OUTPUT_DIR, 'total_evaluation.txt')
+CHECKPOINT_PATH = os.path.join(OUTPUT_DIR, 'checkpoint.json')
+TELEMETRY_PATH = os.path.join(OUTPUT_DIR, 'telemetry.json')
+
+# Lanjutkan dari hasil yang sudah ada di RESULT_CSV_PATH (False = mulai dari baris 0)
+RESUME = True
 
 # Pengaturan untuk penanganan API
-MAX_RETRIES = 3  # Jumlah maksimum percobaan ulang jika API gagal
-RETRY_DELAY_SECONDS = 5  # Waktu tunggu (detik) sebelum mencoba lagi
-REQUEST_DELAY_SECONDS = 1  # Jeda antar permintaan untuk menghindari rate limiting
+# Laju permintaan dan backoff diatur oleh AdaptiveRateLimiter (lihat config.LLM_*)
+MAX_RETRIES = 5  # Jumlah maksimum percobaan jika API gagal
+
+# Hitung skor per baris di dalam loop penerjemahan. Jika False, skor dihitung
+# sekali di akhir run oleh score_results (paralel di semua core).
+SCORE_INLINE = True
+
+# Jumlah maksimum permintaan LLM yang berjalan bersamaan
+MAX_CONCURRENT_REQUESTS = 8
+
+# Jumlah kalimat uji yang dicari sekaligus oleh retriever (satu panggilan encoder per batch)
+RETRIEVAL_BATCH_SIZE = 64
+
+# Jumlah kalimat pendek yang digabung dalam satu prompt bernomor (1 = satu permintaan per baris).
+# Hanya kalimat dengan paling banyak PACK_MAX_QUERY_WORDS kata yang digabung; jawaban yang
+# gagal diurai diterjemahkan ulang satu per satu.
+SENTENCES_PER_REQUEST = 1
+PACK_MAX_QUERY_WORDS = 30
+
+def evaluate_row(index, query_pengguna, kunci_jawaban, terjemahan, prompt_tokens=None):
+    """Menghitung skor evaluasi untuk satu baris (jika SCORE_INLINE) dan menyusun baris hasil."""
+    row = {
+        'row_index': index,
+        'indonesia': query_pengguna,
+        'minang_ground_truth': kunci_jawaban,
+        'hasil_terjemahan': terjemahan,
+        'prompt_tokens': prompt_tokens
+    }
+    if SCORE_INLINE:
+        row.update(get_default_evaluator().score_pair(kunci_jawaban, terjemahan))
+    return row
+
+
+def create_rate_limiter():
+    """Membuat penjadwal laju permintaan yang dibagi oleh semua worker dalam satu run."""
+    return AdaptiveRateLimiter(
+        requests_per_second=config.LLM_INITIAL_RPS,
+        max_requests_per_second=config.LLM_MAX_RPS,
+        tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+        backoff_base_seconds=config.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=config.LLM_BACKOFF_MAX_SECONDS
+    )
+
+
+async def request_translation(label, prompt_final, estimated_tokens, client, rate_limiter, semaphore, executor):
+    """
+    Mengirim satu prompt ke LLM dengan retry.
+
+    Jumlah permintaan yang berjalan bersamaan dibatasi oleh `semaphore`, laju
+    permintaan oleh `rate_limiter`; panggilan HTTP yang blocking dijalankan di
+    `executor`.
+
+    Returns:
+        str | None: Isi jawaban LLM, atau None jika semua percobaan gagal.
+    """
+    loop = asyncio.get_running_loop()
+
+    # Prompt yang sudah pernah dijawab diambil dari cache tanpa memakai kuota API
+    cached = await loop.run_in_executor(executor, client.get_cached, prompt_final)
+    if cached is not None and cached["content"].strip():
+        return cached["content"]
+
+    with telemetry.timer("llm.request_with_retries"):
+        content = await _request_with_retries(label, prompt_final, estimated_tokens,
+                                              client, rate_limiter, semaphore, executor)
+    if content is None:
+        telemetry.incr("llm.failed_requests")
+    return content
+
+
+async def _request_with_retries(label, prompt_final, estimated_tokens, client, rate_limiter, semaphore, executor):
+    loop = asyncio.get_running_loop()
+    async with semaphore:
+        for attempt in range(MAX_RETRIES):
+            with telemetry.timer("llm.rate_limit_wait"):
+                ticket = await rate_limiter.acquire(estimated_tokens)
+            try:
+                # Langkah C: Kirim ke LLM
+                response = await loop.run_in_executor(executor, client.fetch, prompt_final)
+                rate_limiter.record_success(estimated_tokens, response["usage"].get("total_tokens"))
+
+                if response["content"].strip():
+                    return response["content"]
+                telemetry.incr("llm.empty_responses")
+                print(f"\nPercobaan {attempt + 1} gagal untuk {label}: Menerima respons kosong dari LLM.")
+
+            except LLMHTTPError as e:
+                if e.is_rate_limited:
+                    telemetry.incr("llm.rate_limited")
+                    rate_limiter.record_rate_limited(e.retry_after, attempt, ticket)
+                elif not e.is_retryable:
+                    print(f"\nError pada {label} tidak dapat dicoba ulang: {e}")
+                    break
+                print(f"\nError pada {label}, percobaan {attempt + 1}/{MAX_RETRIES}: {e}")
+            except LLMError as e:
+                print(f"\nError pada {label}, percobaan {attempt + 1}/{MAX_RETRIES}: {e}")
+            except Exception as e:
+                telemetry.incr("llm.unexpected_errors")
+                print(f"\nError tak terduga pada {label}, percobaan {attempt + 1}/{MAX_RETRIES}: {e!r}")
+
+            # Tunggu (backoff eksponensial dengan jitter) sebelum mencoba lagi
+            if attempt < MAX_RETRIES - 1:
+                rate_limiter.record_retry()
+                telemetry.incr("llm.retries")
+                await asyncio.sleep(rate_limiter.backoff_delay(attempt))
+
+    # Jika semua percobaan gagal, catat sebagai error
+    print(f"Gagal memproses {label} setelah {MAX_RETRIES} percobaan.")
+    return None
+
+
+def _prompt_items(hasil_pencarian):
+    return [
+        {"original_query_word": kata_query, **data_hasil}
+        for kata_query, data_hasil in hasil_pencarian.items()
+    ]
+
+
+async def translate_row(index, query_pengguna, hasil_pencarian, client, rate_limiter, semaphore, executor):
+    """
+    Membuat prompt untuk satu baris dan mengirimkannya ke LLM dengan retry.
+
+    Returns:
+        tuple: (hasil terjemahan, perkiraan token prompt)
+    """
+    # Langkah B: Buat prompt
+    prompt_final, prompt_stats = build_translation_prompt(
+        query_pengguna, _prompt_items(hasil_pencarian),
+        max_tokens=config.PROMPT_TOKEN_BUDGET, max_example_words=config.PROMPT_MAX_EXAMPLE_WORDS
+    )
+    prompt_tokens = prompt_stats["prompt_tokens"]
+    # Perkiraan token: prompt ditambah jawaban yang kira-kira sepanjang kalimat sumber
+    estimated_tokens = prompt_tokens + 2 * estimate_tokens(query_pengguna)
+
+    terjemahan = await request_translation(f"baris {index}", prompt_final, estimated_tokens,
+                                           client, rate_limiter, semaphore, executor)
+    return (terjemahan if terjemahan is not None else ERROR_TRANSLATION), prompt_tokens
+
+
+async def translate_group(rows, client, rate_limiter, semaphore, executor):
+    """
+    Menerjemahkan beberapa baris dengan satu prompt bernomor.
+
+    Konteks retrieval semua baris digabung (contoh yang sama hanya dikirim
+    sekali), jawaban diurai kembali per nomor, dan baris yang jawabannya
+    tidak dapat diurai diterjemahkan ulang satu per satu.
+
+    Args:
+        rows (list): Daftar (index, kalimat, hasil_pencarian).
+
+    Returns:
+        list: (hasil terjemahan, perkiraan token prompt) per baris, sesuai urutan `rows`.
+            Token prompt gabungan dibagi rata ke setiap baris.
+    """
+    if len(rows) == 1:
+        return [await translate_row(*rows[0], client, rate_limiter, semaphore, executor)]
+
+    queries = [query_pengguna for _, query_pengguna, _ in rows]
+    prompt_final, prompt_stats = build_batch_translation_prompt(
+        queries, [_prompt_items(hasil_pencarian) for _, _, hasil_pencarian in rows],
+        max_tokens=config.BATCH_PROMPT_TOKEN_BUDGET, max_example_words=config.PROMPT_MAX_EXAMPLE_WORDS
+    )
+    shared_tokens = -(-prompt_stats["prompt_tokens"] // len(rows))
+    estimated_tokens = prompt_stats["prompt_tokens"] + sum(2 * estimate_tokens(query) for query in queries)
+
+    label = f"baris {rows[0][0]}-{rows[-1][0]}"
+    jawaban = await request_translation(label, prompt_final, estimated_tokens,
+                                        client, rate_limiter, semaphore, executor)
+    terjemahan_list = parse_numbered_translations(jawaban, len(rows)) if jawaban is not None else [None] * len(rows)
+
+    # Cadangan: baris yang gagal diurai diterjemahkan sendiri, dikirim bersamaan
+    # (tetap dibatasi semaphore dan penjadwal laju)
+    failed = [i for i, terjemahan in enumerate(terjemahan_list) if terjemahan is None]
+    telemetry.incr("batch.parse_fallbacks", len(failed))
+    fallbacks = await asyncio.gather(*(
+        translate_row(*rows[i], client, rate_limiter, semaphore, executor) for i in failed
+    ))
+
+    results = [(terjemahan, shared_tokens) for terjemahan in terjemahan_list]
+    for i, (terjemahan, prompt_tokens) in zip(failed, fallbacks):
+        results[i] = (terjemahan, shared_tokens + prompt_tokens)
+    return results
+
+
+def group_rows(rows, sentences_per_request=None, max_query_words=None):
+    """
+    Mengelompokkan baris untuk permintaan bernomor: kalimat pendek digabung
+    hingga `sentences_per_request` per kelompok, kalimat panjang dikirim sendiri.
+    """
+    sentences_per_request = sentences_per_request or SENTENCES_PER_REQUEST
+    max_query_words = max_query_words or PACK_MAX_QUERY_WORDS
+    groups = []
+    packed = []
+    for row in rows:
+        if sentences_per_request <= 1 or len(str(row[1]).split()) > max_query_words:
+            groups.append([row])
+            continue
+        packed.append(row)
+        if len(packed) == sentences_per_request:
+            groups.append(packed)
+            packed = []
+    if packed:
+        groups.append(packed)
+    return groups
+
+
+async def run_translation_pipeline(df_test, retriever, client, rate_limiter, writer):
+    """
+    Pipeline asinkron: retrieval berjalan per batch mendahului tahap jaringan,
+    paling banyak MAX_CONCURRENT_REQUESTS permintaan LLM berjalan bersamaan
+    di bawah satu penjadwal laju bersama, dan setiap hasil dievaluasi (di
+    thread executor, bukan di event loop) serta ditulis segera setelah selesai.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+    # Satu thread penilaian: evaluator bersama (NLTK/sacrebleu) tidak dirancang untuk
+    # dipakai beberapa thread sekaligus, dan penilaian sebelumnya juga berurutan
+    score_executor = ThreadPoolExecutor(max_workers=1)
+    pending = {}
+    # Batasi jumlah baris yang sudah di-retrieve tetapi belum selesai diterjemahkan
+    max_pending = MAX_CONCURRENT_REQUESTS * max(SENTENCES_PER_REQUEST, 1) + 2 * RETRIEVAL_BATCH_SIZE
+    progress = tqdm(total=df_test.shape[0], desc="Menerjemahkan")
+
+    def evaluate_group(group, results):
+        # Dengan SCORE_INLINE dijalankan di score_executor agar METEOR/TER/chrF tidak memblokir event loop
+        rows = []
+        for (index, query_pengguna, kunci_jawaban), (terjemahan, prompt_tokens) in zip(group, results):
+            with telemetry.timer("pipeline.evaluate"):
+                rows.append(evaluate_row(index, query_pengguna, kunci_jawaban, terjemahan, prompt_tokens))
+        return rows
+
+    async def process_group(rows, group):
+        try:
+            results = await translate_group(rows, client, rate_limiter, semaphore, executor)
+        except Exception as error:
+            # Baris kelompok yang gagal tetap ditulis agar tidak hilang dari hasil
+            telemetry.incr("pipeline.failed_groups")
+            print(f"\nKelompok baris {group[0][0]}-{group[-1][0]} gagal: {error!r}")
+            results = [(ERROR_TRANSLATION, None)] * len(group)
+        # 4 & 5. Hitung skor evaluasi dan simpan hasil setiap baris segera setelah selesai
+        if SCORE_INLINE:
+            evaluated = await loop.run_in_executor(score_executor, evaluate_group, group, results)
+        else:
+            evaluated = evaluate_group(group, results)
+        for row in evaluated:
+            with telemetry.timer("pipeline.write"):
+                writer.write(row)
+            telemetry.incr("pipeline.rows")
+            progress.update(1)
+
+    def on_group_done(task):
+        group = pending.pop(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Misalnya penulisan hasil gagal; baris kelompok ini diulang saat run dilanjutkan
+            telemetry.incr("pipeline.failed_groups")
+            print(f"\nKelompok baris {group[0][0]}-{group[-1][0]} gagal ditulis: {task.exception()!r}")
+
+    try:
+        for batch_start in range(0, len(df_test), RETRIEVAL_BATCH_SIZE):
+            df_batch = df_test.iloc[batch_start:batch_start + RETRIEVAL_BATCH_SIZE]
+
+            # Langkah A: Dapatkan contoh relevan dari korpus training untuk satu batch sekaligus
+            hasil_pencarian_batch = await loop.run_in_executor(
+                None, retriever.retrieve_many,
+                df_batch['indonesian'].tolist(), config.SIMILARITY_THRESHOLD
+            )
+
+            rows = [
+                (index, row['indonesian'], hasil_pencarian)
+                for (index, row), hasil_pencarian in zip(df_batch.iterrows(), hasil_pencarian_batch)
+            ]
+            references = dict(zip(df_batch.index, df_batch['minangkabau']))
+            for group in group_rows(rows):
+                group_references = [(index, query_pengguna, references[index]) for index, query_pengguna, _ in group]
+                task = asyncio.create_task(process_group(group, group_references))
+                pending[task] = group_references
+                task.add_done_callback(on_group_done)
+
+            with telemetry.timer("pipeline.backpressure_wait"):
+                while sum(len(group) for group in pending.values()) >= max_pending:
+                    await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+
+        while pending:
+            await asyncio.wait(list(pending))
+    finally:
+        for task in list(pending):
+            task.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        score_executor.shutdown(wait=False, cancel_futures=True)
+        progress.close()
+
 
 def process_and_evaluate_corpus():
     """
@@ -43,7 +343,15 @@ def process_and_evaluate_corpus():
     try:
         retriever = SemanticRetriever(
             model_name=config.MODEL_NAME,
-            csv_file_path=config.CSV_FILE_PATH  # Menggunakan korpus train untuk retriever
+            csv_file_path=config.CSV_FILE_PATH,  # Menggunakan korpus train untuk retriever
+            use_ann_index=config.USE_ANN_INDEX,
+            ann_n_lists=config.ANN_N_LISTS,
+            ann_n_probe=config.ANN_N_PROBE,
+            embedding_precision=config.EMBEDDING_PRECISION,
+            examples_per_word=config.EXAMPLES_PER_WORD,
+            trigram_mode=config.TRIGRAM_MODE,
+            trigram_shortlist=config.TRIGRAM_SHORTLIST,
+            trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY
         )
         print("Semantic Retriever berhasil diinisialisasi.")
     except Exception as e:
@@ -62,116 +370,46 @@ def process_and_evaluate_corpus():
         print(f"Error: File data uji tidak ditemukan di '{TEST_DATA_PATH}'.")
         return
 
-    # 3. Proses setiap baris data
-    results_list = []
+    client = get_default_client()
+    if client is None:
+        print(f"API Key untuk OpenRouter tidak ditemukan. Pastikan variabel lingkungan '{config.OPENROUTER_API_KEY_ENV}' telah diatur.")
+        return
+
+    # Hasil ditulis per baris (append-only); baris yang sudah selesai dilewati
+    writer = StreamingResultWriter(RESULT_CSV_PATH, EVALUATION_SUMMARY_PATH, CHECKPOINT_PATH, resume=RESUME)
+    if writer.completed_rows:
+        df_test = df_test[~df_test.index.isin(writer.completed_rows)]
+        print(f"Melanjutkan run sebelumnya: {len(writer.completed_rows)} baris sudah selesai, {len(df_test)} baris tersisa.")
+
+    # 3. Proses seluruh baris data secara konkuren
+    rate_limiter = create_rate_limiter()
+    telemetry.reset()
     
     print("\n--- Memulai Proses Penerjemahan dan Evaluasi ---")
     try:
-        for index, row in tqdm(df_test.iterrows(), total=df_test.shape[0], desc="Menerjemahkan"):
-            query_pengguna = row['indonesian']
-            kunci_jawaban = row['minangkabau']
-            
-            terjemahan = None
-            for attempt in range(MAX_RETRIES):
-                try:
-                    # Langkah A: Dapatkan contoh relevan dari korpus training
-                    hasil_pencarian = retriever.retrieve(query_pengguna, similarity_threshold=config.SIMILARITY_THRESHOLD)
-                    
-                    list_data_untuk_prompt = [
-                        {"original_query_word": kata_query, **data_hasil}
-                        for kata_query, data_hasil in hasil_pencarian.items()
-                    ]
-
-                    # Langkah B: Buat prompt
-                    prompt_final = generate_translation_prompt(query_pengguna, list_data_untuk_prompt)
-
-                    # Langkah C: Kirim ke LLM
-                    response = send_prompt_to_llm(prompt_final)
-                    
-                    if response:
-                        terjemahan = response
-                        break  # Berhasil, keluar dari loop retry
-                    else:
-                        print(f"\nPercobaan {attempt + 1} gagal untuk baris {index}: Menerima respons kosong dari LLM.")
-                        
-                except Exception as e:
-                    print(f"\nError pada baris {index}, percobaan {attempt + 1}/{MAX_RETRIES}: {e}")
-
-                # Tunggu sebelum mencoba lagi
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY_SECONDS)
-            
-            # Jika semua percobaan gagal, catat sebagai error
-            if terjemahan is None:
-                print(f"Gagal memproses baris {index} setelah {MAX_RETRIES} percobaan.")
-                terjemahan = "ERROR_TRANSLATION"
-
-            # 4. Hitung skor evaluasi
-            bleu_score = calculate_bleu(kunci_jawaban, terjemahan)
-            meteor_score = calculate_meteor(kunci_jawaban, terjemahan)
-            ter_score = calculate_ter(kunci_jawaban, terjemahan)
-            chrf_score = calculate_chrf(kunci_jawaban, terjemahan)
-            
-            # 5. Simpan hasil untuk baris ini
-            results_list.append({
-                'indonesia': query_pengguna,
-                'minang_ground_truth': kunci_jawaban,
-                'hasil_terjemahan': terjemahan,
-                'bleu_score': bleu_score,
-                'meteor_score': meteor_score,
-                'ter_score': ter_score,
-                'chrf_score': chrf_score
-            })
-            
-            # Update CSV and evaluation summary after each row
-            df_results = pd.DataFrame(results_list)
-            df_results.to_csv(RESULT_CSV_PATH, index=False, encoding='utf-8')
-            
-            avg_bleu = df_results['bleu_score'].mean()
-            avg_meteor = df_results['meteor_score'].mean()
-            avg_ter = df_results['ter_score'].mean()
-            avg_chrf = df_results['chrf_score'].mean()
-            
-            summary_text = (
-                "--- Rangkuman Total Evaluasi ---\n\n"
-                f"Jumlah data yang dievaluasi: {len(df_results)}\n\n"
-                f"Rata-rata BLEU Score     : {avg_bleu:.4f} (Semakin tinggi semakin baik)\n"
-                f"Rata-rata METEOR Score   : {avg_meteor:.4f} (Semakin tinggi semakin baik)\n"
-                f"Rata-rata TER Score      : {avg_ter:.4f} (Semakin RENDAH semakin baik)\n"
-                f"Rata-rata ChrF Score     : {avg_chrf:.4f} (Semakin tinggi semakin baik)\n"
-            )
-
-            with open(EVALUATION_SUMMARY_PATH, 'w', encoding='utf-8') as f:
-                f.write(summary_text)
-            
-            # Jeda antar permintaan untuk menghindari rate limit API
-            time.sleep(REQUEST_DELAY_SECONDS)
+        asyncio.run(run_translation_pipeline(df_test, retriever, client, rate_limiter, writer))
     except KeyboardInterrupt:
-        print("\nProses dihentikan oleh pengguna. Menyimpan hasil sementara...")
-        if results_list:
-            df_results = pd.DataFrame(results_list)
-            df_results.to_csv(RESULT_CSV_PATH, index=False, encoding='utf-8')
-            print(f"Hasil sementara disimpan di: {RESULT_CSV_PATH}")
-            
-            avg_bleu = df_results['bleu_score'].mean()
-            avg_meteor = df_results['meteor_score'].mean()
-            avg_ter = df_results['ter_score'].mean()
-            avg_chrf = df_results['chrf_score'].mean()
-            
-            summary_text = (
-                "--- Rangkuman Total Evaluasi ---\n\n"
-                f"Jumlah data yang dievaluasi: {len(df_results)}\n\n"
-                f"Rata-rata BLEU Score     : {avg_bleu:.4f} (Semakin tinggi semakin baik)\n"
-                f"Rata-rata METEOR Score   : {avg_meteor:.4f} (Semakin tinggi semakin baik)\n"
-                f"Rata-rata TER Score      : {avg_ter:.4f} (Semakin RENDAH semakin baik)\n"
-                f"Rata-rata ChrF Score     : {avg_chrf:.4f} (Semakin tinggi semakin baik)\n"
-            )
-
-            with open(EVALUATION_SUMMARY_PATH, 'w', encoding='utf-8') as f:
-                f.write(summary_text)
-            print(f"Rangkuman sementara disimpan di: {EVALUATION_SUMMARY_PATH}")
+        writer.close()
+        print("\nProses dihentikan oleh pengguna.")
+        print(f"Hasil sementara tersimpan di: {RESULT_CSV_PATH} ({writer.count} baris)")
+        if telemetry.enabled:
+            telemetry.dump(TELEMETRY_PATH)
+        print(f"Rangkuman sementara tersimpan di: {EVALUATION_SUMMARY_PATH}")
+        print("Jalankan ulang skrip untuk melanjutkan dari baris terakhir.")
         return
 
+    writer.finalize()
+    if not SCORE_INLINE:
+        print("\nMenghitung skor evaluasi secara paralel...")
+        with telemetry.timer("pipeline.score_results"):
+            score_result_file(RESULT_CSV_PATH, summary_path=EVALUATION_SUMMARY_PATH)
+
+    print(f"\nStatistik penjadwal LLM: {rate_limiter.stats()}")
+    if hasattr(client, "cache"):
+        print(f"Statistik cache LLM: {client.cache.stats()}")
+    if telemetry.enabled:
+        telemetry.dump(TELEMETRY_PATH)
+        print(f"\nTelemetri run (disimpan di {TELEMETRY_PATH}):\n{format_snapshot(telemetry.snapshot())}")
     print("\n--- Proses Selesai ---")
 
 if __name__ == "__main__":
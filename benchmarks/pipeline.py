@@ -0,0 +1,246 @@
+"""
+Benchmark end-to-end pipeline batch_process.py secara offline.
+
+Pipeline penuh (retrieval -> prompt -> LLM -> tulis hasil -> skor paralel)
+dijalankan atas dataset/val.csv dan dataset/test.csv tanpa jaringan dan
+tanpa kuota API:
+    - LLM diganti server stub lokal yang kompatibel dengan OpenRouter
+      (latensi dan tingkat error dapat diatur, lihat benchmarks/stubs.py),
+    - encoder SentenceTransformer diganti encoder hash deterministik
+      (kecuali --real-encoder).
+
+Untuk setiap dataset dilaporkan baris per detik (penerjemahan dan skor),
+latensi `SemanticRetriever.retrieve` per query, latensi per tahap dari
+telemetri, dan RSS puncak. Hasil dibandingkan dengan file baseline; angka
+yang memburuk melebihi toleransi membuat skrip keluar dengan kode 1.
+
+Jalankan dari root repositori:
+    python -m benchmarks.pipeline [--corpus dataset/train.csv] [--rows 200]
+        [--latency-ms 50] [--error-rate 0.02] [--update-baseline]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import batch_process
+import config
+from benchmarks.stubs import HashEncoder, StubLLMServer
+from score_results import DEFAULT_METRICS, score_result_file
+from src.llm_handler import OpenRouterClient
+from src.rate_limiter import AdaptiveRateLimiter
+from src.result_writer import StreamingResultWriter
+from src.retriever import SemanticRetriever
+from src.telemetry import format_snapshot, telemetry
+
+DEFAULT_DATASETS = ('dataset/val.csv', 'dataset/test.csv')
+DEFAULT_BASELINE_PATH = os.path.join('benchmarks', 'baseline.json')
+HASH_MODEL_NAME = 'hash-trigram-384'
+
+# Metrik yang dibandingkan dengan baseline: True = lebih besar lebih baik
+TRACKED_METRICS = {
+    'rows_per_second': True,
+    'score_rows_per_second': True,
+    'retrieve_p50_ms': False,
+    'retrieve_p95_ms': False,
+}
+
+
+def peak_rss_mb() -> float:
+    """RSS puncak proses ini atau worker skor (mana yang lebih besar), dalam MB."""
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / unit
+
+
+def build_retriever(args, cache_dir: str) -> SemanticRetriever:
+    model = None if args.real_encoder else HashEncoder()
+    return SemanticRetriever(
+        model_name=config.MODEL_NAME if args.real_encoder else HASH_MODEL_NAME,
+        csv_file_path=args.corpus,
+        use_ann_index=config.USE_ANN_INDEX,
+        ann_n_lists=config.ANN_N_LISTS,
+        ann_n_probe=config.ANN_N_PROBE,
+        cache_dir=cache_dir,
+        embedding_precision=config.EMBEDDING_PRECISION,
+        examples_per_word=config.EXAMPLES_PER_WORD,
+        trigram_mode=config.TRIGRAM_MODE,
+        trigram_shortlist=config.TRIGRAM_SHORTLIST,
+        trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY,
+        model=model
+    )
+
+
+def measure_retrieve(retriever: SemanticRetriever, queries: list) -> dict:
+    """Latensi `retrieve` satu query (cache LRU dikosongkan dahulu), dalam ms."""
+    retriever.clear_cache()
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        retriever.retrieve(query, config.SIMILARITY_THRESHOLD)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return {
+        'retrieve_p50_ms': float(np.percentile(timings, 50)) if timings else 0.0,
+        'retrieve_p95_ms': float(np.percentile(timings, 95)) if timings else 0.0,
+    }
+
+
+def run_dataset(path: str, retriever: SemanticRetriever, stub: StubLLMServer, args) -> dict:
+    """Menjalankan pipeline penuh untuk satu dataset dan mengembalikan hasil pengukurannya."""
+    df = pd.read_csv(path)
+    if args.rows:
+        df = df.head(args.rows)
+    result = {'rows': len(df)}
+    result.update(measure_retrieve(retriever, df['indonesian'].head(args.retrieve_queries).tolist()))
+
+    retriever.clear_cache()
+    telemetry.reset()
+    client = OpenRouterClient("stub-key", model="stub", base_url=stub.base_url)
+    rate_limiter = AdaptiveRateLimiter(requests_per_second=args.rps, max_requests_per_second=args.rps,
+                                       backoff_base_seconds=0.05, backoff_max_seconds=0.5)
+    with tempfile.TemporaryDirectory() as output_dir:
+        result_csv = os.path.join(output_dir, 'result.csv')
+        summary_path = os.path.join(output_dir, 'total_evaluation.txt')
+        writer = StreamingResultWriter(result_csv, summary_path, os.path.join(output_dir, 'checkpoint.json'),
+                                       resume=False)
+        start = time.perf_counter()
+        asyncio.run(batch_process.run_translation_pipeline(df, retriever, client, rate_limiter, writer))
+        writer.finalize()
+        result['translate_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scored = score_result_file(result_csv, metrics=args.metrics, workers=args.workers,
+                                   summary_path=summary_path)
+        result['score_seconds'] = time.perf_counter() - start
+    client.close()
+
+    result['rows_per_second'] = result['rows'] / result['translate_seconds'] if result['translate_seconds'] else 0.0
+    result['score_rows_per_second'] = scored['count'] / result['score_seconds'] if result['score_seconds'] else 0.0
+    result['means'] = scored['means']
+    result['rate_limiter'] = rate_limiter.stats()
+    result['telemetry'] = telemetry.snapshot()
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Membandingkan metrik yang dilacak dengan baseline.
+
+    Returns:
+        list: Baris (dataset, metrik, baseline, sekarang, perubahan relatif, regresi?).
+    """
+    rows = []
+    for name, result in report['datasets'].items():
+        previous = baseline.get('datasets', {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            before, now = previous.get(metric), result.get(metric)
+            if not before or now is None:
+                continue
+            change = (now - before) / before
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((name, metric, before, now, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end pipeline secara offline.")
+    parser.add_argument("--datasets", nargs='+', default=list(DEFAULT_DATASETS),
+                        help="File CSV uji (kolom 'indonesian' dan 'minangkabau')")
+    parser.add_argument("--corpus", default=config.CSV_FILE_PATH, help="Korpus retriever")
+    parser.add_argument("--rows", type=int, default=None, help="Batasi jumlah baris per dataset")
+    parser.add_argument("--retrieve-queries", type=int, default=200,
+                        help="Jumlah query untuk mengukur latensi retrieve per query")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latensi rata-rata LLM stub")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Sebaran latensi LLM stub")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Peluang permintaan LLM stub gagal")
+    parser.add_argument("--rps", type=float, default=1000.0, help="Batas laju permintaan ke LLM stub")
+    parser.add_argument("--sentences-per-request", type=int, default=batch_process.SENTENCES_PER_REQUEST,
+                        help="Jumlah kalimat per permintaan bernomor")
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS), help="Metrik skor, dipisah koma")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker skor")
+    parser.add_argument("--real-encoder", action="store_true",
+                        help=f"Pakai {config.MODEL_NAME} alih-alih encoder hash")
+    parser.add_argument("--cache-dir", default=None,
+                        help="Direktori cache retriever (default: direktori sementara, dibangun ulang)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="File baseline JSON")
+    parser.add_argument("--update-baseline", action="store_true", help="Tulis hasil run ini sebagai baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Perubahan relatif terburuk yang masih diterima sebelum dianggap regresi")
+    parser.add_argument("--json", dest="json_path", default=None, help="Simpan laporan lengkap sebagai JSON")
+    args = parser.parse_args()
+    args.metrics = tuple(metric.strip() for metric in args.metrics.split(",") if metric.strip())
+
+    # Skor dihitung sekali di akhir oleh score_result_file agar jalur skor paralel ikut terukur
+    batch_process.SCORE_INLINE = False
+    batch_process.SENTENCES_PER_REQUEST = args.sentences_per_request
+
+    settings = {
+        'corpus': args.corpus,
+        'encoder': config.MODEL_NAME if args.real_encoder else HASH_MODEL_NAME,
+        'rows': args.rows,
+        'latency_ms': args.latency_ms,
+        'error_rate': args.error_rate,
+        'sentences_per_request': args.sentences_per_request,
+        'metrics': list(args.metrics),
+    }
+    report = {'python': sys.version.split()[0], 'settings': settings, 'datasets': {}}
+
+    with tempfile.TemporaryDirectory() as temp_cache_dir:
+        start = time.perf_counter()
+        retriever = build_retriever(args, args.cache_dir or temp_cache_dir)
+        report['retriever_init_seconds'] = time.perf_counter() - start
+        print(f"Retriever siap dalam {report['retriever_init_seconds']:.2f} s "
+              f"({len(retriever.vocab_list)} kata, encoder {settings['encoder']}).")
+
+        with StubLLMServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate) as stub:
+            for path in args.datasets:
+                name = os.path.splitext(os.path.basename(path))[0]
+                print(f"\n--- {name} ({path}) ---")
+                result = report['datasets'][name] = run_dataset(path, retriever, stub, args)
+                print(f"{result['rows']} baris: {result['rows_per_second']:.1f} baris/s diterjemahkan, "
+                      f"{result['score_rows_per_second']:.1f} baris/s dinilai, "
+                      f"retrieve p50 {result['retrieve_p50_ms']:.2f} ms / p95 {result['retrieve_p95_ms']:.2f} ms, "
+                      f"RSS puncak {result['peak_rss_mb']:.0f} MB")
+                print(format_snapshot(result['telemetry']))
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline ditulis ke {args.baseline}.")
+        return
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('settings') != settings:
+        print(f"\nPeringatan: pengaturan run berbeda dengan baseline {args.baseline}; perbandingan kurang berarti.")
+
+    rows = compare_with_baseline(report, baseline, args.tolerance)
+    print(f"\n{'dataset':<10}{'metrik':<24}{'baseline':>12}{'sekarang':>12}{'ubah':>9}")
+    for name, metric, before, now, change, regressed in rows:
+        print(f"{name:<10}{metric:<24}{before:>12.2f}{now:>12.2f}{change:>+9.0%}{'  REGRESI' if regressed else ''}")
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"\n{len(regressions)} metrik memburuk lebih dari {args.tolerance:.0%} dibanding baseline.")
+        sys.exit(1)
+    print(f"\nTidak ada regresi di atas {args.tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
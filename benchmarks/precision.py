@@ -0,0 +1,152 @@
+"""
+Benchmark presisi penyimpanan embedding kosakata (float32 / float16 / int8).
+
+Embedding kosakata float32 dibangun (atau dimuat dari cache) sekali, lalu
+dikuantisasi ke setiap presisi di memori. Untuk setiap presisi dilaporkan:
+    - memori matriks (+ skala int8),
+    - latensi pencarian batch seluruh kata uji dan latensi satu kata,
+    - seberapa sering `found_word_in_corpus` top-1 berbeda dari float32.
+
+Kata uji diambil dari kolom 'indonesian' dataset/val.csv. Kata yang ada persis
+di kosakata selalu dipetakan lewat hash map (tidak terpengaruh presisi),
+sehingga perbedaan dihitung atas kata yang melewati encoder, lalu juga
+dinyatakan terhadap seluruh kata unik dan seluruh kemunculan token.
+
+Jalankan dari root repositori:
+    python -m benchmarks.precision [--val-path dataset/val.csv] [--json hasil.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import Counter
+
+import numpy as np
+
+import config
+from src.quantization import PRECISIONS, quantize_rows
+from src.retriever import SemanticRetriever
+
+
+def load_query_words(retriever: SemanticRetriever, val_path: str) -> Counter:
+    """Menghitung kemunculan setiap kata (setelah pra-pemrosesan retriever) di data uji."""
+    import pandas as pd
+    df = pd.read_csv(val_path)
+    counts = Counter()
+    for text in df['indonesian']:
+        counts.update(word for word in retriever._preprocess_text(text).split() if word)
+    return counts
+
+
+def _median_seconds(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run_benchmark(retriever: SemanticRetriever, word_counts: Counter, precisions=PRECISIONS,
+                  repeat: int = 3, single_queries: int = 200) -> dict:
+    """
+    Menjalankan benchmark untuk setiap presisi pada retriever float32 yang sudah siap.
+
+    Returns:
+        dict: Ringkasan per presisi, beserta jumlah kata uji.
+    """
+    reference = np.asarray(retriever.corpus_embeddings, dtype=np.float32)
+    vocab_to_id = retriever.index.vocab_to_id
+    encoder_words = [word for word in word_counts if word not in vocab_to_id]
+    query_embeddings = np.asarray(retriever.model.encode(
+        encoder_words, batch_size=retriever.encode_batch_size, show_progress_bar=False
+    ), dtype=np.float32) if encoder_words else np.empty((0, reference.shape[1]), dtype=np.float32)
+
+    total_words = len(word_counts)
+    total_tokens = sum(word_counts.values())
+    encoder_tokens = np.array([word_counts[word] for word in encoder_words], dtype=np.int64)
+    single = query_embeddings[:single_queries]
+
+    report = {
+        "vocab_size": len(reference),
+        "dim": int(reference.shape[1]) if reference.ndim == 2 else 0,
+        "unique_words": total_words,
+        "encoder_words": len(encoder_words),
+        "tokens": total_tokens,
+        "precisions": {},
+    }
+    baseline = None
+    original = (retriever.corpus_embeddings, retriever.corpus_scales, retriever.ann_index)
+    retriever.ann_index = None
+    try:
+        for precision in precisions:
+            retriever.corpus_embeddings, retriever.corpus_scales = quantize_rows(reference, precision)
+            memory = retriever.corpus_embeddings.nbytes
+            if retriever.corpus_scales is not None:
+                memory += retriever.corpus_scales.nbytes
+
+            best_idx, _ = retriever.search(query_embeddings, top_k=1)
+            top1 = best_idx[:, 0]
+            batch_seconds = _median_seconds(lambda: retriever.search(query_embeddings, top_k=1), repeat)
+            single_seconds = _median_seconds(
+                lambda: [retriever.search(row.reshape(1, -1), top_k=1) for row in single], repeat
+            ) / max(len(single), 1)
+
+            if baseline is None:
+                baseline = top1
+            changed = top1 != baseline
+            report["precisions"][precision] = {
+                "memory_mb": memory / 2**20,
+                "batch_search_seconds": batch_seconds,
+                "single_query_ms": single_seconds * 1000,
+                "changed_encoder_words": int(changed.sum()),
+                "changed_encoder_rate": float(changed.mean()) if len(changed) else 0.0,
+                "changed_unique_rate": float(changed.sum()) / total_words if total_words else 0.0,
+                "changed_token_rate": float(encoder_tokens[changed].sum()) / total_tokens if total_tokens else 0.0,
+            }
+    finally:
+        retriever.corpus_embeddings, retriever.corpus_scales, retriever.ann_index = original
+    return report
+
+
+def print_report(report: dict):
+    print(f"\nKosakata: {report['vocab_size']} x {report['dim']}, kata uji unik: {report['unique_words']} "
+          f"({report['encoder_words']} lewat encoder), token: {report['tokens']}\n")
+    print(f"{'presisi':<10}{'memori MB':>11}{'batch (s)':>11}{'1 kata (ms)':>13}"
+          f"{'beda/encoder':>14}{'beda/unik':>11}{'beda/token':>12}")
+    for precision, row in report["precisions"].items():
+        print(f"{precision:<10}{row['memory_mb']:>11.2f}{row['batch_search_seconds']:>11.3f}"
+              f"{row['single_query_ms']:>13.3f}{row['changed_encoder_rate']:>14.2%}"
+              f"{row['changed_unique_rate']:>11.2%}{row['changed_token_rate']:>12.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membandingkan presisi penyimpanan embedding kosakata.")
+    parser.add_argument("--val-path", default="dataset/val.csv", help="CSV uji dengan kolom 'indonesian'")
+    parser.add_argument("--precisions", default=",".join(PRECISIONS), help="Daftar presisi dipisah koma")
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan pengukuran waktu (median)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    retriever = SemanticRetriever(
+        model_name=config.MODEL_NAME,
+        csv_file_path=config.CSV_FILE_PATH,
+        embedding_precision='float32'
+    )
+    if retriever.corpus_embeddings.size == 0 or retriever.model is None:
+        print("Retriever tidak dapat diinisialisasi dengan benar. Benchmark dibatalkan.")
+        return
+
+    precisions = [precision.strip() for precision in args.precisions.split(",") if precision.strip()]
+    if precisions[0] != 'float32':
+        precisions = ['float32'] + [precision for precision in precisions if precision != 'float32']
+    report = run_benchmark(retriever, load_query_words(retriever, args.val_path), precisions, args.repeat)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark waktu start setiap entry point.
+
+Setiap pengukuran dijalankan di proses Python baru agar cache impor tidak
+terbawa antar-percobaan. Yang diukur:
+    - waktu impor modul entry point dan pustaka berat yang ikut termuat,
+    - waktu eksekusi penuh perintah kecil (calculate_total_score.py),
+    - waktu inisialisasi SemanticRetriever dan latensi retrieval pertama.
+
+Jalankan dari root repositori:
+    python -m benchmarks.startup [--repeat 5] [--skip-retrieval] [--json hasil.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ('main', 'batch_process', 'server', 'score_results', 'calculate_total_score')
+HEAVY_MODULES = ('torch', 'sentence_transformers', 'sklearn', 'pandas', 'nltk', 'sacrebleu', 'pyter', 'rouge_score')
+COMMANDS = {
+    'calculate_total_score': [sys.executable, 'calculate_total_score.py'],
+}
+SAMPLE_QUERY = "tempat pemuatan iklan di lembaran ketiga dan empat"
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+RETRIEVAL_PROBE = """
+import json, time
+start = time.perf_counter()
+from src.retriever import SemanticRetriever
+import config
+imported = time.perf_counter()
+retriever = SemanticRetriever(model_name=config.MODEL_NAME, csv_file_path=config.CSV_FILE_PATH,
+                              use_ann_index=config.USE_ANN_INDEX, ann_n_lists=config.ANN_N_LISTS,
+                              ann_n_probe=config.ANN_N_PROBE,
+                              embedding_precision=config.EMBEDDING_PRECISION,
+                              examples_per_word=config.EXAMPLES_PER_WORD,
+                              trigram_mode=config.TRIGRAM_MODE,
+                              trigram_shortlist=config.TRIGRAM_SHORTLIST,
+                              trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY)
+constructed = time.perf_counter()
+retriever.retrieve({query!r}, config.SIMILARITY_THRESHOLD)
+retrieved = time.perf_counter()
+retriever.retrieve({query!r}, config.SIMILARITY_THRESHOLD)
+print(json.dumps({{
+    "import_seconds": imported - start,
+    "init_seconds": constructed - imported,
+    "first_retrieval_seconds": retrieved - constructed,
+    "second_retrieval_seconds": time.perf_counter() - retrieved,
+}}))
+"""
+
+
+def _run_probe(code: str) -> dict:
+    """Menjalankan potongan kode di interpreter baru dan membaca baris JSON terakhirnya."""
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_interpreter(repeat: int) -> float:
+    """Waktu start interpreter kosong (dasar pembanding)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], cwd=ROOT_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    """Median waktu impor satu modul dan daftar pustaka berat yang ikut termuat."""
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        probe = _run_probe(IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES))
+        if "error" in probe:
+            return probe
+        timings.append(probe["seconds"])
+        heavy = probe["heavy"]
+    return {"seconds": statistics.median(timings), "heavy": heavy}
+
+
+def measure_command(argv: list, repeat: int) -> dict:
+    """Median waktu eksekusi penuh sebuah perintah (termasuk start interpreter)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(argv, cwd=ROOT_DIR, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            return {"error": f"exit code {completed.returncode}"}
+    return {"seconds": statistics.median(timings)}
+
+
+def measure_retrieval() -> dict:
+    """Waktu impor, inisialisasi retriever, serta retrieval pertama dan kedua."""
+    return _run_probe(RETRIEVAL_PROBE.format(query=SAMPLE_QUERY))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mengukur waktu start setiap entry point.")
+    parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan per pengukuran (diambil median)")
+    parser.add_argument("--skip-retrieval", action="store_true",
+                        help="Lewati pengukuran inisialisasi dan retrieval pertama")
+    parser.add_argument("--json", dest="json_path", default=None, help="Simpan hasil sebagai JSON")
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "interpreter_seconds": measure_interpreter(args.repeat)}
+    print(f"Start interpreter kosong: {report['interpreter_seconds']:.3f} s\n")
+
+    print(f"{'Impor modul':<24}{'waktu (s)':>10}  pustaka berat termuat")
+    report["imports"] = {}
+    for module in ENTRY_POINTS:
+        result = report["imports"][module] = measure_import(module, args.repeat)
+        if "error" in result:
+            print(f"{module:<24}{'gagal':>10}  {result['error']}")
+        else:
+            print(f"{module:<24}{result['seconds']:>10.3f}  {', '.join(result['heavy']) or '-'}")
+
+    print(f"\n{'Perintah':<24}{'waktu (s)':>10}")
+    report["commands"] = {}
+    for name, argv in COMMANDS.items():
+        result = report["commands"][name] = measure_command(argv, args.repeat)
+        print(f"{name:<24}{result['seconds']:>10.3f}" if "error" not in result
+              else f"{name:<24}{'gagal':>10}  {result['error']}")
+
+    if not args.skip_retrieval:
+        result = report["retrieval"] = measure_retrieval()
+        print(f"\nRetriever ({config.MODEL_NAME}, {config.CSV_FILE_PATH}):")
+        if "error" in result:
+            print(f"  gagal: {result['error']}")
+        else:
+            for key, value in result.items():
+                print(f"  {key:<26}{value:>8.3f} s")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Pengganti offline untuk encoder SentenceTransformer dan API OpenRouter.
+
+- HashEncoder: encoder deterministik berbasis hash trigram karakter. Kata
+  dengan ejaan mirip mendapat vektor yang mirip, sehingga jalur retrieval
+  (hash map, cache LRU, pencarian vektor) tetap bekerja seperti aslinya tanpa
+  mengunduh model.
+- StubLLMServer: server HTTP lokal yang meniru endpoint chat completion
+  OpenRouter dengan latensi dan tingkat error yang dapat diatur. Jawabannya
+  menyalin kalimat yang diminta (atau daftar bernomor untuk prompt gabungan).
+"""
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SINGLE_QUERY_PATTERN = re.compile(r'Translate the following Indonesian sentence: "(.*)" into Minangkabau', re.S)
+NUMBERED_QUERY_PATTERN = re.compile(r'^(\d+)\. "(.*)"$', re.M)
+
+
+class HashEncoder:
+    """
+    Encoder deterministik: trigram karakter dari `<kata>` di-hash (CRC32) ke
+    `dim` bucket bertanda, lalu vektornya dinormalisasi L2.
+
+    Antarmukanya sama dengan `SentenceTransformer.encode` sejauh yang dipakai
+    SemanticRetriever, sehingga dapat diberikan lewat parameter `model`.
+    """
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def _encode_one(self, text: str, row: np.ndarray):
+        padded = f"<{text}>"
+        for i in range(max(len(padded) - 2, 1)):
+            digest = zlib.crc32(padded[i:i + 3].encode('utf-8'))
+            row[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in zip(embeddings, texts):
+            self._encode_one(text, row)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1.0, norms)
+        return embeddings[0] if single else embeddings
+
+
+def stub_translation(prompt: str) -> str:
+    """Jawaban stub: kalimat bernomor disalin apa adanya, prompt tunggal menyalin query-nya."""
+    numbered = NUMBERED_QUERY_PATTERN.findall(prompt)
+    if numbered:
+        return "\n".join(f"{number}. {query}" for number, query in numbered)
+    match = SINGLE_QUERY_PATTERN.search(prompt)
+    return match.group(1) if match else ""
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+
+        stub = self.server.stub
+        delay, failure = stub.draw()
+        time.sleep(delay)
+        if failure == 429:
+            self._send_json(429, {"error": {"code": 429, "message": "Rate limited (stub)"}},
+                            {"Retry-After": "0"})
+            return
+        if failure == 500:
+            self._send_json(500, {"error": {"code": 500, "message": "Internal error (stub)"}})
+            return
+
+        prompt = (request.get("messages") or [{}])[-1].get("content", "")
+        content = stub_translation(prompt)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(content) // 4)
+        self._send_json(200, {
+            "model": request.get("model"),
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+class StubLLMServer:
+    """
+    Server chat completion lokal yang kompatibel dengan OpenRouter.
+
+    Args:
+        latency_ms (float): Latensi rata-rata setiap jawaban.
+        jitter_ms (float): Sebaran latensi (seragam, ± jitter_ms).
+        error_rate (float): Peluang sebuah permintaan gagal; separuhnya 429
+            (dengan Retry-After: 0), separuhnya 500.
+        seed (int): Seed generator acak agar urutan error dapat diulang.
+    """
+    def __init__(self, latency_ms: float = 50.0, jitter_ms: float = 10.0, error_rate: float = 0.0,
+                 seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1"
+
+    def draw(self):
+        """Mengundi latensi (detik) dan status gagal (None, 429, atau 500) untuk satu permintaan."""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            failure = None
+            if self._random.random() < self.error_rate:
+                failure = 429 if self._random.random() < 0.5 else 500
+        return max(delay, 0.0) / 1000.0, failure
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
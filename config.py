@@ -7,6 +7,68 @@ CSV_FILE_PATH = "dataset/train.csv"
 # Ambang batas skor similaritas kosinus untuk pencarian
 SIMILARITY_THRESHOLD = 0.4
 
+# Indeks approximate nearest neighbour (IVF) untuk pencarian kosakata.
+# Aktifkan untuk korpus besar agar latensi pencarian tidak tumbuh linear dengan ukuran kosakata.
+USE_ANN_INDEX = False
+ANN_N_LISTS = None  # Jumlah klaster; None = akar kuadrat ukuran kosakata
+ANN_N_PROBE = 8  # Jumlah klaster yang diperiksa per query
+
+# Indeks trigram karakter atas kosakata untuk varian ejaan kata di luar kosakata
+# (misalnya 'dibuekan' -> 'dibuatkan'):
+#   None          : nonaktif, semua kata di luar kosakata melewati encoder dan seluruh kosakata.
+#   'first_stage' : kata dengan kandidat yang kemiripan ejaannya >= TRIGRAM_MIN_SIMILARITY
+#                   langsung dipetakan tanpa encoder; sisanya seperti biasa.
+#   'rerank'      : encoder tetap dipakai, tetapi hanya dibandingkan dengan TRIGRAM_SHORTLIST
+#                   kandidat trigram, bukan seluruh kosakata.
+TRIGRAM_MODE = None
+TRIGRAM_SHORTLIST = 32  # Jumlah kandidat trigram per kata
+TRIGRAM_MIN_SIMILARITY = 0.75  # 1 - jarak edit / panjang kata, untuk 'first_stage'
+
+# Presisi penyimpanan matriks embedding kosakata (di memori dan di model/*.npy):
+# 'float32', 'float16' (1/2 memori), atau 'int8' (1/4 memori, skala per baris).
+# Jalankan `python -m benchmarks.precision` untuk melihat dampaknya pada hasil top-1.
+EMBEDDING_PRECISION = 'float32'
+
+# Jumlah contoh kalimat per kata yang dipilih dengan peringkat BM25 terhadap query
+# (tidak berulang antar kata dalam satu query).
+EXAMPLES_PER_WORD = 3
+
+# Batas ukuran prompt terjemahan (perkiraan token) dan panjang maksimum contoh kalimat
+# (jumlah kata di sekitar kata yang cocok). None = tanpa batas.
+PROMPT_TOKEN_BUDGET = 1200
+PROMPT_MAX_EXAMPLE_WORDS = 48
+# Batas token untuk satu prompt bernomor yang memuat beberapa kalimat sekaligus
+# (batch_process.SENTENCES_PER_REQUEST > 1); konteks semua kalimat berbagi batas ini.
+BATCH_PROMPT_TOKEN_BUDGET = 2400
+
 # Konfigurasi untuk LLM
 LLM_MODEL = "meta-llama/llama-3.1-8b-instruct"
-OPENROUTER_API_KEY_ENV = "OPENROUTER_API_KEY"
\ No newline at end of file
+OPENROUTER_API_KEY_ENV = "OPENROUTER_API_KEY"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Pengaturan klien HTTP untuk LLM (koneksi keep-alive yang dipakai ulang)
+LLM_CONNECT_TIMEOUT = 10  # Detik untuk membuka koneksi
+LLM_READ_TIMEOUT = 120  # Detik menunggu respons LLM
+LLM_MAX_CONNECTIONS = 16  # Jumlah maksimum koneksi idle di pool
+
+# Cache respons LLM persisten (SQLite); None untuk menonaktifkan
+LLM_CACHE_PATH = "cache/llm_responses.sqlite"
+LLM_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Ukuran maksimum sebelum entri lama dihapus
+
+# Penjadwal laju permintaan LLM (token bucket adaptif, dibagi semua worker)
+LLM_INITIAL_RPS = 2.0  # Laju awal permintaan per detik
+LLM_MAX_RPS = 20.0  # Batas atas laju yang dicapai secara adaptif
+LLM_TOKENS_PER_MINUTE = None  # Anggaran token per menit; None = tanpa batas
+LLM_BACKOFF_BASE_SECONDS = 1.0  # Jeda dasar backoff eksponensial saat gagal
+LLM_BACKOFF_MAX_SECONDS = 60.0  # Jeda maksimum backoff
+
+# Telemetri latensi per tahap (p50/p95/p99) dan counter; ringkasan JSON ditulis per run
+# (results/telemetry.json untuk batch_process, GET /metrics untuk server.py)
+TELEMETRY_ENABLED = True
+
+# Layanan penerjemah yang tetap hidup (server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+MICRO_BATCH_MAX_SIZE = 64  # Jumlah query retrieval maksimum per panggilan encoder
+MICRO_BATCH_MAX_WAIT_MS = 5  # Waktu tunggu maksimum untuk mengumpulkan satu batch
+SERVER_ACCESS_LOG = False  # Cetak log akses setiap permintaan
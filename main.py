@@ -1,5 +1,5 @@
 from src.retriever import SemanticRetriever
-from src.utils import generate_translation_prompt
+from src.utils import build_translation_prompt
 from src.llm_handler import send_prompt_to_llm
 from src.evaluation_metrics import calculate_bleu, calculate_ter, calculate_chrf, calculate_meteor
 import config
@@ -19,14 +19,22 @@ def main():
         # 1. Inisialisasi Retriever dengan konfigurasi
         retriever = SemanticRetriever(
             model_name=config.MODEL_NAME,
-            csv_file_path=config.CSV_FILE_PATH
+            csv_file_path=config.CSV_FILE_PATH,
+            use_ann_index=config.USE_ANN_INDEX,
+            ann_n_lists=config.ANN_N_LISTS,
+            ann_n_probe=config.ANN_N_PROBE,
+            embedding_precision=config.EMBEDDING_PRECISION,
+            examples_per_word=config.EXAMPLES_PER_WORD,
+            trigram_mode=config.TRIGRAM_MODE,
+            trigram_shortlist=config.TRIGRAM_SHORTLIST,
+            trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY
         )
     except (FileNotFoundError, Exception) as e:
         print(f"Gagal menginisialisasi retriever: {e}")
         return
 
     # Periksa apakah retriever berhasil diinisialisasi
-    if not retriever.model or retriever.corpus_embeddings.size == 0:
+    if retriever.corpus_embeddings.size == 0:
         print("Retriever tidak dapat diinisialisasi dengan benar. Aplikasi berhenti.")
         return
 
@@ -51,13 +59,18 @@ def main():
         ]
 
         # 5. Buat prompt untuk LLM
-        prompt_final = generate_translation_prompt(
+        prompt_final, prompt_stats = build_translation_prompt(
             query_pengguna,
-            list_data_untuk_prompt
+            list_data_untuk_prompt,
+            max_tokens=config.PROMPT_TOKEN_BUDGET,
+            max_example_words=config.PROMPT_MAX_EXAMPLE_WORDS
         )
         
         print("\n--- Prompt untuk LLM (Terjemahan Keseluruhan Query) ---")
         print(prompt_final)
+        print(f"Perkiraan token prompt: {prompt_stats['prompt_tokens']} "
+              f"({prompt_stats['examples_used']} contoh dipakai, {prompt_stats['examples_dropped']} dilewati, "
+              f"{prompt_stats['examples_truncated']} dipotong)")
         print("=" * 60)
 
         # 6. Kirim prompt ke LLM menggunakan API OpenRouter
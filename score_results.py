@@ -0,0 +1,255 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.evaluation_metrics import Evaluator
+from src.result_writer import CSV_LINE_TERMINATOR, METRIC_COLUMNS, format_summary
+
+# --- KONFIGURASI ---
+RESULT_CSV_PATH = os.path.join('results', 'result.csv')
+EVALUATION_SUMMARY_PATH = os.path.join('results', 'total_evaluation.txt')
+DEFAULT_METRICS = ('bleu', 'meteor', 'ter', 'chrf')
+CHUNK_SIZE = 256  # Jumlah baris per tugas worker
+
+_worker_evaluator = None
+
+
+def _init_worker(metrics):
+    """Membuat Evaluator sekali per proses worker dan memanaskannya (memuat data NLTK, dll.)."""
+    global _worker_evaluator
+    _worker_evaluator = Evaluator(metrics)
+    _worker_evaluator.score(["kalimat pemanasan"], ["kalimat pemanasan"], include_corpus=False)
+
+
+def _score_chunk(chunk):
+    """
+    Menilai satu potongan (referensi, kandidat, include_corpus) di proses worker.
+
+    Returns:
+        tuple: (skor per kalimat, statistik korpus potongan ini atau {}).
+    """
+    references, candidates, include_corpus = chunk
+    sentences = _worker_evaluator.score(references, candidates, include_corpus=False)["sentences"]
+    stats = _worker_evaluator.corpus_stats(references, candidates) if include_corpus else {}
+    return sentences, stats
+
+
+def _chunked(items, chunk_size: int):
+    """Mengelompokkan iterable menjadi list berisi paling banyak `chunk_size` elemen."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _score_chunks(chunks, to_task, metrics, workers: int = None):
+    """
+    Menilai potongan-potongan secara paralel dan menghasilkan (potongan, hasil)
+    sesuai urutan masukan.
+
+    Potongan dibaca dari iterable seperlunya: paling banyak dua potongan per
+    worker yang sedang dinilai, sehingga memori tidak bergantung pada ukuran
+    masukan. Pool proses hanya dibuat jika ada lebih dari satu potongan.
+    """
+    chunks = iter(chunks)
+    head = list(itertools.islice(chunks, 2))
+    chunks = itertools.chain(head, chunks)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(head) <= 1:
+        _init_worker(metrics)
+        for chunk in chunks:
+            yield chunk, _score_chunk(to_task(chunk))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(metrics,)) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((chunk, executor.submit(_score_chunk, to_task(chunk))))
+            if len(in_flight) >= 2 * workers:
+                done_chunk, future = in_flight.popleft()
+                yield done_chunk, future.result()
+        while in_flight:
+            done_chunk, future = in_flight.popleft()
+            yield done_chunk, future.result()
+
+
+def _read_header(reader) -> list:
+    """Membaca header result.csv (nama kolom dibersihkan dari spasi) dan memeriksa kolom wajib."""
+    fieldnames = [column.strip() for column in next(reader, [])]
+    if 'minang_ground_truth' not in fieldnames or 'hasil_terjemahan' not in fieldnames:
+        raise ValueError("CSV harus memiliki kolom 'minang_ground_truth' dan 'hasil_terjemahan'")
+    return fieldnames
+
+
+def _existing_score(value):
+    """Nilai skor yang sudah tertulis di CSV, atau None jika kosong, bukan angka, atau NaN."""
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(score) else score
+
+
+def _nan_stats(values: list):
+    """Jumlah dan rata-rata dengan mengabaikan NaN (setara np.nansum / np.nanmean)."""
+    finite = [value for value in values if not math.isnan(value)]
+    total = math.fsum(finite)
+    return total, total / len(finite) if finite else float('nan')
+
+
+def score_pairs(references: list, candidates: list, metrics=DEFAULT_METRICS, workers: int = None,
+                chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Menilai pasangan (referensi, kandidat) tingkat kalimat secara paralel.
+
+    Returns:
+        dict: {kolom skor: [skor per kalimat]} sesuai urutan masukan.
+    """
+    metrics = tuple(metrics)
+    starts = range(0, len(references), chunk_size)
+    sentences = {}
+    for _, (chunk_scores, _) in _score_chunks(
+            starts,
+            lambda start: (references[start:start + chunk_size], candidates[start:start + chunk_size], False),
+            metrics, workers):
+        for column, values in chunk_scores.items():
+            sentences.setdefault(column, []).extend(values)
+    return sentences
+
+
+def score_result_file(csv_path: str = RESULT_CSV_PATH, metrics=DEFAULT_METRICS, workers: int = None,
+                      chunk_size: int = CHUNK_SIZE, write_back: bool = True,
+                      summary_path: str = None, include_corpus: bool = True) -> dict:
+    """
+    Menilai ulang seluruh file hasil secara paralel dengan pool proses.
+
+    File dibaca per potongan dengan modul csv (tanpa pandas agar perintah kecil
+    cepat dimulai), setiap potongan dinilai oleh worker yang sudah dipanaskan,
+    lalu baris bernilai ditulis ke file sementara sesuai urutan potongan sehingga
+    keluaran deterministik berapa pun jumlah worker. Yang disimpan untuk seluruh
+    file hanya skor per kalimat dan statistik cukup BLEU/chrF tingkat korpus.
+
+    Args:
+        csv_path (str): Path result.csv.
+        metrics (tuple): Metrik yang dihitung (lihat evaluation_metrics.ALL_METRICS).
+        workers (int): Jumlah proses worker (default: jumlah core).
+        chunk_size (int): Jumlah baris per tugas worker.
+        write_back (bool): Tulis kolom skor kembali ke CSV dan perbarui rangkuman.
+        summary_path (str): Path file rangkuman evaluasi. Default: results/total_evaluation.txt
+            hanya jika yang dinilai adalah results/result.csv; file lain tanpa rangkuman.
+        include_corpus (bool): Hitung juga BLEU dan chrF tingkat korpus.
+
+    Returns:
+        dict: {"count", "sentences" ({kolom: [skor per kalimat]}), "means", "totals", "corpus",
+            "summary_means" (means ditambah rata-rata kolom skor lama yang tidak dihitung ulang)}
+    """
+    metrics = tuple(metrics)
+    if summary_path is None and os.path.abspath(csv_path) == os.path.abspath(RESULT_CSV_PATH):
+        summary_path = EVALUATION_SUMMARY_PATH
+
+    count = 0
+    sentences = {}
+    corpus_stats = {}
+    # Jumlah dan banyaknya nilai kolom skor yang sudah ada di file, agar metrik
+    # yang tidak dihitung ulang tetap muncul di rangkuman
+    existing_sums = {}
+    existing_counts = {}
+    tmp_path = csv_path + ".tmp"
+    out = None
+    writer = None
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            fieldnames = _read_header(reader)
+            rows = (dict(zip(fieldnames, values)) for values in reader)
+            if write_back:
+                out = open(tmp_path, 'w', encoding='utf-8', newline='')
+            for chunk, (chunk_scores, chunk_stats) in _score_chunks(
+                    _chunked(rows, chunk_size),
+                    lambda chunk: ([row.get('minang_ground_truth') for row in chunk],
+                                   [row.get('hasil_terjemahan') for row in chunk], include_corpus),
+                    metrics, workers):
+                count += len(chunk)
+                for column in METRIC_COLUMNS:
+                    if column in fieldnames and column not in chunk_scores:
+                        values = [_existing_score(row.get(column)) for row in chunk]
+                        values = [value for value in values if value is not None]
+                        existing_sums[column] = existing_sums.get(column, 0.0) + math.fsum(values)
+                        existing_counts[column] = existing_counts.get(column, 0) + len(values)
+                for column, values in chunk_scores.items():
+                    sentences.setdefault(column, []).extend(values)
+                corpus_stats = Evaluator.merge_corpus_stats(corpus_stats, chunk_stats)
+                if out is not None:
+                    if writer is None:
+                        columns = fieldnames + [column for column in chunk_scores if column not in fieldnames]
+                        writer = csv.DictWriter(out, fieldnames=columns, lineterminator=CSV_LINE_TERMINATOR)
+                        writer.writeheader()
+                    for position, row in enumerate(chunk):
+                        row.update({column: values[position] for column, values in chunk_scores.items()})
+                    writer.writerows(chunk)
+        if out is not None:
+            out.close()
+            if count:
+                os.replace(tmp_path, csv_path)
+    finally:
+        if out is not None:
+            out.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    stats = {column: _nan_stats(values) for column, values in sentences.items()}
+    corpus = Evaluator(metrics).corpus_score_from_stats(corpus_stats) if include_corpus else {}
+    result = {
+        "count": count,
+        "sentences": sentences,
+        "means": {column: mean for column, (_, mean) in stats.items()} if count else {},
+        "totals": {column: total for column, (total, _) in stats.items()},
+        "corpus": corpus,
+    }
+    # Rangkuman memuat metrik yang dihitung ulang ditambah rata-rata kolom skor lama lainnya
+    result["summary_means"] = {
+        **{column: existing_sums[column] / existing_counts[column]
+           for column in existing_sums if existing_counts[column]},
+        **result["means"],
+    }
+
+    if write_back and count and summary_path:
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            f.write(format_summary(result["count"], result["summary_means"], corpus))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menilai ulang file hasil terjemahan secara paralel.")
+    parser.add_argument("csv_file", nargs="?", default=RESULT_CSV_PATH, help="Path result.csv")
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS),
+                        help="Daftar metrik dipisah koma: bleu,meteor,ter,chrf,rouge")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker (default: jumlah core)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Jumlah baris per tugas worker")
+    parser.add_argument("--no-write", action="store_true", help="Jangan menulis skor kembali ke CSV")
+    parser.add_argument("--summary", default=None,
+                        help=f"Path file rangkuman (default: {EVALUATION_SUMMARY_PATH} hanya untuk {RESULT_CSV_PATH})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = score_result_file(
+        args.csv_file,
+        metrics=[metric.strip() for metric in args.metrics.split(",") if metric.strip()],
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        write_back=not args.no_write,
+        summary_path=args.summary
+    )
+    print(format_summary(result["count"], result["summary_means"], result["corpus"]))
+    print(f"Selesai dalam {time.perf_counter() - start:.2f} detik.")
+
+
+if __name__ == "__main__":
+    main()
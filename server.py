@@ -0,0 +1,207 @@
+import json
+import math
+import time
+import traceback
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from dotenv import load_dotenv
+
+from src.retriever import SemanticRetriever
+from src.utils import build_translation_prompt
+from src.llm_handler import get_default_client
+from src.http_client import LLMError
+from src.micro_batcher import MicroBatcher
+from src.telemetry import telemetry
+import config
+
+
+class TranslationService:
+    """
+    Layanan penerjemah yang tetap hidup: model encoder, indeks, dan embedding
+    dimuat sekali, lalu setiap permintaan hanya membayar retrieval dan panggilan LLM.
+
+    Permintaan retrieval yang datang bersamaan digabung oleh MicroBatcher
+    menjadi satu panggilan `retrieve_many` (satu panggilan encoder).
+    """
+    def __init__(self, retriever: SemanticRetriever, client=None):
+        self.retriever = retriever
+        self.client = client
+        self.started_at = time.time()
+        self.batcher = MicroBatcher(
+            self._retrieve_batch,
+            max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+            max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS
+        )
+
+    def _retrieve_batch(self, items: list) -> list:
+        """Menjalankan retrieve_many sekali per nilai ambang dalam satu batch."""
+        results = [None] * len(items)
+        by_threshold = {}
+        for position, (query, threshold) in enumerate(items):
+            by_threshold.setdefault(threshold, []).append((position, query))
+        for threshold, entries in by_threshold.items():
+            batch_results = self.retriever.retrieve_many([query for _, query in entries], threshold)
+            for (position, _), result in zip(entries, batch_results):
+                results[position] = result
+        return results
+
+    def retrieve(self, query: str, similarity_threshold: float = None) -> dict:
+        threshold = config.SIMILARITY_THRESHOLD if similarity_threshold is None else float(similarity_threshold)
+        return self.batcher.submit((query, threshold)).result()
+
+    def translate(self, query: str, similarity_threshold: float = None) -> dict:
+        """
+        Menerjemahkan satu kalimat.
+
+        Raises:
+            LLMError: Jika permintaan ke LLM gagal atau klien tidak tersedia.
+        """
+        hasil_pencarian = self.retrieve(query, similarity_threshold)
+        list_data_untuk_prompt = [
+            {"original_query_word": kata_query, **data_hasil}
+            for kata_query, data_hasil in hasil_pencarian.items()
+        ]
+        prompt_final, prompt_stats = build_translation_prompt(
+            query, list_data_untuk_prompt,
+            max_tokens=config.PROMPT_TOKEN_BUDGET, max_example_words=config.PROMPT_MAX_EXAMPLE_WORDS
+        )
+
+        if self.client is None:
+            raise LLMError(f"API Key untuk OpenRouter tidak ditemukan ('{config.OPENROUTER_API_KEY_ENV}').")
+        response = self.client.chat_completion(prompt_final)
+        return {
+            "query": query,
+            "translation": response["content"],
+            "retrieved": hasil_pencarian,
+            "cached": bool(response.get("cached")),
+            "prompt_tokens": prompt_stats["prompt_tokens"],
+        }
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "vocab_size": len(self.retriever.vocab_list),
+            "retriever_cache": self.retriever.cache_stats(),
+            "micro_batcher": self.batcher.stats(),
+            "llm_available": self.client is not None,
+        }
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP untuk /translate, /retrieve (POST, JSON), /health dan /metrics (GET)."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service = None
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            # Content-Length tidak valid, JSON rusak, atau bukan UTF-8
+            return None
+        return payload if isinstance(payload, dict) else None
+
+    @staticmethod
+    def _read_threshold(payload: dict):
+        """
+        Mengambil 'similarity_threshold' dari body.
+
+        Returns:
+            tuple: (nilai ambang atau None, pesan error atau None).
+        """
+        threshold = payload.get("similarity_threshold")
+        if threshold is None:
+            return None, None
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not math.isfinite(threshold):
+            return None, "Field 'similarity_threshold' harus berupa angka."
+        return float(threshold), None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.service.health())
+        elif self.path == "/metrics":
+            self._send_json(200, telemetry.snapshot())
+        else:
+            self._send_json(404, {"error": f"Path tidak dikenal: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ("/translate", "/retrieve"):
+            self._send_json(404, {"error": f"Path tidak dikenal: {self.path}"})
+            return
+
+        payload = self._read_json()
+        if payload is None or not isinstance(payload.get("query"), str):
+            self._send_json(400, {"error": "Body harus berupa JSON dengan field 'query' (string)."})
+            return
+
+        query = payload["query"]
+        threshold, error = self._read_threshold(payload)
+        if error is not None:
+            self._send_json(400, {"error": error})
+            return
+        try:
+            if self.path == "/retrieve":
+                self._send_json(200, {"query": query, "retrieved": self.service.retrieve(query, threshold)})
+            else:
+                self._send_json(200, self.service.translate(query, threshold))
+        except LLMError as e:
+            self._send_json(502, {"error": str(e)})
+        except Exception as e:
+            # Input sudah divalidasi di atas, jadi ini kesalahan server
+            # (misalnya error retriever yang diteruskan lewat future MicroBatcher)
+            print(f"Error tak terduga pada {self.path}: {e!r}")
+            traceback.print_exc()
+            self._send_json(500, {"error": f"Kesalahan internal: {type(e).__name__}"})
+
+    def log_message(self, format, *args):
+        if config.SERVER_ACCESS_LOG:
+            super().log_message(format, *args)
+
+
+def run_server(host: str = None, port: int = None):
+    """Memuat semua komponen sekali lalu melayani permintaan hingga dihentikan."""
+    load_dotenv()
+    print("--- Memulai Layanan Penerjemah Semantik ---")
+
+    retriever = SemanticRetriever(
+        model_name=config.MODEL_NAME,
+        csv_file_path=config.CSV_FILE_PATH,
+        use_ann_index=config.USE_ANN_INDEX,
+        ann_n_lists=config.ANN_N_LISTS,
+        ann_n_probe=config.ANN_N_PROBE,
+        embedding_precision=config.EMBEDDING_PRECISION,
+        examples_per_word=config.EXAMPLES_PER_WORD,
+        trigram_mode=config.TRIGRAM_MODE,
+        trigram_shortlist=config.TRIGRAM_SHORTLIST,
+        trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY
+    )
+    client = get_default_client()
+    if client is None:
+        print(f"Peringatan: API Key '{config.OPENROUTER_API_KEY_ENV}' tidak ditemukan; /translate akan gagal.")
+
+    TranslationRequestHandler.service = TranslationService(retriever, client)
+    host = host or config.SERVER_HOST
+    port = port or config.SERVER_PORT
+    server = ThreadingHTTPServer((host, port), TranslationRequestHandler)
+    server.daemon_threads = True
+    print(f"Layanan siap di http://{host}:{port} (/translate, /retrieve, /health, /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nLayanan dihentikan.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run_server()
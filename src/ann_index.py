@@ -0,0 +1,177 @@
+import numpy as np
+
+from src.quantization import dequantize_rows
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Mengubah matriks embedding menjadi float32 dengan norma L2 per baris = 1.
+
+    Dengan embedding yang sudah dinormalisasi, similaritas kosinus cukup
+    dihitung dengan perkalian titik biasa.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_from_scores(scores: np.ndarray, top_k: int):
+    """
+    Mengambil top-k indeks dan skor per baris dari matriks skor.
+
+    Returns:
+        tuple: (indeks [n, k], skor [n, k]) terurut dari skor tertinggi.
+    """
+    n_rows, n_cols = scores.shape
+    k = min(top_k, n_cols)
+    if k == 1:
+        best_idx = np.argmax(scores, axis=1).reshape(-1, 1)
+    else:
+        best_idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best_idx, axis=1)
+    order = np.argsort(-best_scores, axis=1, kind='stable')
+    return (np.take_along_axis(best_idx, order, axis=1),
+            np.take_along_axis(best_scores, order, axis=1))
+
+
+class IVFIndex:
+    """
+    Indeks approximate nearest neighbour bergaya IVF (inverted file) berbasis numpy.
+
+    Kosakata dikelompokkan dengan spherical k-means menjadi `n_lists` klaster.
+    Saat pencarian, hanya `n_probe` klaster terdekat yang dipindai sehingga
+    biaya per query kira-kira sebanding dengan V * n_probe / n_lists, bukan V.
+    """
+    def __init__(self, n_lists: int = None, n_probe: int = 8, n_iter: int = 10, seed: int = 0):
+        """
+        Args:
+            n_lists (int): Jumlah klaster. Default: akar kuadrat ukuran kosakata.
+            n_probe (int): Jumlah klaster yang diperiksa per query.
+            n_iter (int): Jumlah iterasi k-means.
+            seed (int): Seed untuk inisialisasi centroid.
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids = np.empty((0, 0), dtype=np.float32)
+        self.list_offsets = np.zeros(1, dtype=np.int64)
+        self.list_ids = np.empty(0, dtype=np.int64)
+        self.embeddings = None
+        self.scales = None
+
+    def _assign(self, matrix: np.ndarray, block_size: int = 4096) -> np.ndarray:
+        """Menentukan klaster terdekat untuk setiap baris matriks."""
+        assignments = np.empty(len(matrix), dtype=np.int64)
+        for start in range(0, len(matrix), block_size):
+            block = np.asarray(matrix[start:start + block_size], dtype=np.float32)
+            assignments[start:start + block_size] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+
+    def _train(self, embeddings: np.ndarray):
+        """Melatih centroid dengan spherical k-means pada sampel kosakata."""
+        rng = np.random.default_rng(self.seed)
+        n_rows = len(embeddings)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n_rows)))
+        n_lists = min(n_lists, n_rows)
+
+        sample_size = min(n_rows, n_lists * 64)
+        sample_ids = np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+        sample = dequantize_rows(embeddings, self.scales, sample_ids)
+
+        self.centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(self.n_iter):
+            assignments = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            empty = counts == 0
+            if empty.any():
+                # Klaster kosong diisi ulang dengan titik sampel acak
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            self.centroids = normalize_rows(sums)
+
+    def build(self, embeddings: np.ndarray, scales: np.ndarray = None):
+        """
+        Membangun indeks dari matriks embedding yang sudah dinormalisasi.
+
+        Args:
+            embeddings (np.ndarray): Matriks [V, d] ternormalisasi (float32,
+                float16, atau int8).
+            scales (np.ndarray): Skala per baris untuk matriks int8.
+        """
+        self.embeddings = embeddings
+        self.scales = scales
+        if len(embeddings) == 0:
+            return self
+
+        self._train(embeddings)
+        assignments = self._assign(embeddings)
+        self.list_ids = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=len(self.centroids))
+        self.list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return self
+
+    def add(self, embeddings: np.ndarray, scales: np.ndarray = None):
+        """
+        Memasukkan baris baru di akhir matriks ke klaster terdekat tanpa melatih
+        ulang centroid.
+
+        Args:
+            embeddings (np.ndarray): Matriks lengkap [V, d] yang baris-baris
+                awalnya sama dengan matriks saat indeks dibangun.
+            scales (np.ndarray): Skala per baris untuk matriks int8.
+        """
+        n_old = len(self.embeddings) if self.embeddings is not None else 0
+        if len(self.centroids) == 0:
+            return self.build(embeddings, scales)
+        self.embeddings = embeddings
+        self.scales = scales
+        if len(embeddings) == n_old:
+            return self
+
+        new_ids = np.arange(n_old, len(embeddings), dtype=np.int64)
+        assignments = self._assign(dequantize_rows(embeddings, scales, new_ids))
+        order = np.argsort(assignments, kind='stable')
+        self.list_ids = np.insert(self.list_ids, self.list_offsets[assignments[order] + 1], new_ids[order])
+        counts = np.diff(self.list_offsets) + np.bincount(assignments, minlength=len(self.centroids))
+        self.list_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return self
+
+    def search(self, queries: np.ndarray, top_k: int = 1):
+        """
+        Mencari top-k tetangga terdekat untuk setiap query.
+
+        Args:
+            queries (np.ndarray): Matriks query [n, d] yang sudah dinormalisasi.
+            top_k (int): Jumlah hasil per query.
+
+        Returns:
+            tuple: (indeks [n, k], skor [n, k]). Slot yang tidak terisi
+                bernilai -1 dengan skor -inf.
+        """
+        n_queries = len(queries)
+        result_idx = np.full((n_queries, top_k), -1, dtype=np.int64)
+        result_scores = np.full((n_queries, top_k), -np.inf, dtype=np.float32)
+        if n_queries == 0 or len(self.list_ids) == 0:
+            return result_idx, result_scores
+
+        n_probe = min(self.n_probe, len(self.centroids))
+        probe_lists, _ = top_k_from_scores(queries @ self.centroids.T, n_probe)
+
+        for row, (query, lists) in enumerate(zip(queries, probe_lists)):
+            candidates = np.concatenate([
+                self.list_ids[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists
+            ])
+            if len(candidates) == 0:
+                continue
+            scores = dequantize_rows(self.embeddings, self.scales, candidates) @ query
+            best, best_scores = top_k_from_scores(scores.reshape(1, -1), top_k)
+            k = best.shape[1]
+            result_idx[row, :k] = candidates[best[0]]
+            result_scores[row, :k] = best_scores[0]
+        return result_idx, result_scores
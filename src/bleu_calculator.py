@@ -1,17 +1,107 @@
-from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
+import math
+from collections import Counter
+
+# Smoothing method1 NLTK: n-gram tanpa kecocokan diberi pembilang epsilon
+SMOOTHING_EPSILON = 0.1
+MAX_ORDER = 4
+
+
+def _ngram_counts(tokens: list, n: int) -> Counter:
+    if len(tokens) < n:
+        return Counter()
+    return Counter(zip(*[tokens[i:] for i in range(n)]))
+
+
+def _modified_precision(references: list, hypothesis: list, n: int):
+    """Pembilang (n-gram terpotong) dan penyebut (minimal 1) presisi n-gram."""
+    counts = _ngram_counts(hypothesis, n)
+    if not counts:
+        return 0, 1
+    if len(references) == 1:
+        max_counts = _ngram_counts(references[0], n)
+    else:
+        max_counts = Counter()
+        for reference in references:
+            max_counts |= _ngram_counts(reference, n)
+    numerator = sum(min(count, max_counts[ngram]) for ngram, count in counts.items())
+    return numerator, max(1, len(hypothesis) - n + 1)
+
+
+def _closest_ref_length(references: list, hyp_len: int) -> int:
+    return min((len(reference) for reference in references),
+               key=lambda ref_len: (abs(ref_len - hyp_len), ref_len))
+
+
+def _bleu_from_stats(numerators: list, denominators: list, hyp_len: int, ref_len: int) -> float:
+    if numerators[0] == 0:
+        return 0.0
+    if hyp_len > ref_len:
+        brevity_penalty = 1.0
+    elif hyp_len == 0:
+        return 0.0
+    else:
+        brevity_penalty = math.exp(1 - ref_len / hyp_len)
+    weight = 1.0 / len(numerators)
+    log_precisions = (
+        weight * math.log((numerator if numerator else SMOOTHING_EPSILON) / denominator)
+        for numerator, denominator in zip(numerators, denominators)
+    )
+    return brevity_penalty * math.exp(math.fsum(log_precisions))
+
+
+def sentence_bleu(references: list, hypothesis: list) -> float:
+    """
+    BLEU-4 satu kalimat dengan smoothing method1, identik dengan
+    `nltk.translate.bleu_score.sentence_bleu(..., SmoothingFunction().method1)`
+    tetapi tanpa memuat NLTK.
+
+    Args:
+        references (list): Daftar referensi, masing-masing berupa list token.
+        hypothesis (list): Token kandidat.
+    """
+    return corpus_bleu([references], [hypothesis])
+
+
+def corpus_bleu_stats(list_of_references: list, hypotheses: list) -> list:
+    """
+    Statistik cukup BLEU-4 tingkat korpus: [pembilang x4, penyebut x4, panjang
+    kandidat, panjang referensi]. Statistik beberapa potongan korpus dapat
+    dijumlahkan per elemen lalu dinilai dengan `bleu_from_corpus_stats`.
+    """
+    numerators = [0] * MAX_ORDER
+    denominators = [0] * MAX_ORDER
+    hyp_len = ref_len = 0
+    for references, hypothesis in zip(list_of_references, hypotheses):
+        for n in range(1, MAX_ORDER + 1):
+            numerator, denominator = _modified_precision(references, hypothesis, n)
+            numerators[n - 1] += numerator
+            denominators[n - 1] += denominator
+        hyp_len += len(hypothesis)
+        ref_len += _closest_ref_length(references, len(hypothesis))
+    return numerators + denominators + [hyp_len, ref_len]
+
+
+def bleu_from_corpus_stats(stats: list) -> float:
+    """BLEU-4 dari statistik `corpus_bleu_stats` (boleh hasil penjumlahan beberapa potongan)."""
+    return _bleu_from_stats(stats[:MAX_ORDER], stats[MAX_ORDER:2 * MAX_ORDER], stats[-2], stats[-1])
+
+
+def corpus_bleu(list_of_references: list, hypotheses: list) -> float:
+    """BLEU-4 tingkat korpus dengan smoothing method1 (setara `nltk.corpus_bleu`)."""
+    return bleu_from_corpus_stats(corpus_bleu_stats(list_of_references, hypotheses))
+
 
 def calculate_bleu(reference, candidate):
     """
     Menghitung BLEU score antara referensi (kunci jawaban) dan kandidat (hasil prediksi).
-    
+
     Args:
         reference (str): Kalimat referensi (kunci jawaban).
         candidate (str): Kalimat kandidat (hasil prediksi).
-    
+
     Returns:
         float: BLEU score.
     """
     reference_tokens = [reference.split()]  # Tokenisasi referensi
     candidate_tokens = candidate.split()    # Tokenisasi kandidat
-    smoothing_function = SmoothingFunction().method1  # Gunakan smoothing
-    return sentence_bleu(reference_tokens, candidate_tokens, smoothing_function=smoothing_function)
+    return sentence_bleu(reference_tokens, candidate_tokens)
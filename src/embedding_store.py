@@ -0,0 +1,287 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+from src.inverted_index import InvertedIndex
+from src.quantization import precision_of
+
+# Naikkan versi ini setiap kali format artefak atau pra-pemrosesan kosakata berubah
+# agar cache lama otomatis dibangun ulang.
+STORE_VERSION = 4
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20, size: int = None):
+    """
+    Membaca isi file (atau `size` byte pertamanya) ke objek hash SHA-256 secara bertahap.
+
+    Objek hash dapat diperbarui dengan byte yang ditambahkan di akhir file
+    sehingga hash file yang bertambah tidak perlu dihitung ulang dari awal.
+    """
+    digest = hashlib.sha256()
+    remaining = size
+    with open(file_path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest
+
+
+def file_sha256(file_path: str, chunk_size: int = 1 << 20, size: int = None) -> str:
+    """Menghitung hash SHA-256 dari isi file (atau `size` byte pertamanya) secara bertahap."""
+    return file_digest(file_path, chunk_size, size).hexdigest()
+
+
+def _append_npy_rows(path: str, rows: np.ndarray):
+    """
+    Menambahkan baris di akhir file .npy 2D.
+
+    Header .npy ditulis numpy dengan ruang cadangan untuk dimensi pertama,
+    sehingga umumnya cukup menulis ulang header di tempat lalu menambahkan
+    byte baris baru. Jika header baru tidak muat, file ditulis ulang utuh.
+    """
+    with open(path, 'r+b') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+        rows = np.ascontiguousarray(rows, dtype=dtype)
+        if not fortran_order and len(shape) == 2 and rows.shape[1:] == shape[1:]:
+            header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                      'shape': (shape[0] + len(rows), shape[1])}
+            buffer = io.BytesIO()
+            if version == (1, 0):
+                np.lib.format.write_array_header_1_0(buffer, header)
+            else:
+                np.lib.format.write_array_header_2_0(buffer, header)
+            if buffer.tell() == data_offset:
+                f.seek(data_offset + shape[0] * shape[1] * dtype.itemsize)
+                f.write(rows.tobytes())
+                f.truncate()
+                f.seek(0)
+                f.write(buffer.getvalue())
+                return
+
+    existing = np.load(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.concatenate((existing, rows.reshape(-1, *existing.shape[1:]))))
+    os.replace(tmp_path, path)
+
+
+class EmbeddingStore:
+    """
+    Artefak embedding kosakata di disk yang divalidasi terhadap korpus dan model.
+
+    Satu direktori per model berisi:
+        - embeddings.npy : matriks ternormalisasi [V, d] dalam presisi
+                           penyimpanan (float32, float16, atau int8)
+        - scales.npy     : skala per baris float32 [V] (hanya untuk int8)
+        - vocab.json     : daftar kosakata, sejajar dengan baris matriks
+        - postings.npz   : postings indeks terbalik (CSR) kata -> kalimat
+        - sentences_*.bin: teks kalimat paralel (TextStore, + *.offsets.npy)
+        - meta.json      : versi format, identitas model, hash dan ukuran file
+                           korpus, ukuran matriks
+
+    Matriks dibuka dengan `np.load(mmap_mode='r')` sehingga beberapa proses
+    worker berbagi satu salinan di page cache dan startup tidak perlu membaca
+    seluruh array ke RAM.
+    """
+    def __init__(self, model_name: str, root_dir: str = "model"):
+        self.model_name = model_name
+        safe_name = model_name.replace('/', '__').replace('\\', '__')
+        self.directory = os.path.join(root_dir, safe_name)
+        self.embeddings_path = os.path.join(self.directory, "embeddings.npy")
+        self.scales_path = os.path.join(self.directory, "scales.npy")
+        self.vocab_path = os.path.join(self.directory, "vocab.json")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def is_valid(self, corpus_hash: str, precision: str = 'float32') -> bool:
+        """
+        Memeriksa apakah artefak di disk cocok dengan korpus, model, dan presisi
+        penyimpanan saat ini.
+        """
+        meta = self._read_meta()
+        return (
+            meta.get("version") == STORE_VERSION
+            and meta.get("model_name") == self.model_name
+            and meta.get("corpus_sha256") == corpus_hash
+            and meta.get("dtype") == precision
+            and os.path.exists(self.embeddings_path)
+            and os.path.exists(self.vocab_path)
+            and (precision != 'int8' or os.path.exists(self.scales_path))
+        )
+
+    def load(self, corpus_hash: str, precision: str = 'float32'):
+        """
+        Memuat embedding (memory-mapped), skala int8, dan kosakata jika artefak valid.
+
+        Returns:
+            tuple | None: (embeddings, scales, vocab_list) dengan `scales` None
+                selain int8, atau None jika artefak tidak ada, usang, disimpan
+                dengan presisi lain, atau tidak konsisten sehingga harus dibangun ulang.
+        """
+        if not self.is_valid(corpus_hash, precision):
+            return None
+
+        meta = self._read_meta()
+        embeddings = np.load(self.embeddings_path, mmap_mode='r')
+        scales = np.load(self.scales_path) if precision == 'int8' else None
+        with open(self.vocab_path, 'r', encoding='utf-8') as f:
+            vocab_list = json.load(f)
+
+        if (embeddings.shape != (meta.get("n_vocab"), meta.get("dim")) or len(vocab_list) != len(embeddings)
+                or precision_of(embeddings) != precision
+                or (scales is not None and len(scales) != len(embeddings))):
+            print(f"Peringatan: artefak embedding di '{self.directory}' tidak konsisten, akan dibangun ulang.")
+            return None
+        return embeddings, scales, vocab_list
+
+    def load_index(self, vocab_list: list):
+        """Memuat indeks terbalik yang disimpan bersama embedding, atau None."""
+        return InvertedIndex.load(self.directory, vocab_list)
+
+    def save(self, embeddings: np.ndarray, vocab_list: list, corpus_hash: str,
+             corpus_path: str = None, index: InvertedIndex = None, scales: np.ndarray = None):
+        """
+        Menyimpan embedding, kosakata, indeks terbalik, dan metadata secara atomik.
+
+        Matriks disimpan dengan dtype apa adanya (lihat quantization.quantize_rows);
+        `scales` wajib untuk matriks int8. meta.json ditulis paling akhir
+        sehingga artefak yang setengah tertulis tidak pernah dianggap valid.
+        """
+        self.invalidate()
+        self.write_rows(embeddings, reset=True)
+        self.commit(vocab_list, corpus_hash, corpus_path, index=index, scales=scales)
+        print(f"Embedding disimpan ke: {self.directory}")
+
+    def append(self, new_embeddings: np.ndarray, vocab_list: list, corpus_hash: str,
+               corpus_path: str = None, index: InvertedIndex = None, scales: np.ndarray = None):
+        """
+        Menambahkan embedding kata-kata baru di akhir artefak yang sudah ada.
+
+        Hanya baris baru yang ditulis ke embeddings.npy (lihat `_append_npy_rows`);
+        kosakata, skala int8, indeks terbalik, dan metadata ditulis ulang. Seperti
+        `save`, meta.json dihapus dulu dan ditulis paling akhir.
+
+        Args:
+            new_embeddings (np.ndarray): Baris baru dalam presisi penyimpanan.
+            vocab_list (list): Kosakata lengkap (lama + baru).
+            scales (np.ndarray): Skala lengkap untuk matriks int8.
+
+        Returns:
+            tuple: (embeddings memory-mapped lengkap, scales).
+        """
+        self.invalidate()
+        if len(new_embeddings):
+            self.write_rows(new_embeddings)
+        return self.commit(vocab_list, corpus_hash, corpus_path, index=index, scales=scales)
+
+    def invalidate(self):
+        """Menandai artefak tidak valid (hapus meta.json) sebelum mulai ditulis."""
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            os.remove(self.meta_path)
+
+    def write_rows(self, rows: np.ndarray, reset: bool = False):
+        """
+        Menulis baris embedding ke embeddings.npy: file baru jika `reset`,
+        selain itu ditambahkan di akhir. Panggil `invalidate` lebih dulu dan
+        `commit` setelah semua baris tertulis.
+        """
+        if reset or not os.path.exists(self.embeddings_path):
+            tmp_embeddings = self.embeddings_path + ".tmp"
+            with open(tmp_embeddings, 'wb') as f:
+                np.save(f, np.ascontiguousarray(rows))
+            os.replace(tmp_embeddings, self.embeddings_path)
+        else:
+            _append_npy_rows(self.embeddings_path, rows)
+
+    def commit(self, vocab_list: list, corpus_hash: str, corpus_path: str = None,
+               index: InvertedIndex = None, scales: np.ndarray = None):
+        """
+        Menulis kosakata, skala int8, indeks terbalik, lalu meta.json (paling
+        akhir) untuk embeddings.npy yang sudah tertulis.
+
+        Returns:
+            tuple: (embeddings memory-mapped, scales).
+        """
+        self._write_scales(scales)
+        self._write_vocab(vocab_list)
+        if index is not None:
+            index.save(self.directory)
+
+        embeddings = np.load(self.embeddings_path, mmap_mode='r')
+        self._write_meta(embeddings, corpus_hash, corpus_path)
+        return embeddings, scales
+
+    def extended_corpus(self, corpus_path: str):
+        """
+        Memeriksa apakah file korpus saat ini sama dengan korpus tersimpan
+        ditambah baris-baris baru di akhir (isi lama tidak berubah sama sekali).
+
+        Returns:
+            tuple | None: (hash korpus tersimpan, offset byte awal baris baru),
+                atau None jika korpus berubah dengan cara lain atau artefak
+                tidak mencatat ukuran korpus.
+        """
+        meta = self._read_meta()
+        stored_size = meta.get("corpus_size")
+        if (meta.get("version") != STORE_VERSION or meta.get("model_name") != self.model_name
+                or not stored_size or not os.path.exists(corpus_path)
+                or os.path.getsize(corpus_path) <= stored_size):
+            return None
+        with open(corpus_path, 'rb') as f:
+            f.seek(stored_size - 1)
+            if f.read(1) != b'\n':
+                return None
+        if file_sha256(corpus_path, size=stored_size) != meta.get("corpus_sha256"):
+            return None
+        return meta["corpus_sha256"], stored_size
+
+    def _write_scales(self, scales: np.ndarray = None):
+        if scales is not None:
+            tmp_scales = self.scales_path + ".tmp"
+            with open(tmp_scales, 'wb') as f:
+                np.save(f, np.asarray(scales, dtype=np.float32))
+            os.replace(tmp_scales, self.scales_path)
+        elif os.path.exists(self.scales_path):
+            os.remove(self.scales_path)
+
+    def _write_vocab(self, vocab_list: list):
+        tmp_vocab = self.vocab_path + ".tmp"
+        with open(tmp_vocab, 'w', encoding='utf-8') as f:
+            json.dump(vocab_list, f, ensure_ascii=False)
+        os.replace(tmp_vocab, self.vocab_path)
+
+    def _write_meta(self, embeddings: np.ndarray, corpus_hash: str, corpus_path: str = None):
+        meta = {
+            "version": STORE_VERSION,
+            "model_name": self.model_name,
+            "corpus_path": corpus_path,
+            "corpus_sha256": corpus_hash,
+            "corpus_size": os.path.getsize(corpus_path) if corpus_path and os.path.exists(corpus_path) else None,
+            "n_vocab": int(embeddings.shape[0]),
+            "dim": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+            "dtype": precision_of(embeddings),
+            "normalized": True,
+        }
+        tmp_meta = self.meta_path + ".tmp"
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, self.meta_path)
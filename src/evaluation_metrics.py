@@ -1,9 +1,8 @@
-from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
-from nltk.translate.meteor_score import single_meteor_score
-from nltk.tokenize import word_tokenize
-import nltk
-from sacrebleu.metrics import CHRF
-import pyter
+from src.bleu_calculator import sentence_bleu, corpus_bleu_stats, bleu_from_corpus_stats
+from src.telemetry import telemetry
+
+# NLTK, sacrebleu, pyter, dan rouge_score baru diimpor saat metrik yang
+# membutuhkannya pertama kali dipakai; mengimpor NLTK saja memakan >1 detik.
 
 # Pastikan data NLTK yang diperlukan telah diunduh
 # Jalankan sekali di terminal Python Anda:
@@ -12,15 +11,236 @@ import pyter
 # >>> nltk.download('wordnet')
 # >>> nltk.download('omw-1.4')
 
+ALL_METRICS = ('bleu', 'meteor', 'ter', 'chrf', 'rouge')
+
+
+def word_tokenize(text: str) -> list:
+    """Tokenisasi NLTK (untuk METEOR), dimuat saat pertama kali dipakai."""
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    return nltk_word_tokenize(text)
+
+
+class Evaluator:
+    """
+    Mesin metrik yang membangun objek scorer sekali dan menilai banyak pasangan.
+
+    Setiap string ditokenisasi sekali per jenis tokenisasi: token spasi dipakai
+    bersama oleh BLEU dan TER, token `word_tokenize` oleh METEOR. ROUGE memakai
+    tokenizer dan stemmer bawaannya sendiri.
+
+    BLEU dihitung tanpa NLTK (lihat bleu_calculator); pustaka metrik lain
+    dimuat saat metrik tersebut pertama kali dihitung.
+    """
+    def __init__(self, metrics=('bleu', 'meteor', 'ter', 'chrf')):
+        """
+        Args:
+            metrics (tuple): Metrik yang dihitung, subset dari ALL_METRICS.
+        """
+        unknown = set(metrics) - set(ALL_METRICS)
+        if unknown:
+            raise ValueError(f"Metrik tidak dikenal: {sorted(unknown)}")
+        self.metrics = tuple(metrics)
+        self._chrf = None
+        self._rouge_scorer = None
+        self._single_meteor_score = None
+
+    @property
+    def chrf(self):
+        if self._chrf is None:
+            from sacrebleu.metrics import CHRF
+            self._chrf = CHRF()
+        return self._chrf
+
+    @property
+    def rouge_scorer(self):
+        if self._rouge_scorer is None:
+            from rouge_score import rouge_scorer
+            self._rouge_scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+        return self._rouge_scorer
+
+    def bleu(self, reference_tokens: list, candidate_tokens: list) -> float:
+        return sentence_bleu([reference_tokens], candidate_tokens)
+
+    def meteor(self, reference_tokens: list, candidate_tokens: list) -> float:
+        if self._single_meteor_score is None:
+            from nltk.translate.meteor_score import single_meteor_score
+            self._single_meteor_score = single_meteor_score
+        return self._single_meteor_score(reference_tokens, candidate_tokens)
+
+    def ter(self, reference_tokens: list, candidate_tokens: list) -> float:
+        """TER (semakin rendah semakin baik); NaN jika tidak dapat dihitung."""
+        import pyter
+        try:
+            return pyter.ter(candidate_tokens, reference_tokens)
+        except Exception:
+            return float('nan')
+
+    def chrf_sentence(self, reference: str, candidate: str) -> float:
+        return self.chrf.sentence_score(candidate, [reference]).score
+
+    def rouge(self, reference: str, candidate: str) -> dict:
+        scores = self.rouge_scorer.score(reference, candidate)
+        return {
+            "rouge-1": scores['rouge1'].fmeasure,
+            "rouge-2": scores['rouge2'].fmeasure,
+            "rouge-l": scores['rougeL'].fmeasure
+        }
+
+    def score(self, references: list, candidates: list, include_corpus: bool = True) -> dict:
+        """
+        Menilai daftar pasangan referensi-kandidat dalam satu lintasan.
+
+        Args:
+            references (list): Kalimat referensi (kunci jawaban).
+            candidates (list): Kalimat hasil terjemahan, sejajar dengan referensi.
+            include_corpus (bool): Hitung juga BLEU dan chrF tingkat korpus.
+
+        Returns:
+            dict: {"sentences": {nama_kolom: [skor per kalimat]},
+                   "corpus": {"bleu": ..., "chrf": ...}}
+        """
+        if len(references) != len(candidates):
+            raise ValueError("Jumlah referensi dan kandidat harus sama.")
+        references = [text if isinstance(text, str) else '' for text in references]
+        candidates = [text if isinstance(text, str) else '' for text in candidates]
+
+        split_cache = {}
+        word_cache = {}
+
+        def split_tokens(text):
+            tokens = split_cache.get(text)
+            if tokens is None:
+                tokens = split_cache[text] = text.split()
+            return tokens
+
+        def word_tokens(text):
+            tokens = word_cache.get(text)
+            if tokens is None:
+                tokens = word_cache[text] = word_tokenize(text)
+            return tokens
+
+        sentences = {}
+        if 'bleu' in self.metrics:
+            with telemetry.timer("metric.bleu"):
+                sentences['bleu_score'] = [
+                    self.bleu(split_tokens(ref), split_tokens(cand)) for ref, cand in zip(references, candidates)
+                ]
+        if 'meteor' in self.metrics:
+            with telemetry.timer("metric.meteor"):
+                sentences['meteor_score'] = [
+                    self.meteor(word_tokens(ref), word_tokens(cand)) for ref, cand in zip(references, candidates)
+                ]
+        if 'ter' in self.metrics:
+            with telemetry.timer("metric.ter"):
+                sentences['ter_score'] = [
+                    self.ter(split_tokens(ref), split_tokens(cand)) for ref, cand in zip(references, candidates)
+                ]
+        if 'chrf' in self.metrics:
+            with telemetry.timer("metric.chrf"):
+                sentences['chrf_score'] = [
+                    self.chrf_sentence(ref, cand) for ref, cand in zip(references, candidates)
+                ]
+        if 'rouge' in self.metrics:
+            with telemetry.timer("metric.rouge"):
+                rouge_scores = [self.rouge(ref, cand) for ref, cand in zip(references, candidates)]
+            for key in ("rouge-1", "rouge-2", "rouge-l"):
+                sentences[f"{key.replace('-', '')}_score"] = [scores[key] for scores in rouge_scores]
+
+        corpus = {}
+        if include_corpus:
+            with telemetry.timer("metric.corpus"):
+                corpus = self.corpus_score(references, candidates, split_tokens)
+        return {"sentences": sentences, "corpus": corpus}
+
+    def corpus_score(self, references: list, candidates: list, split_tokens=str.split) -> dict:
+        """Menghitung BLEU dan chrF tingkat korpus (bukan rata-rata per kalimat)."""
+        return self.corpus_score_from_stats(self.corpus_stats(references, candidates, split_tokens))
+
+    def corpus_stats(self, references: list, candidates: list, split_tokens=str.split) -> dict:
+        """
+        Statistik cukup BLEU dan chrF tingkat korpus untuk sebagian korpus.
+
+        Statistik beberapa potongan digabung dengan `merge_corpus_stats` lalu
+        dinilai dengan `corpus_score_from_stats`, sehingga skor korpus file
+        besar dapat dihitung per potongan dengan hasil yang sama.
+        """
+        stats = {}
+        if not references:
+            return stats
+        references = [text if isinstance(text, str) else '' for text in references]
+        candidates = [text if isinstance(text, str) else '' for text in candidates]
+        if 'bleu' in self.metrics:
+            stats['bleu'] = corpus_bleu_stats(
+                [[split_tokens(ref)] for ref in references],
+                [split_tokens(cand) for cand in candidates]
+            )
+        if 'chrf' in self.metrics:
+            if self._chrf_stats_supported():
+                # Sama seperti CHRF.corpus_score: statistik per kalimat dijumlahkan lalu dinilai
+                segment_stats = self.chrf._extract_corpus_statistics(candidates, [references])
+                stats['chrf'] = [sum(values) for values in zip(*segment_stats)]
+            else:
+                # Versi sacrebleu tanpa API statistik: teks disimpan untuk CHRF.corpus_score
+                stats['chrf_texts'] = {"candidates": candidates, "references": references}
+        return stats
+
+    def _chrf_stats_supported(self) -> bool:
+        """
+        Apakah sacrebleu menyediakan statistik chrF per kalimat (metode privat
+        sacrebleu 2.x, diperiksa terhadap versi di requirements.txt).
+        """
+        return (hasattr(self.chrf, '_extract_corpus_statistics')
+                and hasattr(self.chrf, '_compute_score_from_stats'))
+
+    @staticmethod
+    def merge_corpus_stats(total: dict, stats: dict) -> dict:
+        """Menjumlahkan statistik `corpus_stats` dua potongan korpus per elemen."""
+        merged = dict(total)
+        for name, values in stats.items():
+            previous = merged.get(name)
+            if isinstance(values, dict):
+                # Teks cadangan chrF ('chrf_texts') digabung, bukan dijumlahkan
+                merged[name] = {key: (previous[key] if previous else []) + list(texts)
+                                for key, texts in values.items()}
+            else:
+                merged[name] = [a + b for a, b in zip(previous, values)] if previous else list(values)
+        return merged
+
+    def corpus_score_from_stats(self, stats: dict) -> dict:
+        """Skor tingkat korpus dari statistik `corpus_stats` (yang boleh sudah digabung)."""
+        corpus = {}
+        if 'bleu' in stats:
+            corpus['bleu'] = bleu_from_corpus_stats(stats['bleu'])
+        if 'chrf' in stats:
+            corpus['chrf'] = self.chrf._compute_score_from_stats(stats['chrf']).score
+        elif 'chrf_texts' in stats:
+            texts = stats['chrf_texts']
+            corpus['chrf'] = self.chrf.corpus_score(texts["candidates"], [texts["references"]]).score
+        return corpus
+
+    def score_pair(self, reference: str, candidate: str) -> dict:
+        """Menilai satu pasangan; mengembalikan {nama_kolom: skor}."""
+        sentences = self.score([reference], [candidate], include_corpus=False)["sentences"]
+        return {column: values[0] for column, values in sentences.items()}
+
+
+_default_evaluator = None
+
+
+def get_default_evaluator() -> Evaluator:
+    """Evaluator bersama (scorer dibuat sekali per proses)."""
+    global _default_evaluator
+    if _default_evaluator is None:
+        _default_evaluator = Evaluator()
+    return _default_evaluator
+
+
 def calculate_bleu(reference, candidate):
     """
     Menghitung BLEU score antara referensi dan kandidat.
     """
-    reference_tokens = [reference.split()]
-    candidate_tokens = candidate.split()
     # Menggunakan smoothing function untuk menangani n-gram yang tidak ada di referensi
-    smoothing_function = SmoothingFunction().method1
-    return sentence_bleu(reference_tokens, candidate_tokens, smoothing_function=smoothing_function)
+    return get_default_evaluator().bleu(reference.split(), candidate.split())
 
 def calculate_meteor(reference, candidate):
     """
@@ -28,29 +248,19 @@ def calculate_meteor(reference, candidate):
     METEOR memerlukan tokenisasi.
     """
     # Tokenisasi diperlukan untuk METEOR agar dapat mencocokkan kata dasar dan sinonim
-    reference_tokens = word_tokenize(reference)
-    candidate_tokens = word_tokenize(candidate)
-    return single_meteor_score(reference_tokens, candidate_tokens)
+    return get_default_evaluator().meteor(word_tokenize(reference), word_tokenize(candidate))
 
 def calculate_ter(reference, candidate):
     """
     Menghitung Translation Edit Rate (TER) score.
     Skor yang lebih rendah lebih baik.
     """
-    reference_tokens = reference.split()
-    candidate_tokens = candidate.split()
-    try:
-        # Menghitung TER score
-        ter_score = pyter.ter(candidate_tokens, reference_tokens)
-        return ter_score
-    except Exception as e:
-        return f"Error calculating TER: {e}"
+    # NaN jika tidak dapat dihitung, sama seperti Evaluator.ter (kolom skor tetap numerik)
+    return get_default_evaluator().ter(reference.split(), candidate.split())
 
 
 def calculate_chrf(reference, candidate):
     """
     Menghitung ChrF score antara referensi dan kandidat.
     """
-    chrf = CHRF()
-    # sacrebleu mengharapkan kandidat dalam list dan referensi dalam list of list
-    return chrf.corpus_score([candidate], [[reference]]).score
\ No newline at end of file
+    return get_default_evaluator().chrf_sentence(reference, candidate)
@@ -0,0 +1,143 @@
+import http.client
+import queue
+import socket
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+
+class LLMError(Exception):
+    """Kesalahan dasar untuk semua kegagalan permintaan ke LLM."""
+
+
+class LLMConnectionError(LLMError):
+    """Koneksi ke server gagal dibuka atau terputus."""
+
+
+class LLMTimeoutError(LLMError):
+    """Server tidak merespons dalam batas waktu yang ditentukan."""
+
+
+class LLMHTTPError(LLMError):
+    """Server membalas dengan status HTTP non-2xx atau objek error."""
+    def __init__(self, status: int, message: str, retry_after: float = None, body: str = ""):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.retry_after = retry_after
+        self.body = body
+
+    @property
+    def is_rate_limited(self) -> bool:
+        return self.status == 429
+
+    @property
+    def is_retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+class LLMResponseError(LLMError):
+    """Respons tidak dapat diurai atau tidak memuat jawaban."""
+
+
+def parse_retry_after(value):
+    """Mengurai header Retry-After (detik atau tanggal HTTP) menjadi detik."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPTransport:
+    """
+    Transport HTTP/1.1 dengan pool koneksi keep-alive berbasis `http.client`.
+
+    Koneksi yang selesai dipakai dikembalikan ke pool sehingga permintaan
+    berikutnya memakai ulang soket yang sama tanpa DNS lookup maupun TLS
+    handshake baru. Aman dipakai dari banyak thread.
+    """
+    def __init__(self, base_url: str, connect_timeout: float = 10.0,
+                 read_timeout: float = 120.0, max_connections: int = 16):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = queue.LifoQueue(maxsize=max_connections)
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.connect_timeout)
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        # Header dan body dikirim terpisah oleh http.client; matikan Nagle agar
+        # keduanya tidak tertahan menunggu delayed ACK.
+        connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def post(self, path: str, body: bytes, headers: dict):
+        """
+        Mengirim POST dan mengembalikan (status, headers, body).
+
+        Jika koneksi dari pool ternyata sudah ditutup server (keep-alive
+        kedaluwarsa), permintaan diulang sekali dengan koneksi baru.
+        """
+        url = self.base_path + path
+        for attempt in range(2):
+            try:
+                connection, reused = self._acquire()
+            except socket.timeout as e:
+                raise LLMTimeoutError(f"Timeout saat membuka koneksi ke {self.host}: {e}") from e
+            except OSError as e:
+                raise LLMConnectionError(f"Gagal terhubung ke {self.host}: {e}") from e
+
+            try:
+                connection.request("POST", url, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except socket.timeout as e:
+                connection.close()
+                raise LLMTimeoutError(f"Timeout menunggu respons dari {self.host}: {e}") from e
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise LLMConnectionError(f"Koneksi ke {self.host} terputus: {e}") from e
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                raise LLMConnectionError(f"Kesalahan koneksi ke {self.host}: {e}") from e
+
+            response_headers = {key.lower(): value for key, value in response.getheaders()}
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return response.status, response_headers, data
+
+    def close(self):
+        """Menutup semua koneksi idle di pool."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,333 @@
+import os
+import re
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from src.text_store import TextStore, TextStoreWriter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Pola pembersihan yang sama dengan SemanticRetriever._preprocess_text
+PUNCTUATION_PATTERN = r'[^\w\s]'
+
+# Nama file teks kalimat (TextStore) di direktori artefak
+SENTENCE_FILES = {"indonesian": "sentences_indonesian.bin", "minangkabau": "sentences_minangkabau.bin"}
+
+# Parameter BM25 (nilai umum Lucene/Elasticsearch)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize_series(texts: "pd.Series") -> "pd.Series":
+    """
+    Melakukan pra-pemrosesan seluruh kolom teks sekaligus (lowercase, hapus
+    tanda baca, pisah spasi) dan mengembalikan satu token per baris.
+
+    Indeks Series hasil adalah posisi kalimat asal (0..n-1).
+    """
+    texts = texts.reset_index(drop=True)
+    texts = texts.where(texts.map(lambda text: isinstance(text, str)), '')
+    cleaned = texts.str.lower().str.replace(PUNCTUATION_PATTERN, '', regex=True)
+    tokens = cleaned.str.split().explode()
+    return tokens[tokens.notna() & (tokens != '')]
+
+
+def tokenize_text(text) -> list:
+    """Versi satu kalimat dari `tokenize_series` (hasil token identik)."""
+    if not isinstance(text, str):
+        return []
+    return re.sub(PUNCTUATION_PATTERN, '', text.lower()).split()
+
+
+def bm25_weights(offsets: np.ndarray, sentence_ids: np.ndarray, term_freqs: np.ndarray,
+                 sentence_lengths: np.ndarray, k1: float = BM25_K1, b: float = BM25_B) -> np.ndarray:
+    """
+    Menghitung bobot BM25 untuk setiap posting (kata, kalimat) sekaligus.
+
+    Hasilnya sejajar dengan `sentence_ids`, sehingga skor BM25 sebuah kalimat
+    untuk suatu query cukup berupa jumlah bobot posting kata-kata query.
+    """
+    n_sentences = max(len(sentence_lengths), 1)
+    avg_length = float(sentence_lengths.mean()) if len(sentence_lengths) else 1.0
+    doc_freqs = np.diff(offsets)
+    idf = np.log1p((n_sentences - doc_freqs + 0.5) / (doc_freqs + 0.5))
+    tf = term_freqs.astype(np.float32)
+    length_norm = 1.0 - b + b * sentence_lengths[sentence_ids] / max(avg_length, 1e-9)
+    weights = np.repeat(idf, doc_freqs) * tf * (k1 + 1.0) / (tf + k1 * length_norm)
+    return weights.astype(np.float32)
+
+
+class InvertedIndex:
+    """
+    Indeks terbalik ringkas dari kata kosakata ke kalimat yang memuatnya.
+
+    Postings disimpan dalam format CSR: untuk kata dengan id `i`, id kalimatnya
+    adalah `sentence_ids[offsets[i]:offsets[i + 1]]` (unik dan terurut). Teks
+    kalimat paralel disimpan sekali saja (TextStore) dan dirujuk lewat id kalimat.
+
+    Frekuensi kata per posting dan panjang kalimat ikut disimpan; dari situ
+    bobot BM25 per posting dihitung sekali saat indeks dibuat/dimuat sehingga
+    peringkat kalimat per query hanya berupa penjumlahan bobot postings.
+    """
+    def __init__(self, vocab_list: list, offsets: np.ndarray, sentence_ids: np.ndarray,
+                 indonesian, minangkabau, term_freqs: np.ndarray = None,
+                 sentence_lengths: np.ndarray = None):
+        self.vocab_list = vocab_list
+        self.vocab_to_id = {word: i for i, word in enumerate(vocab_list)}
+        self.offsets = offsets
+        self.sentence_ids = sentence_ids
+        self.indonesian = indonesian if isinstance(indonesian, TextStore) else TextStore.from_texts(indonesian)
+        self.minangkabau = minangkabau if isinstance(minangkabau, TextStore) else TextStore.from_texts(minangkabau)
+        if term_freqs is None:
+            term_freqs = np.ones(len(sentence_ids), dtype=np.int32)
+        if sentence_lengths is None:
+            sentence_lengths = np.bincount(sentence_ids, minlength=len(indonesian)).astype(np.int32)
+        self.term_freqs = term_freqs
+        self.sentence_lengths = sentence_lengths
+        self.weights = bm25_weights(offsets, sentence_ids, term_freqs, sentence_lengths)
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame"):
+        """Membangun indeks dari DataFrame berkolom 'indonesian' dan 'minangkabau'."""
+        builder = InvertedIndexBuilder()
+        builder.add_chunk(df['indonesian'], df['minangkabau'])
+        return builder.build()
+
+    def __len__(self):
+        return len(self.indonesian)
+
+    def postings(self, word_id: int) -> np.ndarray:
+        """Mengembalikan id kalimat yang memuat kata dengan id `word_id`."""
+        return self.sentence_ids[self.offsets[word_id]:self.offsets[word_id + 1]]
+
+    def sentence_pair(self, sentence_id: int) -> dict:
+        """Mengembalikan pasangan kalimat paralel untuk id kalimat tertentu."""
+        return {
+            "indonesian": self.indonesian[sentence_id],
+            "minangkabau": self.minangkabau[sentence_id]
+        }
+
+    def examples(self, word_id: int) -> list:
+        """Mengembalikan semua contoh kalimat untuk kata dengan id `word_id`."""
+        return [self.sentence_pair(int(i)) for i in self.postings(word_id)]
+
+    def first_example(self, word_id: int):
+        """Mengembalikan contoh kalimat pertama (urutan korpus) untuk suatu kata."""
+        postings = self.postings(word_id)
+        if len(postings) == 0:
+            return None
+        return self.sentence_pair(int(postings[0]))
+
+    def score_sentences(self, word_ids: list, query_weights: list = None):
+        """
+        Skor BM25 kalimat untuk sekumpulan kata query.
+
+        Hanya postings kata-kata query yang disentuh, sehingga biayanya sebanding
+        dengan jumlah posting kata tersebut, bukan dengan ukuran korpus.
+
+        Args:
+            word_ids (list): Id kosakata kata-kata query.
+            query_weights (list): Bobot per kata (misalnya similaritas semantik
+                kata query terhadap kata korpus); default 1.0.
+
+        Returns:
+            tuple: (id kalimat kandidat terurut naik, skor BM25 sejajar).
+        """
+        if not word_ids:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        if query_weights is None:
+            query_weights = [1.0] * len(word_ids)
+        ids = np.concatenate([self.postings(word_id) for word_id in word_ids])
+        weights = np.concatenate([
+            self.weights[self.offsets[word_id]:self.offsets[word_id + 1]] * weight
+            for word_id, weight in zip(word_ids, query_weights)
+        ])
+        candidates, inverse = np.unique(ids, return_inverse=True)
+        return candidates, np.bincount(inverse, weights=weights, minlength=len(candidates))
+
+    def rank_postings(self, word_id: int, candidates: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """
+        Mengurutkan kalimat yang memuat `word_id` menurut skor dari `score_sentences`
+        (skor sama: urutan korpus). `candidates` harus memuat semua postings kata ini.
+        """
+        postings = self.postings(word_id)
+        positions = np.searchsorted(candidates, postings)
+        order = np.argsort(-scores[positions], kind='stable')
+        return postings[order]
+
+    def extend(self, indonesian: list, minangkabau: list):
+        """
+        Membuat indeks baru yang memuat kalimat-kalimat tambahan.
+
+        Kalimat baru mendapat id setelah kalimat lama dan kata yang belum ada
+        ditambahkan di akhir kosakata, sehingga id kata dan kalimat lama tetap
+        berlaku. Postings kalimat baru disisipkan di akhir postings setiap kata
+        (tetap terurut) dan bobot BM25 dihitung ulang karena jumlah kalimat dan
+        rata-rata panjang kalimat ikut berubah. Indeks lama tidak diubah.
+
+        Returns:
+            tuple: (indeks baru, daftar kata baru sesuai urutan id).
+        """
+        vocab_to_id = dict(self.vocab_to_id)
+        vocab_list = list(self.vocab_list)
+        first_sentence = len(self.indonesian)
+        word_ids, sentence_ids, term_freqs, lengths = [], [], [], []
+        for offset, text in enumerate(indonesian):
+            tokens = tokenize_text(text)
+            lengths.append(len(tokens))
+            for word, count in Counter(tokens).items():
+                word_id = vocab_to_id.get(word)
+                if word_id is None:
+                    word_id = vocab_to_id[word] = len(vocab_list)
+                    vocab_list.append(word)
+                word_ids.append(word_id)
+                sentence_ids.append(first_sentence + offset)
+                term_freqs.append(count)
+
+        n_old_words = len(self.vocab_list)
+        word_ids = np.asarray(word_ids, dtype=np.int64)
+        order = np.lexsort((np.asarray(sentence_ids, dtype=np.int64), word_ids))
+        word_ids = word_ids[order]
+        # Posting baru disisipkan tepat di akhir postings kata yang sama;
+        # kata baru berada di akhir array dengan urutan id
+        list_ends = np.concatenate((self.offsets[1:], np.full(len(vocab_list) - n_old_words, self.offsets[-1])))
+        positions = list_ends[word_ids]
+        counts = np.diff(self.offsets)
+        counts = np.concatenate((counts, np.zeros(len(vocab_list) - n_old_words, dtype=counts.dtype)))
+        counts += np.bincount(word_ids, minlength=len(vocab_list))
+
+        index = InvertedIndex(
+            vocab_list=vocab_list,
+            offsets=np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            sentence_ids=np.insert(self.sentence_ids, positions, np.asarray(sentence_ids, dtype=np.int32)[order]),
+            indonesian=self.indonesian.extend(indonesian),
+            minangkabau=self.minangkabau.extend(minangkabau),
+            term_freqs=np.insert(self.term_freqs, positions, np.asarray(term_freqs, dtype=np.int32)[order]),
+            sentence_lengths=np.concatenate((self.sentence_lengths, np.asarray(lengths, dtype=np.int32))),
+        )
+        return index, vocab_list[n_old_words:]
+
+    def save(self, directory: str):
+        """Menyimpan postings (npz) dan teks kalimat (TextStore) ke direktori."""
+        os.makedirs(directory, exist_ok=True)
+        postings_path = os.path.join(directory, "postings.npz")
+        with open(postings_path + ".tmp", 'wb') as f:
+            np.savez(f, offsets=self.offsets, sentence_ids=self.sentence_ids,
+                     term_freqs=self.term_freqs, sentence_lengths=self.sentence_lengths)
+        os.replace(postings_path + ".tmp", postings_path)
+
+        self.indonesian.save(os.path.join(directory, SENTENCE_FILES["indonesian"]))
+        self.minangkabau.save(os.path.join(directory, SENTENCE_FILES["minangkabau"]))
+
+    @classmethod
+    def load(cls, directory: str, vocab_list: list):
+        """
+        Memuat indeks dari direktori. Mengembalikan None jika file tidak ada
+        atau tidak sejajar dengan kosakata.
+        """
+        postings_path = os.path.join(directory, "postings.npz")
+        indonesian = TextStore.load(os.path.join(directory, SENTENCE_FILES["indonesian"]))
+        minangkabau = TextStore.load(os.path.join(directory, SENTENCE_FILES["minangkabau"]))
+        if not os.path.exists(postings_path) or indonesian is None or minangkabau is None:
+            return None
+
+        with np.load(postings_path) as data:
+            if 'term_freqs' not in data.files:
+                return None
+            offsets = data['offsets']
+            sentence_ids = data['sentence_ids']
+            term_freqs = data['term_freqs']
+            sentence_lengths = data['sentence_lengths']
+
+        if (len(offsets) != len(vocab_list) + 1 or len(term_freqs) != len(sentence_ids)
+                or not len(indonesian) == len(minangkabau) == len(sentence_lengths)):
+            return None
+        return cls(vocab_list, offsets, sentence_ids, indonesian, minangkabau,
+                   term_freqs=term_freqs, sentence_lengths=sentence_lengths)
+
+
+class InvertedIndexBuilder:
+    """
+    Membangun InvertedIndex secara bertahap dari potongan-potongan korpus.
+
+    Setiap potongan ditokenisasi secara tervektorisasi lalu hanya disimpan
+    sebagai array posting ringkas (id kata, id kalimat, frekuensi); teks
+    kalimat langsung ditulis ke TextStore di `directory` (atau ditampung di
+    memori jika `directory` None). Kata baru mendapat id sesuai urutan
+    kemunculan potongan (terurut abjad di dalam satu potongan).
+    """
+    def __init__(self, directory: str = None):
+        self.vocab_list = []
+        self.vocab_to_id = {}
+        self.n_sentences = 0
+        self._word_ids = []
+        self._sentence_ids = []
+        self._term_freqs = []
+        self._lengths = []
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self._texts = {column: TextStoreWriter(os.path.join(directory, filename))
+                           for column, filename in SENTENCE_FILES.items()}
+        else:
+            self._texts = {column: [] for column in SENTENCE_FILES}
+
+    def add_chunk(self, indonesian: "pd.Series", minangkabau: "pd.Series") -> list:
+        """
+        Menambahkan satu potongan kalimat paralel.
+
+        Returns:
+            list: Kata-kata yang baru pertama kali muncul di potongan ini.
+        """
+        n_rows = len(indonesian)
+        tokens = tokenize_series(indonesian)
+        # Faktorisasi berbasis hash atas array objek: tanpa array '<U{panjang maks}'
+        # yang ukurannya ditentukan token terpanjang di potongan
+        inverse, words = tokens.factorize(sort=True)
+        new_words = []
+        chunk_word_ids = np.empty(len(words), dtype=np.int64)
+        for i, word in enumerate(words.tolist()):
+            word_id = self.vocab_to_id.get(word)
+            if word_id is None:
+                word_id = self.vocab_to_id[word] = len(self.vocab_list)
+                self.vocab_list.append(word)
+                new_words.append(word)
+            chunk_word_ids[i] = word_id
+
+        # Satu posting per pasangan (kata, kalimat), terurut per kata lalu per kalimat
+        local_ids = tokens.index.to_numpy(dtype=np.int64)
+        n_keys = max(n_rows, 1)
+        pair_keys, term_freqs = np.unique(chunk_word_ids[inverse] * n_keys + local_ids, return_counts=True)
+        self._word_ids.append((pair_keys // n_keys).astype(np.int32))
+        self._sentence_ids.append((pair_keys % n_keys + self.n_sentences).astype(np.int32))
+        self._term_freqs.append(term_freqs.astype(np.int32))
+        self._lengths.append(np.bincount(local_ids, minlength=n_rows).astype(np.int32))
+
+        for column, texts in (("indonesian", indonesian), ("minangkabau", minangkabau)):
+            if isinstance(self._texts[column], list):
+                self._texts[column].extend(texts)
+            else:
+                self._texts[column].write(texts)
+        self.n_sentences += n_rows
+        return new_words
+
+    def build(self) -> InvertedIndex:
+        """Menggabungkan semua potongan menjadi InvertedIndex (CSR)."""
+        word_ids = np.concatenate(self._word_ids) if self._word_ids else np.empty(0, dtype=np.int32)
+        # Potongan sudah terurut per kata lalu per kalimat dan id kalimat naik antar
+        # potongan, jadi pengurutan stabil per kata cukup
+        order = np.argsort(word_ids, kind='stable')
+        counts = np.bincount(word_ids, minlength=len(self.vocab_list))
+        texts = {column: writer if isinstance(writer, list) else writer.close()
+                 for column, writer in self._texts.items()}
+        return InvertedIndex(
+            vocab_list=self.vocab_list,
+            offsets=np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            sentence_ids=np.concatenate(self._sentence_ids)[order] if self._word_ids else np.empty(0, np.int32),
+            indonesian=texts["indonesian"],
+            minangkabau=texts["minangkabau"],
+            term_freqs=np.concatenate(self._term_freqs)[order] if self._word_ids else np.empty(0, np.int32),
+            sentence_lengths=np.concatenate(self._lengths) if self._lengths else np.empty(0, np.int32),
+        )
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMResponseCache:
+    """
+    Cache respons LLM persisten berbasis SQLite, dialamatkan dengan konten.
+
+    Kunci adalah hash SHA-256 dari nama model, prompt, dan parameter sampling,
+    sehingga prompt yang identik byte-per-byte tidak dikirim ulang ke API.
+    Mode WAL dan busy timeout membuat cache aman dibagi antar thread maupun
+    proses worker. Jika ukuran total melebihi `max_bytes`, entri yang paling
+    lama tidak diakses dihapus terlebih dahulu.
+    """
+    _EVICTION_CHECK_INTERVAL = 64
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+
+    def _connection(self):
+        """Satu koneksi SQLite per thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(model: str, prompt: str, params: dict = None) -> str:
+        """Membuat kunci cache dari model, prompt, dan parameter sampling."""
+        material = json.dumps(
+            {"model": model, "prompt": prompt, "params": params or {}},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+            return self._stats[name]
+
+    def get(self, key: str):
+        """Mengembalikan respons yang tersimpan untuk `key`, atau None."""
+        connection = self._connection()
+        row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count("misses")
+            return None
+        with connection:
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._count("hits")
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, response: dict):
+        """Menyimpan respons untuk `key` dan sesekali menjalankan eviksi."""
+        payload = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, payload, len(payload.encode('utf-8')), now, now)
+            )
+        if self._count("writes") % self._EVICTION_CHECK_INTERVAL == 0:
+            self.evict()
+
+    def size_bytes(self) -> int:
+        row = self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return int(row[0])
+
+    def evict(self):
+        """Menghapus entri yang paling lama tidak diakses hingga ukuran di bawah 90% batas."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        connection = self._connection()
+        removed = 0
+        with connection:
+            rows = connection.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+            for key, size in rows:
+                if total <= target:
+                    break
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+        self._count("evictions", removed)
+
+    def stats(self) -> dict:
+        """Statistik hit/miss proses ini beserta jumlah entri dan ukuran cache."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        stats["size_bytes"] = self.size_bytes()
+        return stats
@@ -1,41 +1,188 @@
 import os
-import subprocess
 import json
+import threading
 import config
+from src.http_client import HTTPTransport, LLMError, LLMHTTPError, LLMResponseError, parse_retry_after
+from src.llm_cache import LLMResponseCache
+from src.telemetry import telemetry
 
-def send_prompt_to_llm(prompt_final):
+
+class OpenRouterClient:
+    """
+    Klien chat completion OpenRouter yang berjalan di dalam proses.
+
+    Transport dapat diganti (misalnya dengan server stub lokal) selama
+    menyediakan metode `post(path, body, headers) -> (status, headers, body)`.
+    """
+    def __init__(self, api_key: str, model: str = None, transport=None, base_url: str = None):
+        self.api_key = api_key
+        self.model = model or config.LLM_MODEL
+        self.transport = transport or HTTPTransport(
+            base_url or config.OPENROUTER_BASE_URL,
+            connect_timeout=config.LLM_CONNECT_TIMEOUT,
+            read_timeout=config.LLM_READ_TIMEOUT,
+            max_connections=config.LLM_MAX_CONNECTIONS
+        )
+
+    def chat_completion(self, prompt_final: str, **params) -> dict:
+        """
+        Mengirim satu prompt dan mengembalikan jawaban beserta pemakaian token.
+
+        Returns:
+            dict: {"content": str, "usage": dict}
+
+        Raises:
+            LLMError: Kegagalan koneksi, timeout, status HTTP, atau respons tidak valid.
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt_final
+                }
+            ],
+            **params
+        }
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+            "Connection": "keep-alive"
+        }
+        telemetry.incr("llm.requests")
+        try:
+            with telemetry.timer("llm.round_trip"):
+                status, response_headers, body = self.transport.post(
+                    "/chat/completions", json.dumps(payload).encode('utf-8'), headers
+                )
+        except LLMError:
+            telemetry.incr("llm.transport_errors")
+            raise
+        text = body.decode('utf-8', errors='replace')
+        retry_after = parse_retry_after(response_headers.get("retry-after"))
+
+        if status >= 400:
+            telemetry.incr("llm.http_errors")
+            raise LLMHTTPError(status, text[:200], retry_after=retry_after, body=text)
+
+        try:
+            response_json = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise LLMResponseError(f"Gagal memproses respons JSON dari LLM: {e}") from e
+
+        if not isinstance(response_json, dict):
+            raise LLMResponseError("Respons LLM bukan objek JSON.")
+
+        # OpenRouter dapat mengembalikan objek error dengan status 200
+        if "error" in response_json:
+            error = response_json["error"] or {}
+            code = error.get("code") if isinstance(error, dict) else None
+            message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            raise LLMHTTPError(code if isinstance(code, int) else status, message,
+                               retry_after=retry_after, body=text)
+
+        choices = response_json.get("choices")
+        choice = choices[0] if isinstance(choices, list) and choices else None
+        message = choice.get("message") if isinstance(choice, dict) else None
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, str):
+            raise LLMResponseError("Respons LLM tidak memuat jawaban.")
+        usage = response_json.get("usage")
+        if not isinstance(usage, dict):
+            usage = {}
+        for key in ("prompt_tokens", "completion_tokens"):
+            if isinstance(usage.get(key), (int, float)):
+                telemetry.record(f"llm.usage_{key}", usage[key])
+        return {"content": content, "usage": usage}
+
+    def get_cached(self, prompt_final: str, **params):
+        """Klien tanpa cache tidak pernah memiliki respons tersimpan."""
+        return None
+
+    def fetch(self, prompt_final: str, **params) -> dict:
+        """Selalu mengirim permintaan ke API (sama dengan `chat_completion`)."""
+        return self.chat_completion(prompt_final, **params)
+
+    def close(self):
+        self.transport.close()
+
+
+class CachedLLMClient:
+    """
+    Pembungkus klien LLM yang menyimpan respons di LLMResponseCache.
+
+    Prompt dengan model dan parameter sampling yang sama dijawab dari cache
+    tanpa memanggil API. Respons hasil cache ditandai dengan `"cached": True`.
+    """
+    def __init__(self, client, cache: LLMResponseCache):
+        self.client = client
+        self.cache = cache
+        self.model = client.model
+
+    def _key(self, prompt_final: str, params: dict) -> str:
+        return LLMResponseCache.make_key(self.model, prompt_final, params)
+
+    def get_cached(self, prompt_final: str, **params):
+        """Mengembalikan respons tersimpan untuk prompt ini, atau None."""
+        with telemetry.timer("llm.cache_lookup"):
+            response = self.cache.get(self._key(prompt_final, params))
+        if response is not None:
+            response["cached"] = True
+        telemetry.incr("llm.cache_hits" if response is not None else "llm.cache_misses")
+        return response
+
+    def fetch(self, prompt_final: str, **params) -> dict:
+        """Mengirim permintaan ke API tanpa memeriksa cache, lalu menyimpan jawabannya."""
+        response = self.client.chat_completion(prompt_final, **params)
+        if response["content"].strip():
+            self.cache.put(self._key(prompt_final, params), self.model, response)
+        return response
+
+    def chat_completion(self, prompt_final: str, **params) -> dict:
+        cached = self.get_cached(prompt_final, **params)
+        if cached is not None:
+            return cached
+        return self.fetch(prompt_final, **params)
+
+    def close(self):
+        self.client.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """
+    Mengembalikan klien bersama untuk proses ini (dibuat sekali, lalu dipakai ulang
+    agar koneksi keep-alive ke OpenRouter tetap terbuka). None jika API key tidak ada.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            api_key = os.getenv(config.OPENROUTER_API_KEY_ENV)
+            if not api_key:
+                return None
+            _default_client = OpenRouterClient(api_key)
+            if config.LLM_CACHE_PATH:
+                _default_client = CachedLLMClient(
+                    _default_client, LLMResponseCache(config.LLM_CACHE_PATH, config.LLM_CACHE_MAX_BYTES)
+                )
+        return _default_client
+
+
+def send_prompt_to_llm(prompt_final, client=None):
     """
     Mengirim prompt ke LLM menggunakan API OpenRouter.
+
+    Mengembalikan teks jawaban, atau None jika permintaan gagal.
     """
-    api_key = os.getenv(config.OPENROUTER_API_KEY_ENV)
-    if not api_key:
+    client = client or get_default_client()
+    if client is None:
         print(f"API Key untuk OpenRouter tidak ditemukan. Pastikan variabel lingkungan '{config.OPENROUTER_API_KEY_ENV}' telah diatur.")
         return
 
-    # Buat payload JSON dengan format yang valid
-    payload = {
-        "model": config.LLM_MODEL,
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt_final
-            }
-        ]
-    }
-
-    curl_command = [
-        "curl", "-s", "https://openrouter.ai/api/v1/chat/completions",  # Tambahkan `-s` untuk menyembunyikan log
-        "-H", "Content-Type: application/json",
-        "-H", f"Authorization: Bearer {api_key}",
-        "-d", json.dumps(payload)  # Gunakan json.dumps untuk memastikan JSON valid
-    ]
-
     try:
-        response = subprocess.check_output(curl_command, text=True)
-        response_json = json.loads(response)  # Parse respons JSON
-        answer = response_json.get("choices", [{}])[0].get("message", {}).get("content", "Tidak ada jawaban.")
-        return answer
-    except subprocess.CalledProcessError as e:
+        return client.chat_completion(prompt_final)["content"]
+    except LLMError as e:
         print(f"Terjadi kesalahan saat mengirim permintaan ke OpenRouter: {e}")
-    except json.JSONDecodeError:
-        print("Gagal memproses respons JSON dari LLM.")
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Menggabungkan permintaan yang datang bersamaan menjadi satu panggilan batch.
+
+    Thread latar mengambil item pertama dari antrean, lalu menunggu paling lama
+    `max_wait_ms` untuk item berikutnya (hingga `max_batch_size`) sebelum
+    memanggil `batch_fn(items)` sekali. Setiap pemanggil menerima Future untuk
+    hasilnya sendiri.
+    """
+    def __init__(self, batch_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        """
+        Args:
+            batch_fn (callable): Fungsi yang menerima list item dan mengembalikan
+                list hasil dengan urutan yang sama.
+            max_batch_size (int): Jumlah item maksimum per batch.
+            max_wait_ms (float): Waktu tunggu maksimum untuk melengkapi batch.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats = {"batches": 0, "items": 0}
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Menambahkan satu item ke antrean dan mengembalikan Future hasilnya."""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self._stats["batches"] += 1
+            self._stats["items"] += len(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Jumlah batch, jumlah item, dan rata-rata ukuran batch."""
+        stats = dict(self._stats)
+        stats["avg_batch_size"] = stats["items"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
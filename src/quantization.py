@@ -0,0 +1,70 @@
+import numpy as np
+
+# Presisi penyimpanan matriks embedding kosakata yang didukung
+PRECISIONS = ('float32', 'float16', 'int8')
+INT8_MAX = 127.0
+
+
+def quantize_rows(embeddings: np.ndarray, precision: str = 'float32'):
+    """
+    Mengubah matriks embedding float32 ternormalisasi ke presisi penyimpanan.
+
+    - float32: tanpa perubahan.
+    - float16: dibulatkan ke half precision (setengah ukuran).
+    - int8   : skala per baris, `baris ~= matrix[i] * scales[i]` dengan
+               `scales[i] = max|baris| / 127` (seperempat ukuran + 4 byte/baris).
+
+    Returns:
+        tuple: (matrix, scales). `scales` float32 [V] untuk int8, selain itu None.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Presisi tidak dikenal: '{precision}' (pilihan: {', '.join(PRECISIONS)})")
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if precision == 'float32':
+        return np.ascontiguousarray(embeddings), None
+    if precision == 'float16':
+        return embeddings.astype(np.float16), None
+
+    scales = np.abs(embeddings).max(axis=1) / INT8_MAX if len(embeddings) else np.empty(0, dtype=np.float32)
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    matrix = np.clip(np.rint(embeddings / scales[:, None]), -INT8_MAX, INT8_MAX).astype(np.int8)
+    return matrix, scales
+
+
+def precision_of(matrix: np.ndarray) -> str:
+    """Nama presisi dari dtype matriks yang tersimpan."""
+    return np.dtype(matrix.dtype).name
+
+
+def dequantize_rows(matrix: np.ndarray, scales: np.ndarray = None, ids: np.ndarray = None) -> np.ndarray:
+    """Mengembalikan baris `ids` (atau semua baris) sebagai float32."""
+    rows = matrix if ids is None else matrix[ids]
+    rows = np.asarray(rows, dtype=np.float32)
+    if scales is not None:
+        rows = rows * (scales if ids is None else scales[ids])[:, None]
+    return rows
+
+
+def score_rows(queries: np.ndarray, matrix: np.ndarray, scales: np.ndarray = None,
+               row_block_size: int = 8192) -> np.ndarray:
+    """
+    Menghitung perkalian titik query [n, d] terhadap matriks kosakata [V, d].
+
+    Matriks float32 dikalikan langsung. Matriks float16/int8 diperlebar ke
+    float32 per blok baris sehingga salinan sementara paling besar hanya
+    `row_block_size` baris; skala int8 diterapkan pada skor, bukan pada matriks.
+
+    Returns:
+        np.ndarray: Skor float32 [n, V].
+    """
+    if matrix.dtype == np.float32 and scales is None:
+        return queries @ matrix.T
+
+    scores = np.empty((len(queries), len(matrix)), dtype=np.float32)
+    for start in range(0, len(matrix), row_block_size):
+        block = np.asarray(matrix[start:start + row_block_size], dtype=np.float32)
+        block_scores = queries @ block.T
+        if scales is not None:
+            block_scores *= scales[start:start + row_block_size]
+        scores[:, start:start + len(block)] = block_scores
+    return scores
@@ -0,0 +1,139 @@
+import asyncio
+import random
+import time
+
+
+class AdaptiveRateLimiter:
+    """
+    Penjadwal permintaan LLM berbasis token bucket yang dibagi oleh semua worker.
+
+    Dua bucket dijaga sekaligus: permintaan per detik (RPS) dan token per menit
+    (TPM). Laju RPS menyesuaikan diri secara AIMD: naik sedikit demi sedikit setiap
+    permintaan berhasil dan turun setengah saat server membalas
+    429, sehingga pipeline berjalan mendekati batas provider tanpa penyetelan
+    manual. Penurunan hanya terjadi sekali per gelombang 429: respons 429 untuk
+    permintaan yang dikirim sebelum penurunan terakhir tidak menurunkan laju
+    lagi. Header Retry-After menghentikan sementara semua worker hingga waktunya lewat.
+    """
+    def __init__(self, requests_per_second: float = 2.0, max_requests_per_second: float = 20.0,
+                 min_requests_per_second: float = 0.1, tokens_per_minute: int = None,
+                 additive_increase: float = 0.05, multiplicative_decrease: float = 0.5,
+                 backoff_base_seconds: float = 1.0, backoff_max_seconds: float = 60.0):
+        """
+        Args:
+            requests_per_second (float): Laju awal permintaan per detik.
+            max_requests_per_second (float): Batas atas laju adaptif.
+            min_requests_per_second (float): Batas bawah laju adaptif.
+            tokens_per_minute (int): Anggaran token per menit (None = tanpa batas).
+            additive_increase (float): Kenaikan RPS per permintaan yang berhasil.
+            multiplicative_decrease (float): Faktor pengali RPS saat terkena 429.
+            backoff_base_seconds (float): Jeda dasar backoff eksponensial.
+            backoff_max_seconds (float): Jeda maksimum backoff.
+        """
+        self.rate = requests_per_second
+        self.max_rate = max_requests_per_second
+        self.min_rate = min_requests_per_second
+        self.tokens_per_minute = tokens_per_minute
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self._request_tokens = 1.0
+        self._budget_tokens = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        self._cooldown_until = 0.0
+        # Nomor urut permintaan: 429 dari permintaan bernomor < _decrease_ticket
+        # sudah diperhitungkan oleh penurunan laju terakhir
+        self._next_ticket = 0
+        self._decrease_ticket = 0
+        self._lock = None
+        self._stats = {"requests": 0, "successes": 0, "rate_limited": 0, "retries": 0, "waited_seconds": 0.0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._request_tokens = min(max(1.0, self.rate), self._request_tokens + elapsed * self.rate)
+        if self.tokens_per_minute:
+            self._budget_tokens = min(
+                float(self.tokens_per_minute),
+                self._budget_tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self._request_tokens < 1.0:
+            return (1.0 - self._request_tokens) / self.rate
+        if self.tokens_per_minute:
+            needed = min(float(tokens), float(self.tokens_per_minute))
+            if self._budget_tokens < needed:
+                return (needed - self._budget_tokens) * 60.0 / self.tokens_per_minute
+        return 0.0
+
+    async def acquire(self, tokens: int = 0):
+        """
+        Menunggu hingga satu permintaan dengan perkiraan `tokens` token boleh dikirim.
+
+        Worker dilayani berurutan sehingga tidak ada yang kelaparan.
+
+        Returns:
+            int: Nomor urut permintaan, untuk diteruskan ke `record_rate_limited`.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    self._request_tokens -= 1.0
+                    if self.tokens_per_minute:
+                        self._budget_tokens -= tokens
+                    self._stats["requests"] += 1
+                    self._next_ticket += 1
+                    return self._next_ticket - 1
+                self._stats["waited_seconds"] += wait
+                await asyncio.sleep(wait)
+
+    def record_success(self, estimated_tokens: int = 0, used_tokens: int = None):
+        """
+        Mencatat permintaan yang berhasil: menaikkan laju secara aditif dan
+        mengoreksi anggaran TPM dengan pemakaian token sebenarnya.
+        """
+        self._stats["successes"] += 1
+        self.rate = min(self.max_rate, self.rate + self.additive_increase)
+        if self.tokens_per_minute and used_tokens is not None:
+            self._budget_tokens -= used_tokens - estimated_tokens
+
+    def record_rate_limited(self, retry_after: float = None, attempt: int = 0, ticket: int = None):
+        """
+        Mencatat respons 429: menurunkan laju secara multiplikatif dan menjeda
+        semua worker selama Retry-After (atau backoff jika header tidak ada).
+
+        Args:
+            ticket (int): Nomor urut dari `acquire` untuk permintaan yang kena
+                429. Jika permintaan itu dikirim sebelum penurunan terakhir,
+                laju tidak diturunkan lagi (jeda tetap berlaku).
+        """
+        self._stats["rate_limited"] += 1
+        if ticket is None or ticket >= self._decrease_ticket:
+            self.rate = max(self.min_rate, self.rate * self.multiplicative_decrease)
+            self._decrease_ticket = self._next_ticket
+        self._request_tokens = min(self._request_tokens, 0.0)
+        pause = retry_after if retry_after is not None else self.backoff_delay(attempt)
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + pause)
+
+    def record_retry(self):
+        """Mencatat satu percobaan ulang."""
+        self._stats["retries"] += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Jeda backoff eksponensial dengan jitter untuk percobaan ke-`attempt` (mulai 0)."""
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def stats(self) -> dict:
+        """Mengembalikan statistik penjadwal beserta laju RPS saat ini."""
+        return {**self._stats, "current_rps": self.rate}
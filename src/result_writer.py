@@ -0,0 +1,210 @@
+import csv
+import io
+import json
+import os
+import time
+
+RESULT_COLUMNS = [
+    'row_index', 'indonesia', 'minang_ground_truth', 'hasil_terjemahan',
+    'bleu_score', 'meteor_score', 'ter_score', 'chrf_score', 'prompt_tokens'
+]
+METRIC_COLUMNS = ['bleu_score', 'meteor_score', 'ter_score', 'chrf_score']
+# Akhir baris semua file hasil (sama dengan file lama yang ditulis pandas.to_csv)
+CSV_LINE_TERMINATOR = '\n'
+# Penanda baris yang gagal diterjemahkan; baris ini diulang saat run dilanjutkan
+ERROR_TRANSLATION = "ERROR_TRANSLATION"
+
+
+def format_summary(count: int, means: dict, corpus: dict = None) -> str:
+    """
+    Menyusun teks rangkuman evaluasi untuk total_evaluation.txt.
+
+    Metrik yang tidak ada di `means` dilewati; skor tingkat korpus (jika ada)
+    ditambahkan di bagian akhir.
+    """
+    lines = [
+        ("bleu_score", "Rata-rata BLEU Score     ", "(Semakin tinggi semakin baik)"),
+        ("meteor_score", "Rata-rata METEOR Score   ", "(Semakin tinggi semakin baik)"),
+        ("ter_score", "Rata-rata TER Score      ", "(Semakin RENDAH semakin baik)"),
+        ("chrf_score", "Rata-rata ChrF Score     ", "(Semakin tinggi semakin baik)"),
+    ]
+    summary_text = (
+        "--- Rangkuman Total Evaluasi ---\n\n"
+        f"Jumlah data yang dievaluasi: {count}\n\n"
+    )
+    for column, label, note in lines:
+        if column in means:
+            summary_text += f"{label}: {means[column]:.4f} {note}\n"
+    if corpus:
+        summary_text += "\n"
+        if 'bleu' in corpus:
+            summary_text += f"Corpus BLEU Score        : {corpus['bleu']:.4f}\n"
+        if 'chrf' in corpus:
+            summary_text += f"Corpus ChrF Score        : {corpus['chrf']:.4f}\n"
+    return summary_text
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_atomic(path: str, text: str):
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
+
+class StreamingResultWriter:
+    """
+    Penulis hasil evaluasi yang hanya menambahkan baris baru (append-only).
+
+    Setiap baris langsung ditambahkan ke result.csv dan di-flush, rata-rata
+    metrik diperbarui secara inkremental untuk total_evaluation.txt, dan
+    checkpoint dicatat. Saat dijalankan ulang, baris yang sudah ada di
+    result.csv dilewati sehingga proses yang terputus dapat dilanjutkan.
+    """
+    def __init__(self, result_csv_path: str, summary_path: str, checkpoint_path: str, resume: bool = True):
+        self.result_csv_path = result_csv_path
+        self.summary_path = summary_path
+        self.checkpoint_path = checkpoint_path
+        self.completed_rows = set()
+        self.count = 0
+        self._sums = {column: 0.0 for column in METRIC_COLUMNS}
+        self._counts = {column: 0 for column in METRIC_COLUMNS}
+
+        if resume and os.path.exists(result_csv_path):
+            self._load_existing()
+        else:
+            with open(result_csv_path, 'w', encoding='utf-8', newline='') as f:
+                csv.DictWriter(f, fieldnames=RESULT_COLUMNS, lineterminator=CSV_LINE_TERMINATOR).writeheader()
+
+        self._file = open(result_csv_path, 'a', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=RESULT_COLUMNS, extrasaction='ignore',
+                                      lineterminator=CSV_LINE_TERMINATOR)
+
+    def _load_existing(self):
+        """
+        Membaca hasil yang sudah ada untuk mengisi agregat dan daftar baris selesai.
+
+        File lama tanpa kolom 'row_index' (ditulis berurutan dari baris 0)
+        dimigrasikan sekali dengan menambahkan kolom tersebut; kolom lain yang
+        belum ada (misalnya 'prompt_tokens') ditambahkan dengan nilai kosong.
+        Baris rusak (misalnya baris terakhir yang terpotong saat proses
+        dihentikan) dan baris ERROR_TRANSLATION dibuang dari file sehingga
+        baris tersebut diterjemahkan ulang.
+        """
+        with open(self.result_csv_path, 'r', encoding='utf-8', newline='') as f:
+            content = f.read()
+        reader = csv.DictReader(io.StringIO(content, newline=''))
+        fieldnames = [name.strip() for name in (reader.fieldnames or [])]
+        has_row_index = 'row_index' in fieldnames
+        rows = []
+        skipped = 0
+        last_parsed = False
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                # Lewati hanya rekaman ini (misalnya field melebihi csv.field_size_limit());
+                # pembaca melanjutkan dari baris berikutnya sehingga sisa file tetap terbaca
+                print(f"Peringatan: rekaman ke-{len(rows) + skipped + 1} di '{self.result_csv_path}' rusak dan dilewati: {e}")
+                skipped += 1
+                last_parsed = False
+                continue
+            row = {key.strip(): value for key, value in row.items() if key is not None}
+            if not has_row_index:
+                # File lama ditulis berurutan dari baris 0; rekaman rusak tetap dihitung
+                row['row_index'] = len(rows) + skipped
+            rows.append(row)
+            last_parsed = True
+        # Baris terakhir tanpa akhir baris ditulis hanya sebagian
+        if last_parsed and not content.endswith(('\n', '\r')):
+            rows.pop()
+
+        kept = [row for row in rows if self._is_complete(row, fieldnames)]
+        if (fieldnames != RESULT_COLUMNS or skipped or len(kept) != len(rows)
+                or not content.endswith(('\n', '\r'))):
+            with open(self.result_csv_path + ".tmp", 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore',
+                                        lineterminator=CSV_LINE_TERMINATOR)
+                writer.writeheader()
+                writer.writerows(kept)
+            os.replace(self.result_csv_path + ".tmp", self.result_csv_path)
+
+        for row in kept:
+            self.completed_rows.add(int(row['row_index']))
+            self._accumulate(row)
+
+    @staticmethod
+    def _is_complete(row: dict, fieldnames: list) -> bool:
+        """Baris utuh: semua kolom header terisi, row_index berupa bilangan bulat, dan terjemahan tidak gagal."""
+        if any(row.get(name) is None for name in fieldnames):
+            return False
+        try:
+            int(row['row_index'])
+        except (TypeError, ValueError):
+            return False
+        return row.get('hasil_terjemahan') != ERROR_TRANSLATION
+
+    def _accumulate(self, row: dict):
+        self.count += 1
+        for column in METRIC_COLUMNS:
+            value = _to_float(row.get(column))
+            if value is not None:
+                self._sums[column] += value
+                self._counts[column] += 1
+
+    def means(self) -> dict:
+        """Rata-rata setiap metrik atas semua baris yang tercatat."""
+        return {
+            column: self._sums[column] / self._counts[column] if self._counts[column] else float('nan')
+            for column in METRIC_COLUMNS
+        }
+
+    def write(self, row: dict):
+        """Menambahkan satu baris hasil, memperbarui rangkuman, dan mencatat checkpoint."""
+        self._writer.writerow(row)
+        self._file.flush()
+        self.completed_rows.add(int(row['row_index']))
+        self._accumulate(row)
+        self._write_summary()
+        self._write_checkpoint(int(row['row_index']))
+
+    def _write_summary(self):
+        _write_atomic(self.summary_path, format_summary(self.count, self.means()))
+
+    def _write_checkpoint(self, last_row_index: int):
+        checkpoint = {
+            "result_csv": self.result_csv_path,
+            "completed_rows": self.count,
+            "last_row_index": last_row_index,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        _write_atomic(self.checkpoint_path, json.dumps(checkpoint, indent=2))
+
+    def finalize(self):
+        """
+        Menutup file lalu mengurutkan result.csv menurut 'row_index' sekali di akhir
+        run (baris ditulis sesuai urutan selesai, bukan urutan data uji).
+        """
+        self.close()
+        with open(self.result_csv_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        rows.sort(key=lambda row: int(row['row_index']))
+        with open(self.result_csv_path + ".tmp", 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore',
+                                    lineterminator=CSV_LINE_TERMINATOR)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(self.result_csv_path + ".tmp", self.result_csv_path)
+        if self.count:
+            self._write_summary()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -1,40 +1,146 @@
-import pandas as pd
+import copy
+import io
 import re
 import numpy as np
 import os
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+from collections import OrderedDict
+
+# pandas dan sentence_transformers (beserta torch) baru diimpor saat dibutuhkan:
+# start hangat dari cache tidak membaca CSV sama sekali.
+from src.ann_index import IVFIndex, normalize_rows, top_k_from_scores
+from src.embedding_store import EmbeddingStore, file_digest
+from src.quantization import dequantize_rows, quantize_rows, score_rows
+from src.inverted_index import InvertedIndexBuilder
+from src.telemetry import telemetry
+from src.trigram_index import TrigramIndex
 
 class SemanticRetriever:
     """
     Kelas untuk melakukan pencarian semantik pada dataset kalimat paralel.
     """
-    def __init__(self, model_name: str, csv_file_path: str):
+    def __init__(self, model_name: str, csv_file_path: str,
+                 encode_batch_size: int = 256, score_block_size: int = 1024,
+                 use_ann_index: bool = False, ann_n_lists: int = None, ann_n_probe: int = 8,
+                 cache_dir: str = "model", lru_cache_size: int = 10000,
+                 embedding_precision: str = "float32", examples_per_word: int = 1,
+                 csv_chunk_size: int = 50000, vocab_encode_chunk_size: int = 8192, model=None,
+                 trigram_mode: str = None, trigram_shortlist: int = 32, trigram_min_similarity: float = 0.75):
         """
         Inisialisasi retriever.
 
         Args:
             model_name (str): Nama model SentenceTransformer yang akan digunakan.
             csv_file_path (str): Path ke file CSV.
+            encode_batch_size (int): Ukuran batch encoder saat meng-encode kata
+                (query maupun kosakata korpus).
+            score_block_size (int): Jumlah kata query yang diskor per perkalian
+                matriks, untuk membatasi memori matriks similaritas.
+            use_ann_index (bool): Gunakan indeks IVF (approximate) alih-alih
+                pemindaian penuh seluruh kosakata.
+            ann_n_lists (int): Jumlah klaster indeks IVF (default: akar kuadrat V).
+            ann_n_probe (int): Jumlah klaster yang diperiksa per query.
+            cache_dir (str): Direktori artefak embedding yang di-cache.
+            lru_cache_size (int): Kapasitas cache LRU tetangga terdekat untuk
+                kata di luar kosakata (0 = nonaktif).
+            embedding_precision (str): Presisi penyimpanan matriks embedding
+                kosakata: 'float32', 'float16', atau 'int8' (skala per baris).
+            examples_per_word (int): Jumlah contoh kalimat paling relevan
+                (peringkat BM25 terhadap query) yang dikembalikan per kata.
+            csv_chunk_size (int): Jumlah baris CSV yang dibaca per potongan saat
+                membangun indeks dari korpus.
+            vocab_encode_chunk_size (int): Jumlah kata kosakata baru yang
+                di-encode dan ditulis ke disk per potongan.
+            model: Encoder siap pakai dengan metode `encode(kata, batch_size=...,
+                show_progress_bar=...)` sebagai pengganti SentenceTransformer
+                (misalnya encoder hash deterministik untuk benchmark offline).
+                Artefak cache tetap dikunci dengan `model_name`.
+            trigram_mode (str): Pemakaian indeks trigram karakter untuk kata di
+                luar kosakata: None (nonaktif), 'first_stage' (varian ejaan yang
+                cukup mirip dipetakan tanpa encoder), atau 'rerank' (encoder
+                hanya membandingkan dengan shortlist kandidat trigram).
+            trigram_shortlist (int): Jumlah kandidat trigram per kata.
+            trigram_min_similarity (float): Kemiripan edit minimum agar
+                'first_stage' menerima kandidat; skornya menjadi skor similaritas.
         """
         self.model_name = model_name
-        self.model = self._load_sbert_model()
-        
-        self.df = self._load_data(csv_file_path)
-        self.word_to_sentence_map = {}
+        self.encode_batch_size = encode_batch_size
+        self.score_block_size = score_block_size
+        self.use_ann_index = use_ann_index
+        self.ann_n_lists = ann_n_lists
+        self.ann_n_probe = ann_n_probe
+        self.ann_index = None
+        self.embedding_precision = embedding_precision
+        self.examples_per_word = examples_per_word
+        self.csv_chunk_size = csv_chunk_size
+        self.vocab_encode_chunk_size = vocab_encode_chunk_size
+        if trigram_mode not in (None, 'first_stage', 'rerank'):
+            raise ValueError(f"trigram_mode tidak dikenal: '{trigram_mode}' (pilihan: None, 'first_stage', 'rerank')")
+        self.trigram_mode = trigram_mode
+        self.trigram_shortlist = trigram_shortlist
+        self.trigram_min_similarity = trigram_min_similarity
+        self._trigram_index = None
+        self._trigram_lock = threading.Lock()
+        self.embedding_store = EmbeddingStore(model_name, root_dir=cache_dir)
+        self.lru_cache_size = lru_cache_size
+        self._neighbour_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "lru_hits": 0, "lru_misses": 0, "trigram_hits": 0, "encoder_calls": 0}
+        # Model dimuat saat pertama kali dibutuhkan (lihat properti `model`)
+        self._model = model
+        self._model_loaded = model is not None
+        self._model_lock = threading.Lock()
+        self._ingest_lock = threading.Lock()
+
+        self.csv_file_path = csv_file_path
+        self._corpus_digest = self._hash_corpus(csv_file_path)
+        self.corpus_hash = self._corpus_digest.hexdigest()
+        self.index = None
         self.vocab_list = []
         self.corpus_embeddings = np.array([])
+        self.corpus_scales = None
 
-        if not self.df.empty:
-            self._preprocess_data()
-            self._generate_corpus_embeddings()
-        else:
-            print("Peringatan: DataFrame kosong, tidak ada data yang diproses.")
+        # Warm start: artefak yang valid memuat indeks dan embedding tanpa membaca CSV
+        with telemetry.timer("retriever.cache_load"):
+            loaded = self._load_from_cache()
+        if not loaded:
+            with telemetry.timer("retriever.corpus_build"):
+                self._build_from_csv()
+
+    @property
+    def model(self):
+        """
+        Model encoder, dimuat sekali saat pertama kali diakses.
+
+        Start hangat yang hanya menjumpai kata di kosakata tidak pernah
+        memuat sentence_transformers/torch. Bernilai None jika gagal dimuat.
+        """
+        if not self._model_loaded:
+            with self._model_lock:
+                if not self._model_loaded:
+                    with telemetry.timer("retriever.model_load"):
+                        self._model = self._load_sbert_model()
+                    self._model_loaded = True
+        return self._model
+
+    @property
+    def trigram_index(self) -> TrigramIndex:
+        """Indeks trigram atas kosakata, dibangun saat pertama kali dibutuhkan dan setelah kosakata bertambah."""
+        vocab_list = self.vocab_list
+        trigram_index = self._trigram_index
+        if trigram_index is None or len(trigram_index) != len(vocab_list):
+            with self._trigram_lock:
+                trigram_index = self._trigram_index
+                if trigram_index is None or len(trigram_index) != len(vocab_list):
+                    with telemetry.timer("retriever.trigram_build"):
+                        trigram_index = self._trigram_index = TrigramIndex(vocab_list)
+        return trigram_index
 
     def _load_sbert_model(self):
         """Memuat model SentenceTransformer."""
         try:
             print(f"Memuat model SentenceTransformer: {self.model_name}...")
+            from sentence_transformers import SentenceTransformer
             model = SentenceTransformer(self.model_name)
             print("Model berhasil dimuat.")
             return model
@@ -42,15 +148,250 @@ class SemanticRetriever:
             print(f"Gagal memuat model SentenceTransformer '{self.model_name}': {e}")
             return None
 
-    def _load_data(self, csv_file_path: str):
-        """Memuat data dari file CSV atau mengembalikan error jika gagal."""
+    def _hash_corpus(self, csv_file_path: str):
+        """Menghitung hash file korpus (objek SHA-256) untuk memvalidasi artefak cache."""
         try:
-            print(f"Mencoba memuat data dari: {csv_file_path}")
-            return pd.read_csv(csv_file_path)
+            return file_digest(csv_file_path)
         except FileNotFoundError:
             raise FileNotFoundError(f"File '{csv_file_path}' tidak ditemukan.")
+
+    def _load_from_cache(self) -> bool:
+        """
+        Memuat kosakata, indeks terbalik, dan embedding dari artefak cache.
+
+        Returns:
+            bool: True jika artefak valid dan berhasil dimuat.
+        """
+        cached = self.embedding_store.load(self.corpus_hash, self.embedding_precision)
+        appended_from = None
+        if cached is None:
+            # Korpus yang hanya bertambah baris di akhir cukup diperbarui secara inkremental
+            extended = self.embedding_store.extended_corpus(self.csv_file_path)
+            if extended is not None:
+                stored_hash, appended_from = extended
+                cached = self.embedding_store.load(stored_hash, self.embedding_precision)
+        if cached is None:
+            if os.path.exists(self.embedding_store.meta_path):
+                print("Cache embedding usang (korpus, model, atau presisi berubah), data diproses ulang.")
+            return False
+
+        embeddings, scales, vocab_list = cached
+        index = self.embedding_store.load_index(vocab_list)
+        if index is None:
+            return False
+
+        print(f"Memuat indeks dan embedding dari cache: {self.embedding_store.directory}")
+        self.index = index
+        self.vocab_list = vocab_list
+        self.corpus_embeddings = embeddings
+        self.corpus_scales = scales
+        self._prepare_search_structures(normalized=True)
+        if appended_from is not None:
+            indonesian, minangkabau = self._load_appended_rows(appended_from)
+            print(f"Korpus bertambah {len(indonesian)} kalimat sejak cache dibuat, memperbarui secara inkremental...")
+            self._ingest(indonesian, minangkabau)
+        return True
+
+    def _iter_csv_chunks(self):
+        """Membaca file CSV korpus per potongan `csv_chunk_size` baris."""
+        import pandas as pd
+        try:
+            print(f"Mencoba memuat data dari: {self.csv_file_path}")
+            yield from pd.read_csv(self.csv_file_path, usecols=['indonesian', 'minangkabau'],
+                                   chunksize=self.csv_chunk_size)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File '{self.csv_file_path}' tidak ditemukan.")
+        except Exception as e:
+            raise Exception(f"Error saat memuat file CSV '{self.csv_file_path}': {e}")
+
+    def _encode_vocab(self, words: list):
+        """Meng-encode kata kosakata menjadi baris ternormalisasi dalam presisi penyimpanan."""
+        embeddings = self.model.encode(words, batch_size=self.encode_batch_size, show_progress_bar=False)
+        return quantize_rows(normalize_rows(embeddings), self.embedding_precision)
+
+    def _build_from_csv(self):
+        """
+        Membangun indeks terbalik dan embedding kosakata dengan membaca CSV per potongan.
+
+        Teks kalimat langsung ditulis ke TextStore di direktori artefak dan kata
+        baru di-encode per `vocab_encode_chunk_size` kata lalu ditambahkan ke
+        embeddings.npy, sehingga memori puncak tidak bergantung pada ukuran
+        teks korpus; yang tetap di memori hanya postings, kosakata, dan skala int8.
+        """
+        print("Memulai pra-pemrosesan data...")
+        self.embedding_store.invalidate()
+        builder = InvertedIndexBuilder(self.embedding_store.directory)
+        chunk_size = self.vocab_encode_chunk_size
+        encoder_ok = self.model is not None
+        pending = []
+        scales = []
+        written = 0
+        for chunk in self._iter_csv_chunks():
+            with telemetry.timer("retriever.csv_chunk"):
+                pending.extend(builder.add_chunk(chunk['indonesian'], chunk['minangkabau']))
+            while encoder_ok and len(pending) >= chunk_size:
+                encoder_ok = self._write_vocab_rows(pending[:chunk_size], scales, reset=written == 0)
+                written += chunk_size
+                pending = pending[chunk_size:]
+            if encoder_ok and written:
+                print(f"Embedding kosakata: {written} kata di-encode ({builder.n_sentences} kalimat dibaca).")
+        if encoder_ok and pending:
+            encoder_ok = self._write_vocab_rows(pending, scales, reset=written == 0)
+
+        if builder.n_sentences == 0:
+            print("Peringatan: file CSV kosong, tidak ada data yang diproses.")
+            return
+        self.index = builder.build()
+        self.vocab_list = self.index.vocab_list
+        print(f"Pra-pemrosesan selesai. Ukuran kosakata: {len(self.vocab_list)} kata unik.")
+
+        if not encoder_ok or not self.vocab_list:
+            print("Kosakata atau model tidak tersedia, embedding tidak dibuat.")
+            return
+        self.corpus_embeddings, self.corpus_scales = self.embedding_store.commit(
+            self.vocab_list, self.corpus_hash, self.csv_file_path, index=self.index,
+            scales=np.concatenate(scales) if scales else None
+        )
+        print(f"Embedding disimpan ke: {self.embedding_store.directory}")
+        self._prepare_search_structures(normalized=True)
+        print("Pembuatan embedding korpus selesai.")
+
+    def _write_vocab_rows(self, words: list, scales: list, reset: bool) -> bool:
+        """
+        Meng-encode satu potongan kata baru dan menambahkannya ke embeddings.npy.
+
+        Returns:
+            bool: False jika encoding atau penulisan gagal.
+        """
+        try:
+            with telemetry.timer("retriever.vocab_encode"):
+                rows, row_scales = self._encode_vocab(words)
+            self.embedding_store.write_rows(rows, reset=reset)
         except Exception as e:
-            raise Exception(f"Error saat memuat file CSV '{csv_file_path}': {e}")
+            print(f"Error saat membuat embedding korpus: {e}")
+            return False
+        if row_scales is not None:
+            scales.append(row_scales)
+        return True
+
+    def _load_appended_rows(self, offset: int):
+        """Membaca baris CSV mulai dari offset byte `offset` (memakai header file)."""
+        import pandas as pd
+        with open(self.csv_file_path, 'rb') as f:
+            header = f.readline()
+            f.seek(offset)
+            df = pd.read_csv(io.BytesIO(header + f.read()))
+        return df['indonesian'].tolist(), df['minangkabau'].tolist()
+
+    def _append_rows_to_csv(self, pairs: list) -> int:
+        """
+        Menambahkan pasangan kalimat di akhir file CSV korpus dengan header yang sama.
+
+        Returns:
+            int: Ukuran file (byte) sebelum penambahan, untuk membatalkannya.
+        """
+        import csv
+        with open(self.csv_file_path, 'r', newline='', encoding='utf-8') as f:
+            fieldnames = next(csv.reader(f))
+        with open(self.csv_file_path, 'rb') as f:
+            original_size = f.seek(0, os.SEEK_END)
+            needs_newline = False
+            if original_size > 0:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        with open(self.csv_file_path, 'a', newline='', encoding='utf-8') as f:
+            if needs_newline:
+                f.write('\n')
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval='', extrasaction='ignore', lineterminator='\n')
+            writer.writerows(pairs)
+        return original_size
+
+    def _extend_corpus_hash(self, offset: int):
+        """Memperbarui hash korpus dengan byte yang ditambahkan setelah offset `offset` saja."""
+        digest = self._corpus_digest.copy()
+        with open(self.csv_file_path, 'rb') as f:
+            f.seek(offset)
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self._corpus_digest = digest
+        self.corpus_hash = digest.hexdigest()
+
+    def add_pairs(self, pairs: list) -> dict:
+        """
+        Menambahkan pasangan kalimat paralel baru tanpa meng-encode ulang kosakata.
+
+        Pasangan ditambahkan di akhir file CSV korpus, postings dan bobot BM25
+        diperbarui, dan hanya kata yang belum ada di kosakata yang di-encode lalu
+        ditambahkan ke artefak embedding (dan indeks IVF jika aktif). Biayanya
+        sebanding dengan jumlah data baru, bukan ukuran korpus. Jika pembaruan
+        indeks atau embedding gagal, penambahan ke file CSV dibatalkan.
+
+        Args:
+            pairs (list): Daftar dict berkunci 'indonesian' dan 'minangkabau'.
+
+        Returns:
+            dict: Jumlah kalimat yang ditambahkan dan kata baru yang di-encode.
+        """
+        if self.index is None:
+            raise RuntimeError("Retriever belum memiliki indeks korpus; tambahkan data ke CSV lalu bangun ulang.")
+        pairs = [pair for pair in pairs if isinstance(pair.get('indonesian'), str)]
+        if not pairs:
+            return {"sentences": 0, "new_words": 0}
+
+        with self._ingest_lock:
+            digest = self._corpus_digest
+            original_size = self._append_rows_to_csv(pairs)
+            try:
+                self._extend_corpus_hash(original_size)
+                new_words = self._ingest([pair['indonesian'] for pair in pairs],
+                                         [pair.get('minangkabau', '') for pair in pairs])
+            except BaseException:
+                # CSV tidak boleh mendahului artefak embedding: batalkan penambahan
+                with open(self.csv_file_path, 'r+b') as f:
+                    f.truncate(original_size)
+                self._corpus_digest = digest
+                self.corpus_hash = digest.hexdigest()
+                raise
+        return {"sentences": len(pairs), "new_words": new_words}
+
+    def _ingest(self, indonesian: list, minangkabau: list) -> int:
+        """
+        Memperbarui indeks, embedding, dan artefak cache dengan kalimat-kalimat baru.
+
+        Indeks dan matriks baru dibangun di samping yang lama lalu ditukar
+        (indeks lebih dulu), sehingga pencarian yang sedang berjalan tetap
+        melihat keadaan yang konsisten.
+
+        Returns:
+            int: Jumlah kata baru yang di-encode.
+        """
+        index, new_words = self.index.extend(indonesian, minangkabau)
+        new_rows = np.empty((0,) + self.corpus_embeddings.shape[1:], dtype=self.corpus_embeddings.dtype)
+        scales = self.corpus_scales
+        if new_words:
+            if self.model is None:
+                raise RuntimeError("Model encoder tidak tersedia, kata baru tidak dapat di-encode.")
+            new_rows, new_scales = self._encode_vocab(new_words)
+            if scales is not None:
+                scales = np.concatenate((scales, new_scales))
+
+        corpus_embeddings, scales = self.embedding_store.append(
+            new_rows, index.vocab_list, self.corpus_hash, self.csv_file_path, index=index, scales=scales
+        )
+        ann_index = None
+        if self.ann_index is not None:
+            ann_index = copy.copy(self.ann_index).add(corpus_embeddings, scales)
+
+        self.index = index
+        self.vocab_list = index.vocab_list
+        self.corpus_embeddings, self.corpus_scales = corpus_embeddings, scales
+        if ann_index is not None:
+            self.ann_index = ann_index
+        # Tetangga terdekat yang di-cache bisa kalah dari kata baru
+        self.clear_cache()
+        print(f"{len(indonesian)} kalimat ditambahkan, {len(new_words)} kata baru di-encode "
+              f"(kosakata: {len(self.vocab_list)} kata).")
+        return len(new_words)
 
     def _preprocess_text(self, text: str) -> str:
         """Membersihkan teks: lowercase dan hapus tanda baca."""
@@ -60,90 +401,329 @@ class SemanticRetriever:
             return text
         return ""
 
-    def _preprocess_data(self):
-        """Melakukan pra-pemrosesan pada kolom 'indonesian' dan membangun kosakata."""
-        print("Memulai pra-pemrosesan data...")
-        self.df['indonesian_preprocessed'] = self.df['indonesian'].apply(self._preprocess_text)
-        
-        vocabulary_set = set()
-        for _, row in self.df.iterrows():
-            words = row['indonesian_preprocessed'].split()
+    def _prepare_search_structures(self, normalized: bool = False):
+        """
+        Menyimpan embedding korpus ternormalisasi L2 (dalam presisi
+        `embedding_precision`) sehingga similaritas kosinus cukup dihitung
+        dengan perkalian titik, lalu membangun indeks ANN jika diminta.
+
+        Args:
+            normalized (bool): True jika embedding sudah ternormalisasi dan
+                terkuantisasi (misalnya dimuat dari cache), agar matriks
+                memory-mapped tidak disalin.
+        """
+        if not normalized:
+            self.corpus_embeddings, self.corpus_scales = quantize_rows(
+                normalize_rows(self.corpus_embeddings), self.embedding_precision
+            )
+        if self.use_ann_index:
+            print("Membangun indeks IVF untuk kosakata...")
+            self.ann_index = IVFIndex(n_lists=self.ann_n_lists, n_probe=self.ann_n_probe)
+            self.ann_index.build(self.corpus_embeddings, self.corpus_scales)
+            print(f"Indeks IVF selesai dibangun ({len(self.ann_index.centroids)} klaster).")
+
+    def search(self, query_embeddings: np.ndarray, top_k: int = 1):
+        """
+        Mencari top-k kata korpus terdekat untuk setiap embedding query.
+
+        Args:
+            query_embeddings (np.ndarray): Matriks embedding query [n, d].
+            top_k (int): Jumlah kandidat per query.
+
+        Returns:
+            tuple: (indeks [n, k], skor kosinus [n, k]), terurut menurun.
+                Slot tanpa kandidat bernilai -1 dengan skor -inf.
+        """
+        queries = normalize_rows(query_embeddings)
+        if self.ann_index is not None:
+            return self.ann_index.search(queries, top_k)
+
+        k = min(top_k, len(self.corpus_embeddings))
+        result_idx = np.full((len(queries), top_k), -1, dtype=np.int64)
+        result_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        for start in range(0, len(queries), self.score_block_size):
+            block = queries[start:start + self.score_block_size]
+            similarities = score_rows(block, self.corpus_embeddings, self.corpus_scales)
+            block_idx, block_scores = top_k_from_scores(similarities, k)
+            result_idx[start:start + len(block), :k] = block_idx
+            result_scores[start:start + len(block), :k] = block_scores
+        return result_idx, result_scores
+
+    def _match_words(self, words: list, min_score: float = 0.0) -> dict:
+        """
+        Mencari kata korpus yang paling mirip untuk sekumpulan kata unik sekaligus.
+
+        Pencarian berjenjang:
+            1. Kata yang ada persis di kosakata langsung dipetakan lewat hash map
+               dengan similaritas 1.0 tanpa memanggil encoder.
+            2. Kata di luar kosakata dicari di cache LRU tetangga terdekat.
+            3. Dengan `trigram_mode='first_stage'`, varian ejaan yang cukup mirip
+               dengan kata kosakata dipetakan lewat indeks trigram. Kemiripan
+               edit di bawah `min_score` (ambang similaritas pemanggil) tidak
+               diterima; kata tersebut tetap diteruskan ke encoder.
+            4. Sisanya di-encode dalam satu panggilan model lalu diskor terhadap
+               korpus lewat `search` (perkalian titik per blok atau indeks ANN),
+               atau hanya terhadap shortlist trigram jika `trigram_mode='rerank'`.
+
+        Args:
+            words (list): Kata-kata unik query.
+            min_score (float): Skor terendah yang akan diterima pemanggil.
+
+        Returns:
+            dict: Pemetaan kata -> (indeks kata korpus, skor similaritas).
+        """
+        matches = {}
+        pending = []
+        lru_hits = 0
+        vocab_to_id = self.index.vocab_to_id
+        with self._cache_lock:
             for word in words:
-                if not word: continue
-                vocabulary_set.add(word)
-                if word not in self.word_to_sentence_map:
-                    self.word_to_sentence_map[word] = []
-                self.word_to_sentence_map[word].append({
-                    "indonesian": row['indonesian'],
-                    "minangkabau": row['minangkabau']
-                })
-        self.vocab_list = sorted(list(vocabulary_set))
-        print(f"Pra-pemrosesan selesai. Ukuran kosakata: {len(self.vocab_list)} kata unik.")
+                word_id = vocab_to_id.get(word)
+                if word_id is not None:
+                    matches[word] = (word_id, 1.0)
+                elif word in self._neighbour_cache:
+                    self._neighbour_cache.move_to_end(word)
+                    matches[word] = self._neighbour_cache[word]
+                    lru_hits += 1
+                else:
+                    pending.append(word)
+            self._stats["exact_hits"] += len(matches) - lru_hits
+            self._stats["lru_hits"] += lru_hits
+            self._stats["lru_misses"] += len(pending)
+        telemetry.incr("retriever.exact_hits", len(matches) - lru_hits)
+        telemetry.incr("retriever.lru_hits", lru_hits)
+        telemetry.incr("retriever.lru_misses", len(pending))
 
-    def _save_embeddings(self, embeddings: np.ndarray, file_name: str):
-        """Menyimpan embedding ke file."""
-        model_dir = "model"
-        os.makedirs(model_dir, exist_ok=True)
-        file_path = os.path.join(model_dir, file_name)
-        np.save(file_path, embeddings)
-        print(f"Embedding disimpan ke: {file_path}")
-
-    def _load_embeddings(self, file_name: str) -> np.ndarray:
-        """Memuat embedding dari file."""
-        model_dir = "model"
-        file_path = os.path.join(model_dir, file_name)
-        if os.path.exists(file_path):
-            print(f"Memuat embedding dari file: {file_path}")
-            return np.load(file_path)
-        return np.array([])
-
-    def _generate_corpus_embeddings(self):
-        """Membuat atau memuat embedding untuk seluruh kosakata."""
-        embeddings_file = f"{self.model_name}_embeddings.npy"
-        
-        self.corpus_embeddings = self._load_embeddings(embeddings_file)
-        if self.corpus_embeddings.size > 0:
-            return
+        if pending and self.trigram_mode == 'first_stage':
+            pending = self._match_spelling_variants(pending, matches, min_score)
+        if not pending or self.model is None:
+            return matches
 
-        if not self.vocab_list or not self.model:
-            print("Kosakata atau model tidak tersedia, embedding tidak dibuat.")
-            return
+        with telemetry.timer("retriever.encode"):
+            query_embeddings = self.model.encode(
+                pending, batch_size=self.encode_batch_size, show_progress_bar=False
+            )
+        with telemetry.timer("retriever.search"):
+            if self.trigram_mode == 'rerank':
+                best_idx, best_scores = self._search_shortlists(pending, query_embeddings)
+            else:
+                best_idx, best_scores = self.search(query_embeddings, top_k=1)
+        telemetry.record("retriever.encoded_words", len(pending))
 
-        print("Membuat embedding untuk kosakata...")
-        try:
-            self.corpus_embeddings = self.model.encode(self.vocab_list, show_progress_bar=True)
-            self._save_embeddings(self.corpus_embeddings, embeddings_file)
-            print("Pembuatan embedding korpus selesai.")
-        except Exception as e:
-            print(f"Error saat membuat embedding korpus: {e}")
-            self.corpus_embeddings = np.array([])
+        with self._cache_lock:
+            self._stats["encoder_calls"] += 1
+            for word, idx, score in zip(pending, best_idx[:, 0], best_scores[:, 0]):
+                if idx < 0:
+                    continue
+                matches[word] = (int(idx), float(score))
+                self._remember_neighbour(word, matches[word])
+        return matches
 
-    def retrieve(self, query: str, similarity_threshold: float) -> dict:
+    def _remember_neighbour(self, word: str, match: tuple):
+        """Menyimpan tetangga terdekat kata ke cache LRU (dipanggil dengan `_cache_lock`)."""
+        if self.lru_cache_size > 0:
+            self._neighbour_cache[word] = match
+            if len(self._neighbour_cache) > self.lru_cache_size:
+                self._neighbour_cache.popitem(last=False)
+
+    def _match_spelling_variants(self, words: list, matches: dict, min_score: float = 0.0) -> list:
         """
-        Mencari setiap kata dalam query secara semantik dan mengembalikan contoh kalimat.
+        Memetakan kata yang ejaannya cukup mirip dengan kata kosakata (kemiripan
+        edit >= `trigram_min_similarity` dan >= `min_score`) tanpa encoder.
+
+        Kemiripan edit menjadi skor similaritas kata, sehingga kata yang di
+        bawah ambang pemanggil dibiarkan untuk encoder alih-alih terbuang oleh
+        saringan ambang. Hasil trigram tidak disimpan di cache LRU karena
+        diterima-tidaknya bergantung pada ambang tiap panggilan.
+
+        Returns:
+            list: Kata yang belum terpetakan dan masih perlu di-encode.
         """
-        if not self.model or self.corpus_embeddings.size == 0:
-            print("Model atau embedding korpus tidak tersedia. Pencarian dibatalkan.")
+        min_similarity = max(self.trigram_min_similarity, min_score)
+        resolved = {}
+        with telemetry.timer("retriever.trigram"):
+            trigram_index = self.trigram_index
+            for word in words:
+                word_id, score = trigram_index.best_match(word, self.trigram_shortlist, min_similarity)
+                if word_id >= 0 and score >= min_similarity:
+                    resolved[word] = (word_id, score)
+        telemetry.incr("retriever.trigram_hits", len(resolved))
+
+        with self._cache_lock:
+            self._stats["trigram_hits"] += len(resolved)
+        matches.update(resolved)
+        return [word for word in words if word not in resolved]
+
+    def _search_shortlists(self, words: list, query_embeddings: np.ndarray):
+        """
+        Seperti `search(top_k=1)`, tetapi setiap kata hanya dibandingkan dengan
+        shortlist kandidat trigramnya; kata tanpa kandidat memakai `search` biasa.
+        """
+        queries = normalize_rows(query_embeddings)
+        best_idx = np.full((len(words), 1), -1, dtype=np.int64)
+        best_scores = np.full((len(words), 1), -np.inf, dtype=np.float32)
+        trigram_index = self.trigram_index
+        fallback = []
+        for i, word in enumerate(words):
+            ids, _ = trigram_index.candidates(word, self.trigram_shortlist)
+            if len(ids) == 0:
+                fallback.append(i)
+                continue
+            scores = dequantize_rows(self.corpus_embeddings, self.corpus_scales, ids) @ queries[i]
+            best = int(np.argmax(scores))
+            best_idx[i, 0], best_scores[i, 0] = ids[best], scores[best]
+        if fallback:
+            best_idx[fallback], best_scores[fallback] = self.search(queries[fallback], top_k=1)
+        return best_idx, best_scores
+
+    def clear_cache(self):
+        """Mengosongkan cache LRU tetangga terdekat."""
+        with self._cache_lock:
+            self._neighbour_cache.clear()
+
+    def cache_stats(self) -> dict:
+        """
+        Mengembalikan statistik jenjang pencarian kata.
+
+        Returns:
+            dict: Jumlah exact hit, LRU hit/miss, panggilan encoder, ukuran cache,
+                dan rasio kata yang terselesaikan tanpa encoder.
+        """
+        with self._cache_lock:
+            stats = dict(self._stats)
+            stats["lru_size"] = len(self._neighbour_cache)
+        total = stats["exact_hits"] + stats["lru_hits"] + stats["lru_misses"]
+        resolved = stats["exact_hits"] + stats["lru_hits"] + stats["trigram_hits"]
+        stats["hit_rate"] = resolved / total if total else 0.0
+        return stats
+
+    def _build_result(self, query_words: list, matches: dict, similarity_threshold: float) -> dict:
+        """
+        Menyusun hasil pencarian untuk satu query dari hasil pencocokan kata.
+
+        Kata korpus hasil pencocokan semantik menjadi term query BM25 dengan bobot
+        similaritasnya, sehingga kalimat yang memuat lebih banyak (dan lebih
+        jarang) kata query mendapat peringkat lebih tinggi. Setiap kata lalu
+        mengambil `examples_per_word` kalimat teratas yang memuat kata korpusnya;
+        kalimat yang sudah dipakai (teks sama) dilewati, dan kata dengan postings
+        paling sedikit memilih lebih dulu.
+        """
+        accepted = {}
+        term_weights = {}
+        for word in query_words:
+            if not word or word not in matches: continue
+
+            most_similar_idx, score = matches[word]
+            if score >= similarity_threshold:
+                accepted[word] = (most_similar_idx, score)
+                term_weights[most_similar_idx] = term_weights.get(most_similar_idx, 0.0) + score
+        if not accepted:
             return {}
 
-        query_words = self._preprocess_text(query).split()
+        candidates, sentence_scores = self.index.score_sentences(list(term_weights), list(term_weights.values()))
+
+        used = set()
+        selected = {}
+        for word in sorted(accepted, key=lambda word: len(self.index.postings(accepted[word][0]))):
+            ranked = self.index.rank_postings(accepted[word][0], candidates, sentence_scores)
+            if len(ranked) == 0:
+                continue
+            fresh = []
+            for sentence_id in ranked.tolist():
+                text = self.index.indonesian[sentence_id]
+                if text not in used:
+                    used.add(text)
+                    fresh.append(sentence_id)
+                    if len(fresh) >= self.examples_per_word:
+                        break
+            selected[word] = (int(ranked[0]), fresh)
+
         results = {}
+        for word, (most_similar_idx, score) in accepted.items():
+            if word not in selected:
+                continue
+            best_sentence, fresh = selected[word]
+            results[word] = {
+                "found_word_in_corpus": self.vocab_list[most_similar_idx],
+                "similarity_score": score,
+                "retrieved_example": self.index.sentence_pair(fresh[0] if fresh else best_sentence),
+                "examples": [self.index.sentence_pair(sentence_id) for sentence_id in fresh],
+            }
+        return results
 
-        for word in query_words:
-            if not word: continue
-            
-            query_embedding = self.model.encode([word])
-            similarities = cosine_similarity(query_embedding, self.corpus_embeddings)
-            most_similar_idx = np.argmax(similarities)
-            
-            if similarities[0, most_similar_idx] >= similarity_threshold:
-                found_word = self.vocab_list[most_similar_idx]
-                all_examples = self.word_to_sentence_map.get(found_word, [])
-                
-                if all_examples:
-                    results[word] = {
-                        "found_word_in_corpus": found_word,
-                        "similarity_score": float(similarities[0, most_similar_idx]),
-                        "retrieved_example": all_examples[0]
-                    }
-        return results
\ No newline at end of file
+    def retrieve_many(self, queries: list, similarity_threshold: float) -> list:
+        """
+        Versi batch dari `retrieve` untuk banyak query sekaligus.
+
+        Kata-kata unik dari seluruh query di-encode dalam satu panggilan model
+        sehingga biaya batching encoder hanya dibayar sekali per kelompok query.
+
+        Args:
+            queries (list): Daftar kalimat query.
+            similarity_threshold (float): Ambang batas skor similaritas.
+
+        Returns:
+            list: Daftar dict hasil, satu per query, dengan urutan yang sama.
+        """
+        if self.corpus_embeddings.size == 0:
+            print("Model atau embedding korpus tidak tersedia. Pencarian dibatalkan.")
+            return [{} for _ in queries]
+
+        with telemetry.timer("retriever.retrieve_many"):
+            tokenized_queries = [self._preprocess_text(query).split() for query in queries]
+            unique_words = list(dict.fromkeys(
+                word for words in tokenized_queries for word in words if word
+            ))
+            matches = self._match_words(unique_words, similarity_threshold)
+
+            with telemetry.timer("retriever.rank_examples"):
+                return [
+                    self._build_result(words, matches, similarity_threshold)
+                    for words in tokenized_queries
+                ]
+
+    def retrieve_sweep(self, queries: list, thresholds: list) -> list:
+        """
+        Hasil `retrieve_many` untuk beberapa ambang similaritas sekaligus.
+
+        Kata query dicocokkan (dan di-encode) sekali; ambang hanya menyaring
+        kata mana yang diterima. Ambang yang menerima kumpulan kata yang sama
+        berbagi satu dict hasil, sehingga peringkat contoh dihitung sekali per
+        kumpulan kata yang berbeda.
+
+        Args:
+            queries (list): Daftar kalimat query.
+            thresholds (list): Daftar ambang batas skor similaritas.
+
+        Returns:
+            list: Per query, daftar dict hasil sesuai urutan `thresholds`.
+        """
+        if self.corpus_embeddings.size == 0:
+            print("Model atau embedding korpus tidak tersedia. Pencarian dibatalkan.")
+            return [[{} for _ in thresholds] for _ in queries]
+
+        with telemetry.timer("retriever.retrieve_sweep"):
+            tokenized_queries = [self._preprocess_text(query).split() for query in queries]
+            unique_words = list(dict.fromkeys(
+                word for words in tokenized_queries for word in words if word
+            ))
+            # Hasil trigram harus lolos ambang tertinggi; sisanya memakai skor encoder
+            matches = self._match_words(unique_words, max(thresholds, default=0.0))
+
+            sweep = []
+            for words in tokenized_queries:
+                by_accepted = {}
+                row = []
+                for threshold in thresholds:
+                    accepted = tuple(word for word in words if word in matches and matches[word][1] >= threshold)
+                    if accepted not in by_accepted:
+                        by_accepted[accepted] = self._build_result(words, matches, threshold)
+                    row.append(by_accepted[accepted])
+                sweep.append(row)
+            return sweep
+
+    def retrieve(self, query: str, similarity_threshold: float) -> dict:
+        """
+        Mencari setiap kata dalam query secara semantik dan mengembalikan contoh kalimat.
+        """
+        return self.retrieve_many([query], similarity_threshold)[0]
@@ -1,4 +1,14 @@
-from rouge_score import rouge_scorer
+# Scorer dibuat sekali (saat pertama kali dipakai) dan dipakai ulang untuk setiap pasangan
+_scorer = None
+
+
+def _get_scorer():
+    global _scorer
+    if _scorer is None:
+        from rouge_score import rouge_scorer
+        _scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
+    return _scorer
+
 
 def calculate_rouge(reference, candidate):
     """
@@ -11,8 +21,7 @@ def calculate_rouge(reference, candidate):
     Returns:
         dict: Skor ROUGE-1, ROUGE-2, dan ROUGE-L.
     """
-    scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-    scores = scorer.score(reference, candidate)
+    scores = _get_scorer().score(reference, candidate)
     return {
         "rouge-1": scores['rouge1'].fmeasure,
         "rouge-2": scores['rouge2'].fmeasure,
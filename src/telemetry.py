@@ -0,0 +1,188 @@
+import json
+import math
+import os
+import threading
+import time
+
+import config
+
+# Histogram memakai bucket logaritmik: setiap bucket 5% lebih lebar dari
+# sebelumnya, sehingga persentil akurat sekitar ±2.5% dengan memori kecil
+# (hanya bucket yang terisi yang disimpan) dan biaya rekam O(1).
+BUCKET_GROWTH = 1.05
+MIN_VALUE = 1e-6
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """Distribusi nilai positif (durasi detik, jumlah token, ...) dalam bucket logaritmik."""
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = {}
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        bucket = int(math.log(value / MIN_VALUE) / _LOG_GROWTH) if value > MIN_VALUE else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """Perkiraan persentil ke-q (titik tengah geometris bucket, dibatasi min/max)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                value = MIN_VALUE * BUCKET_GROWTH ** (bucket + 0.5)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0) -> dict:
+        summary = {"count": self.count, "mean": self.total / self.count * scale if self.count else 0.0}
+        for q in PERCENTILES:
+            summary[f"p{q}"] = self.percentile(q) * scale
+        summary["max"] = self.max * scale
+        return summary
+
+
+class _Timer:
+    __slots__ = ("telemetry", "stage", "start")
+
+    def __init__(self, telemetry, stage: str):
+        self.telemetry = telemetry
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.telemetry.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Telemetry:
+    """
+    Pencatat latensi per tahap, distribusi nilai, dan counter untuk satu proses.
+
+    Dipakai bersama oleh retriever, pembuat prompt, klien LLM, dan metrik lewat
+    objek `telemetry` di modul ini. Setiap pencatatan hanya berupa satu
+    `perf_counter`, satu lock, dan satu increment bucket, sehingga cukup murah
+    untuk tetap aktif di produksi; `enabled=False` menjadikan semuanya no-op.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Mengosongkan semua catatan (misalnya di awal run)."""
+        with self._lock:
+            self.started_at = time.time()
+            self._stages = {}
+            self._values = {}
+            self._counters = {}
+
+    def timer(self, stage: str):
+        """Context manager yang mencatat durasi blok ke histogram tahap `stage`."""
+        return _Timer(self, stage) if self.enabled else _NULL_TIMER
+
+    def observe(self, stage: str, seconds: float):
+        """Mencatat satu durasi (detik) untuk tahap `stage`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram()
+            histogram.record(seconds)
+
+    def record(self, name: str, value: float):
+        """Mencatat satu nilai non-durasi (misalnya jumlah token prompt)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._values.get(name)
+            if histogram is None:
+                histogram = self._values[name] = Histogram()
+            histogram.record(value)
+
+    def incr(self, name: str, amount: int = 1):
+        """Menambah counter `name`."""
+        if not self.enabled or not amount:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict:
+        """
+        Ringkasan semua catatan.
+
+        Returns:
+            dict: {"stages": {tahap: count/mean/p50/p95/p99/max dalam ms,
+                   total_seconds}, "values": {...}, "counters": {...}}
+        """
+        with self._lock:
+            stages = {}
+            for stage, histogram in sorted(self._stages.items()):
+                stages[stage] = {**histogram.summary(scale=1000.0), "total_seconds": histogram.total}
+            values = {name: histogram.summary() for name, histogram in sorted(self._values.items())}
+            counters = dict(sorted(self._counters.items()))
+            started_at = self.started_at
+        return {
+            "started_at": started_at,
+            "elapsed_seconds": time.time() - started_at,
+            "stages": stages,
+            "values": values,
+            "counters": counters,
+        }
+
+    def dump(self, path: str):
+        """Menulis snapshot sebagai JSON secara atomik."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def format_snapshot(snapshot: dict) -> str:
+    """Tabel ringkas latensi per tahap dan counter untuk dicetak di akhir run."""
+    lines = [f"{'tahap':<28}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}"]
+    for stage, row in snapshot["stages"].items():
+        lines.append(f"{stage:<28}{row['count']:>8}{row['p50']:>10.2f}{row['p95']:>10.2f}"
+                     f"{row['p99']:>10.2f}{row['total_seconds']:>10.2f}")
+    for name, row in snapshot["values"].items():
+        lines.append(f"{name:<28}{row['count']:>8}{row['p50']:>10.0f}{row['p95']:>10.0f}{row['p99']:>10.0f}")
+    if snapshot["counters"]:
+        lines.append(", ".join(f"{name}={value}" for name, value in snapshot["counters"].items()))
+    return "\n".join(lines)
+
+
+telemetry = Telemetry(enabled=config.TELEMETRY_ENABLED)
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+
+
+def _clean_texts(texts) -> list:
+    return [text if isinstance(text, str) else '' for text in texts]
+
+
+class TextStore:
+    """
+    Kumpulan teks dalam satu buffer UTF-8 berurutan beserta array offset.
+
+    Teks ke-i adalah `data[offsets[i]:offsets[i + 1]]`. Jika disimpan di disk
+    (`<path>` untuk buffer dan `<path>.offsets.npy` untuk offset), buffer
+    dibuka memory-mapped sehingga hanya kalimat yang diakses yang dibaca dan
+    di-decode; overhead per kalimat hanya 8 byte offset, bukan objek str Python.
+    """
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, path: str = None):
+        self.data = data
+        self.offsets = offsets
+        self.path = path
+
+    @classmethod
+    def from_texts(cls, texts) -> "TextStore":
+        """Membuat store di memori dari daftar teks (nilai bukan str menjadi '')."""
+        encoded = [text.encode('utf-8') for text in _clean_texts(texts)]
+        lengths = np.fromiter((len(chunk) for chunk in encoded), dtype=np.int64, count=len(encoded))
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def extend(self, texts) -> "TextStore":
+        """
+        Mengembalikan store baru dengan teks tambahan di akhir.
+
+        Store di disk ditambah di tempat (append-only): byte lama dan view
+        memory-mapped milik store lama tidak berubah, offset baru baru ditulis
+        saat `save`.
+        """
+        addition = TextStore.from_texts(texts)
+        offsets = np.concatenate((self.offsets, addition.offsets[1:] + self.offsets[-1]))
+        if self.path is None:
+            return TextStore(np.concatenate((np.asarray(self.data, dtype=np.uint8), addition.data)), offsets)
+
+        with open(self.path, 'r+b') as f:
+            # Buang sisa tulisan yang tidak tercatat di offset (misalnya proses terhenti)
+            f.truncate(int(self.offsets[-1]))
+            f.seek(0, os.SEEK_END)
+            f.write(addition.data.tobytes())
+        return TextStore(_map_bytes(self.path), offsets, self.path)
+
+    def save(self, path: str):
+        """Menyimpan buffer (jika belum di `path`) dan offset secara atomik."""
+        if self.path != path:
+            with open(path + ".tmp", 'wb') as f:
+                f.write(np.asarray(self.data[:self.offsets[-1]], dtype=np.uint8).tobytes())
+            os.replace(path + ".tmp", path)
+        offsets_path = path + ".offsets.npy"
+        with open(offsets_path + ".tmp", 'wb') as f:
+            np.save(f, self.offsets)
+        os.replace(offsets_path + ".tmp", offsets_path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Membuka store dari disk, atau None jika file tidak ada atau terpotong."""
+        offsets_path = path + ".offsets.npy"
+        if not (os.path.exists(path) and os.path.exists(offsets_path)):
+            return None
+        offsets = np.load(offsets_path)
+        if len(offsets) == 0 or os.path.getsize(path) < offsets[-1]:
+            return None
+        return cls(_map_bytes(path), offsets, path)
+
+
+class TextStoreWriter:
+    """
+    Menulis TextStore ke disk secara bertahap, potongan demi potongan.
+
+    Teks langsung ditulis ke file sementara sehingga memori yang dipakai hanya
+    sebesar potongan yang sedang ditulis; `close` memindahkan file ke `path`.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path + ".tmp", 'wb')
+        self._offsets = [np.zeros(1, dtype=np.int64)]
+        self._size = 0
+
+    def write(self, texts):
+        chunk = TextStore.from_texts(texts)
+        self._file.write(chunk.data.tobytes())
+        self._offsets.append(chunk.offsets[1:] + self._size)
+        self._size += int(chunk.offsets[-1])
+
+    def close(self) -> TextStore:
+        self._file.close()
+        os.replace(self.path + ".tmp", self.path)
+        store = TextStore(_map_bytes(self.path), np.concatenate(self._offsets), self.path)
+        store.save(self.path)
+        return store
+
+
+def _map_bytes(path: str) -> np.ndarray:
+    """Memory-map file sebagai array uint8 (file kosong menjadi array kosong)."""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
@@ -0,0 +1,103 @@
+import numpy as np
+
+
+def char_trigrams(word: str) -> list:
+    """Trigram karakter unik dari `<kata>` (penanda batas ikut membentuk awalan dan akhiran)."""
+    padded = f"<{word}>"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(max(len(padded) - 2, 1))))
+
+
+def edit_similarity(a: str, b: str, min_similarity: float = 0.0) -> float:
+    """
+    Kemiripan ejaan: 1 - jarak Levenshtein / panjang kata terpanjang.
+
+    Perhitungan berhenti lebih awal (hasil 0.0) begitu kemiripan dipastikan
+    di bawah `min_similarity`, sehingga kandidat yang jauh murah ditolak.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    longest = max(len(a), len(b))
+    max_distance = int((1.0 - min_similarity) * longest + 1e-9)
+    if abs(len(a) - len(b)) > max_distance:
+        return 0.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return 0.0
+        previous = current
+    return 1.0 - previous[-1] / longest
+
+
+class TrigramIndex:
+    """
+    Indeks terbalik trigram karakter atas kosakata korpus untuk varian ejaan
+    (misalnya 'dibuatkan'/'dibuekan', 'tergolong'/'tagolong').
+
+    Postings trigram -> id kata disimpan dalam format CSR (`offsets`,
+    `word_ids`) seperti InvertedIndex. Kandidat sebuah kata dicari dengan
+    menghitung trigram yang sama lewat satu `np.unique` atas postings
+    trigramnya dan diberi skor Dice; shortlist teratas dapat diurutkan ulang
+    dengan jarak edit tanpa menyentuh encoder maupun seluruh kosakata.
+    """
+    def __init__(self, vocab_list: list):
+        self.vocab_list = vocab_list
+        self.trigram_ids = {}
+        trigrams = [char_trigrams(word) for word in vocab_list]
+        self.sizes = np.fromiter((len(grams) for grams in trigrams), dtype=np.int32, count=len(trigrams))
+        pair_trigrams = np.fromiter(
+            (self.trigram_ids.setdefault(gram, len(self.trigram_ids)) for grams in trigrams for gram in grams),
+            dtype=np.int32, count=int(self.sizes.sum())
+        )
+        pair_words = np.repeat(np.arange(len(vocab_list), dtype=np.int32), self.sizes)
+
+        order = np.argsort(pair_trigrams, kind='stable')
+        counts = np.bincount(pair_trigrams, minlength=len(self.trigram_ids))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.word_ids = pair_words[order]
+
+    def __len__(self):
+        return len(self.vocab_list)
+
+    def candidates(self, word: str, limit: int = 32):
+        """
+        Kata kosakata dengan trigram terbanyak yang sama dengan `word`.
+
+        Returns:
+            tuple: (id kata [<= limit], skor Dice [<= limit]) terurut menurun.
+        """
+        grams = char_trigrams(word)
+        known = [self.trigram_ids[gram] for gram in grams if gram in self.trigram_ids]
+        if not known:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        postings = np.concatenate([self.word_ids[self.offsets[g]:self.offsets[g + 1]] for g in known])
+        # Dihitung atas postings saja, bukan array sepanjang seluruh kosakata
+        ids, overlap = np.unique(postings, return_counts=True)
+        dice = (2.0 * overlap / (len(grams) + self.sizes[ids])).astype(np.float32)
+        if len(ids) > limit:
+            keep = np.argpartition(-dice, limit - 1)[:limit]
+            ids, dice = ids[keep], dice[keep]
+        order = np.argsort(-dice, kind='stable')
+        return ids[order].astype(np.int32), dice[order]
+
+    def best_match(self, word: str, limit: int = 32, min_similarity: float = 0.0):
+        """
+        Kandidat dengan ejaan paling mirip di antara shortlist trigram.
+
+        Returns:
+            tuple: (id kata, kemiripan edit), atau (-1, 0.0) jika tidak ada
+                kandidat dengan kemiripan >= `min_similarity`.
+        """
+        best_id, best_score = -1, 0.0
+        ids, _ = self.candidates(word, limit)
+        for word_id in ids.tolist():
+            # Kandidat berikutnya hanya perlu dihitung sampai terbukti tidak lebih baik
+            score = edit_similarity(word, self.vocab_list[word_id], max(min_similarity, best_score))
+            if score > best_score and score >= min_similarity:
+                best_id, best_score = word_id, score
+        return best_id, best_score
@@ -1,30 +1,255 @@
-def generate_translation_prompt(original_query: str, retrieved_data_list: list) -> str:
+import re
+
+from src.telemetry import telemetry
+
+PROMPT_CONTEXT_HEADER = "Here is information related to Indonesian words with example sentences in Indonesian and Minangkabau:\n\n"
+PROMPT_TASK_TEMPLATE = """Your Task:
+1. Note that the given words are in Indonesian.
+2. Each word has an example sentence in Indonesian and its translation in Minangkabau.
+3. Translate the following Indonesian sentence: "{original_query}" into Minangkabau.
+
+Provide only the translated sentence as the output, without any additional text or formatting:
+"""
+BATCH_PROMPT_TASK_TEMPLATE = """Your Task:
+1. Note that the given words are in Indonesian.
+2. Each word has an example sentence in Indonesian and its translation in Minangkabau.
+3. Translate each of the following {count} numbered Indonesian sentences into Minangkabau:
+
+{numbered_queries}
+
+Answer with exactly {count} lines in the form "<number>. <translation>", in the same order as above, without any additional text or formatting:
+"""
+NUMBERED_LINE_PATTERN = re.compile(r'^\s*(?:\*\*)?(\d+)(?:\*\*)?\s*[.):](?:\*\*)?\s*(.*?)\s*$')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in a text (about 4 characters per token).
+
+    Args:
+        text (str): The text to measure.
+
+    Returns:
+        int: The approximate token count.
+    """
+    return _tokens_for_length(len(text)) if text else 0
+
+
+def _tokens_for_length(length: int) -> int:
+    """Token estimate for a text of `length` characters (see `estimate_tokens`)."""
+    return max(1, length // 4) if length else 0
+
+
+def _clean_word(word: str) -> str:
+    return re.sub(r'[^\w\s]', '', word.lower())
+
+
+def _window(words: list, center: int, max_words: int) -> str:
+    """Returns `max_words` words around position `center`, marking cut ends with '...'."""
+    start = max(0, min(center - max_words // 2, len(words) - max_words))
+    end = start + max_words
+    return ("... " if start > 0 else "") + " ".join(words[start:end]) + (" ..." if end < len(words) else "")
+
+
+def truncate_example(pair: dict, anchor_word: str, max_words: int):
+    """
+    Shortens a long example pair to a window around the matched word.
+
+    The Indonesian side is centred on the first occurrence of `anchor_word`;
+    the Minangkabau side has no word alignment, so the window is placed at
+    the same relative position in the sentence.
+
+    Returns:
+        tuple: (pair, truncated) where `truncated` tells whether anything was cut.
+    """
+    indonesian = pair['indonesian'].split()
+    minangkabau = pair['minangkabau'].split()
+    if not max_words or (len(indonesian) <= max_words and len(minangkabau) <= max_words):
+        return pair, False
+
+    cleaned = [_clean_word(word) for word in indonesian]
+    center = cleaned.index(anchor_word) if anchor_word in cleaned else len(indonesian) // 2
+    relative = center / max(len(indonesian), 1)
+    return {
+        "indonesian": _window(indonesian, center, max_words),
+        "minangkabau": _window(minangkabau, int(relative * len(minangkabau)), max_words),
+    }, True
+
+
+def _collect_example_blocks(retrieved_data_list: list, rank_by_score: bool = True) -> list:
+    """
+    Groups example pairs by sentence so that each pair appears once.
+
+    With `rank_by_score`, words are visited from the highest similarity score
+    down, otherwise in input order; each word's first example is placed before
+    anyone's second example, so a tight token budget still covers as many
+    words as possible.
+    """
+    ranked = list(enumerate(retrieved_data_list))
+    if rank_by_score:
+        ranked.sort(key=lambda entry: (-entry[1].get('similarity_score', 0.0), entry[0]))
+    examples_per_item = [item.get('examples') or [item['retrieved_example']] for _, item in ranked]
+
+    blocks = {}
+    for rank in range(max((len(examples) for examples in examples_per_item), default=0)):
+        for (_, item), examples in zip(ranked, examples_per_item):
+            if rank >= len(examples):
+                continue
+            pair = examples[rank]
+            block = blocks.get(pair['indonesian'])
+            if block is None:
+                blocks[pair['indonesian']] = {
+                    "words": [item['original_query_word']],
+                    "anchor": item.get('found_word_in_corpus', item['original_query_word']),
+                    "pair": pair,
+                }
+            elif item['original_query_word'] not in block["words"]:
+                block["words"].append(item['original_query_word'])
+    return list(blocks.values())
+
+
+def _render_block(words: list, pair: dict) -> str:
+    label = "word" if len(words) == 1 else "words"
+    quoted = ", ".join(f'"{word}"' for word in words)
+    return (
+        f"- For the {label} {quoted}:\n"
+        f"  - Example Sentence (Indonesian): \"{pair['indonesian']}\"\n"
+        f"  - Example Sentence (Minangkabau): \"{pair['minangkabau']}\"\n\n"
+    )
+
+
+def build_translation_prompt(original_query: str, retrieved_data_list: list,
+                             max_tokens: int = None, max_example_words: int = None):
+    """
+    Builds a translation prompt with deduplicated, ranked, budgeted examples.
+
+    Each distinct example pair is emitted once, listing every query word it
+    illustrates. With a budget, examples are added in order of similarity
+    score until the estimated prompt size would exceed `max_tokens`; without
+    one, the retriever's word order is kept. Long sentences are cut to
+    `max_example_words` words around the matched word.
+
+    With no budget, no cut, one example per word and no shared examples, the
+    prompt is byte-identical to the original per-word prompt.
+
+    Args:
+        original_query (str): The original query from the user.
+        retrieved_data_list (list): The list of results returned by the retriever.
+        max_tokens (int): Token budget for the whole prompt (None = unlimited).
+        max_example_words (int): Maximum words kept per example sentence (None = no cut).
+
+    Returns:
+        tuple: (prompt, stats) where stats holds "prompt_tokens",
+            "examples_used", "examples_dropped" and "examples_truncated".
+    """
+    stats = {"prompt_tokens": 0, "examples_used": 0, "examples_dropped": 0, "examples_truncated": 0}
+    if not retrieved_data_list:
+        prompt = f"No relevant information was found for the query: \"{original_query}\". Please try another query or check the database."
+        stats["prompt_tokens"] = estimate_tokens(prompt)
+        return prompt, stats
+
+    task = PROMPT_TASK_TEMPLATE.format(original_query=original_query)
+    return _assemble_prompt(task, retrieved_data_list, stats, max_tokens, max_example_words)
+
+
+def _assemble_prompt(task: str, retrieved_data_list: list, stats: dict,
+                     max_tokens: int = None, max_example_words: int = None):
+    """Adds deduplicated example blocks within the budget, then appends the task text."""
+    def render(blocks):
+        return f"""
+{PROMPT_CONTEXT_HEADER + "".join(blocks)}
+{task}"""
+
+    with telemetry.timer("prompt.build"):
+        rendered = []
+        # Running length of the prompt so far: each candidate only adds its own
+        # characters. Estimating on the total length (not summing per-block
+        # estimates, each rounded down) keeps the whole prompt within budget.
+        prompt_length = len(render([]))
+        # Ranking only matters when examples can be dropped; without a budget
+        # the retriever's word order is kept
+        for block in _collect_example_blocks(retrieved_data_list, rank_by_score=max_tokens is not None):
+            pair, truncated = truncate_example(block["pair"], block["anchor"], max_example_words)
+            text = _render_block(block["words"], pair)
+            if max_tokens is not None and _tokens_for_length(prompt_length + len(text)) > max_tokens:
+                stats["examples_dropped"] += 1
+                continue
+            rendered.append(text)
+            prompt_length += len(text)
+            stats["examples_used"] += 1
+            stats["examples_truncated"] += int(truncated)
+
+        prompt = render(rendered)
+        stats["prompt_tokens"] = estimate_tokens(prompt)
+    telemetry.record("prompt.tokens", stats["prompt_tokens"])
+    telemetry.incr("prompt.examples_dropped", stats["examples_dropped"])
+    telemetry.incr("prompt.examples_truncated", stats["examples_truncated"])
+    return prompt, stats
+
+
+def generate_translation_prompt(original_query: str, retrieved_data_list: list,
+                                max_tokens: int = None, max_example_words: int = None) -> str:
     """
     Formats a prompt for an LLM based on the retrieved data.
 
     Args:
         original_query (str): The original query from the user.
         retrieved_data_list (list): The list of results returned by the retriever.
+        max_tokens (int): Token budget for the whole prompt (None = unlimited).
+        max_example_words (int): Maximum words kept per example sentence (None = no cut).
 
     Returns:
         str: A prompt string ready to be used by an LLM.
     """
-    if not retrieved_data_list:
-        return f"No relevant information was found for the query: \"{original_query}\". Please try another query or check the database."
+    return build_translation_prompt(original_query, retrieved_data_list, max_tokens, max_example_words)[0]
 
-    context_str = "Here is information related to Indonesian words with example sentences in Indonesian and Minangkabau:\n\n"
-    for item in retrieved_data_list:
-        context_str += f"- For the word \"{item['original_query_word']}\":\n"
-        context_str += f"  - Example Sentence (Indonesian): \"{item['retrieved_example']['indonesian']}\"\n"
-        context_str += f"  - Example Sentence (Minangkabau): \"{item['retrieved_example']['minangkabau']}\"\n\n"
 
-    prompt = f"""
-{context_str}
-Your Task:
-1. Note that the given words are in Indonesian.
-2. Each word has an example sentence in Indonesian and its translation in Minangkabau.
-3. Translate the following Indonesian sentence: "{original_query}" into Minangkabau.
+def build_batch_translation_prompt(queries: list, retrieved_data_lists: list,
+                                   max_tokens: int = None, max_example_words: int = None):
+    """
+    Builds one numbered prompt that translates several sentences at once.
 
-Provide only the translated sentence as the output, without any additional text or formatting:
-"""
-    return prompt
\ No newline at end of file
+    The retrieval context of all sentences is merged before deduplication,
+    so an example shared by several sentences is only sent once and the
+    instruction text is paid once per request instead of once per sentence.
+
+    Args:
+        queries (list): The Indonesian sentences, in output order.
+        retrieved_data_lists (list): One retriever result list per sentence.
+        max_tokens (int): Token budget for the whole prompt (None = unlimited).
+        max_example_words (int): Maximum words kept per example sentence (None = no cut).
+
+    Returns:
+        tuple: (prompt, stats) with the same stats keys as `build_translation_prompt`.
+    """
+    stats = {"prompt_tokens": 0, "examples_used": 0, "examples_dropped": 0, "examples_truncated": 0}
+    numbered_queries = "\n".join(f'{number}. "{query}"' for number, query in enumerate(queries, start=1))
+    task = BATCH_PROMPT_TASK_TEMPLATE.format(count=len(queries), numbered_queries=numbered_queries)
+    merged = [item for retrieved_data_list in retrieved_data_lists for item in retrieved_data_list]
+    return _assemble_prompt(task, merged, stats, max_tokens, max_example_words)
+
+
+def parse_numbered_translations(text: str, count: int) -> list:
+    """
+    Parses a numbered answer ("1. ...", "2) ...") back into one entry per sentence.
+
+    Returns:
+        list: `count` translations in order; None for any number that is
+            missing, repeated, or empty so the caller can retry it alone.
+    """
+    translations = [None] * count
+    seen = set()
+    for line in (text or "").splitlines():
+        match = NUMBERED_LINE_PATTERN.match(line)
+        if not match:
+            continue
+        number = int(match.group(1))
+        if not 1 <= number <= count:
+            continue
+        if number in seen:
+            translations[number - 1] = None
+            continue
+        seen.add(number)
+        translation = match.group(2).strip().strip('"').strip()
+        translations[number - 1] = translation or None
+    return translations
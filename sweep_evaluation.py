@@ -0,0 +1,321 @@
+"""
+Mode sweep parameter: membandingkan beberapa ambang similaritas dan model LLM
+dalam satu run tanpa mengulang pekerjaan yang sama.
+
+    1. Kata query di-encode dan dicocokkan ke kosakata korpus sekali; setiap
+       ambang hanya menyaring kata yang diterima (SemanticRetriever.retrieve_sweep).
+    2. Prompt dibuat per hasil retrieval yang berbeda, lalu hanya pasangan
+       (model, prompt) yang unik di seluruh sweep yang dikirim ke LLM.
+    3. Pasangan (referensi, terjemahan) yang unik dinilai sekali secara paralel
+       dan skornya dibagikan ke setiap konfigurasi.
+
+Hasil per konfigurasi ditulis ke results/sweep/<model>_t<ambang>.csv dan tabel
+perbandingan ke results/sweep/summary.csv.
+
+Jalankan dari root repositori:
+    python sweep_evaluation.py [--thresholds 0.3:0.75:0.05] [--models a,b] [--rows 200]
+"""
+import argparse
+import asyncio
+import csv
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+import batch_process
+import config
+from score_results import DEFAULT_METRICS, _nan_stats, score_pairs
+from src.evaluation_metrics import Evaluator
+from src.llm_handler import CachedLLMClient, OpenRouterClient, get_default_client
+from src.result_writer import CSV_LINE_TERMINATOR, ERROR_TRANSLATION, RESULT_COLUMNS
+from src.retriever import SemanticRetriever
+from src.telemetry import format_snapshot, telemetry
+from src.utils import build_translation_prompt, estimate_tokens
+
+# --- KONFIGURASI ---
+SWEEP_DIR = os.path.join('results', 'sweep')
+SUMMARY_FILE_NAME = 'summary.csv'
+# Sepuluh titik ambang di sekitar config.SIMILARITY_THRESHOLD
+DEFAULT_THRESHOLDS = tuple(round(0.3 + 0.05 * i, 2) for i in range(10))
+
+
+def parse_thresholds(text: str) -> list:
+    """Mengurai daftar ambang "0.3,0.4,0.5" atau rentang "awal:akhir:langkah" (akhir inklusif)."""
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + step * i, 4) for i in range(count)]
+    return [float(part) for part in text.split(',') if part.strip()]
+
+
+def create_clients(models: list) -> dict:
+    """
+    Satu klien LLM per model. Klien bawaan dipakai ulang untuk model default;
+    model lain berbagi API key dan cache respons yang sama.
+    """
+    default_client = get_default_client()
+    if default_client is None:
+        return None
+    clients = {}
+    for model in models:
+        if model == default_client.model:
+            clients[model] = default_client
+            continue
+        client = OpenRouterClient(os.getenv(config.OPENROUTER_API_KEY_ENV), model=model)
+        if isinstance(default_client, CachedLLMClient):
+            client = CachedLLMClient(client, default_client.cache)
+        clients[model] = client
+    return clients
+
+
+def retrieve_all(df_test, retriever: SemanticRetriever, thresholds: list) -> list:
+    """Hasil retrieval setiap baris untuk semua ambang (per baris, sesuai urutan `thresholds`)."""
+    sweep = []
+    queries = df_test['indonesian'].tolist()
+    for start in tqdm(range(0, len(queries), batch_process.RETRIEVAL_BATCH_SIZE), desc="Retrieval"):
+        sweep.extend(retriever.retrieve_sweep(queries[start:start + batch_process.RETRIEVAL_BATCH_SIZE], thresholds))
+    return sweep
+
+
+def build_prompts(queries: list, sweep: list) -> list:
+    """
+    Membuat prompt setiap baris untuk setiap ambang; ambang yang berbagi hasil
+    retrieval juga berbagi prompt yang sama.
+
+    Returns:
+        list: Per baris, daftar (prompt, token prompt, perkiraan token) per ambang.
+    """
+    prompts = []
+    for query, results in zip(queries, sweep):
+        by_result = {}
+        row = []
+        for hasil_pencarian in results:
+            key = id(hasil_pencarian)
+            if key not in by_result:
+                prompt_final, prompt_stats = build_translation_prompt(
+                    query, batch_process._prompt_items(hasil_pencarian),
+                    max_tokens=config.PROMPT_TOKEN_BUDGET, max_example_words=config.PROMPT_MAX_EXAMPLE_WORDS
+                )
+                prompt_tokens = prompt_stats["prompt_tokens"]
+                by_result[key] = (prompt_final, prompt_tokens, prompt_tokens + 2 * estimate_tokens(query))
+            row.append(by_result[key])
+        prompts.append(row)
+    return prompts
+
+
+async def translate_distinct(jobs: dict, clients: dict, rate_limiter) -> dict:
+    """
+    Mengirim setiap pasangan (model, prompt) unik sekali ke LLM.
+
+    Args:
+        jobs (dict): {(model, prompt): perkiraan token}
+
+    Returns:
+        dict: {(model, prompt): terjemahan}
+    """
+    semaphore = asyncio.Semaphore(batch_process.MAX_CONCURRENT_REQUESTS)
+    executor = ThreadPoolExecutor(max_workers=batch_process.MAX_CONCURRENT_REQUESTS)
+    progress = tqdm(total=len(jobs), desc="Menerjemahkan prompt unik")
+
+    async def translate(number, model, prompt_final, estimated_tokens):
+        terjemahan = await batch_process.request_translation(
+            f"prompt {number} ({model})", prompt_final, estimated_tokens,
+            clients[model], rate_limiter, semaphore, executor
+        )
+        progress.update(1)
+        return terjemahan if terjemahan is not None else ERROR_TRANSLATION
+
+    try:
+        translations = await asyncio.gather(*(
+            translate(number, model, prompt_final, estimated_tokens)
+            for number, ((model, prompt_final), estimated_tokens) in enumerate(jobs.items())
+        ))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        progress.close()
+    return dict(zip(jobs, translations))
+
+
+def score_configurations(configs: dict, references: list, metrics, workers: int = None) -> dict:
+    """
+    Menilai semua konfigurasi sekaligus.
+
+    Pasangan (referensi, terjemahan) yang unik di seluruh konfigurasi dinilai
+    sekali di pool proses; skor tingkat korpus dihitung per konfigurasi.
+
+    Args:
+        configs (dict): {(model, ambang): [terjemahan per baris]}
+
+    Returns:
+        dict: {(model, ambang): {"sentences", "means", "corpus"}}
+    """
+    unique_pairs = list(dict.fromkeys(
+        (reference, terjemahan)
+        for translations in configs.values()
+        for reference, terjemahan in zip(references, translations)
+    ))
+    print(f"Menilai {len(unique_pairs)} pasangan unik dari {len(configs) * len(references)} baris...")
+    pair_scores = score_pairs([pair[0] for pair in unique_pairs], [pair[1] for pair in unique_pairs],
+                              metrics, workers=workers)
+    position = {pair: i for i, pair in enumerate(unique_pairs)}
+
+    evaluator = Evaluator(metrics)
+    scored = {}
+    for key, translations in configs.items():
+        rows = [position[pair] for pair in zip(references, translations)]
+        sentences = {column: [values[i] for i in rows] for column, values in pair_scores.items()}
+        scored[key] = {
+            "sentences": sentences,
+            "means": {column: _nan_stats(values)[1] for column, values in sentences.items()},
+            "corpus": evaluator.corpus_score(references, translations),
+        }
+    return scored
+
+
+def _config_file_name(model: str, threshold: float) -> str:
+    return f"{re.sub(r'[^A-Za-z0-9.]+', '-', model)}_t{threshold:g}.csv"
+
+
+def write_config_results(path: str, df_test, translations: list, prompt_tokens: list, sentences: dict):
+    """Menulis hasil satu konfigurasi dengan kolom yang sama seperti result.csv."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore', lineterminator=CSV_LINE_TERMINATOR)
+        writer.writeheader()
+        for i, (index, row) in enumerate(df_test.iterrows()):
+            writer.writerow({
+                'row_index': index,
+                'indonesia': row['indonesian'],
+                'minang_ground_truth': row['minangkabau'],
+                'hasil_terjemahan': translations[i],
+                'prompt_tokens': prompt_tokens[i],
+                **{column: values[i] for column, values in sentences.items()},
+            })
+
+
+def format_table(summary_rows: list, columns: list) -> str:
+    """Tabel perbandingan konfigurasi untuk dicetak."""
+    header = f"{'model':<36}{'ambang':>8}{'prompt unik':>13}{'token':>8}" + "".join(f"{column:>14}" for column in columns)
+    lines = [header]
+    for row in summary_rows:
+        lines.append(f"{row['model'][:35]:<36}{row['threshold']:>8.2f}{row['unique_prompts']:>13}"
+                     f"{row['mean_prompt_tokens']:>8.0f}"
+                     + "".join(f"{row[column]:>14.4f}" for column in columns))
+    return "\n".join(lines)
+
+
+def run_sweep(df_test, retriever: SemanticRetriever, clients: dict, thresholds: list, rate_limiter,
+              metrics=DEFAULT_METRICS, workers: int = None, output_dir: str = SWEEP_DIR) -> list:
+    """
+    Menjalankan sweep ambang x model dan mengembalikan baris tabel perbandingan.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    models = list(clients)
+    queries = df_test['indonesian'].tolist()
+    references = df_test['minangkabau'].tolist()
+
+    # 1. Retrieval sekali untuk semua ambang
+    sweep = retrieve_all(df_test, retriever, thresholds)
+
+    # 2. Prompt per ambang, lalu hanya pasangan (model, prompt) unik yang dikirim
+    prompts = build_prompts(queries, sweep)
+    jobs = {}
+    for row in prompts:
+        for prompt_final, _, estimated_tokens in row:
+            for model in models:
+                jobs.setdefault((model, prompt_final), estimated_tokens)
+    total_requests = len(queries) * len(thresholds) * len(models)
+    print(f"{len(jobs)} permintaan LLM unik dari {total_requests} kombinasi baris x konfigurasi.")
+    translations = asyncio.run(translate_distinct(jobs, clients, rate_limiter))
+
+    configs = {}
+    for model in models:
+        for t, threshold in enumerate(thresholds):
+            configs[(model, threshold)] = [translations[(model, row[t][0])] for row in prompts]
+
+    # 3. Skor semua konfigurasi sekaligus
+    with telemetry.timer("pipeline.score_results"):
+        scored = score_configurations(configs, references, metrics, workers=workers)
+
+    summary_rows = []
+    for (model, threshold), result in scored.items():
+        t = thresholds.index(threshold)
+        prompt_tokens = [row[t][1] for row in prompts]
+        write_config_results(os.path.join(output_dir, _config_file_name(model, threshold)),
+                             df_test, configs[(model, threshold)], prompt_tokens, result["sentences"])
+        summary_rows.append({
+            'model': model,
+            'threshold': threshold,
+            'unique_prompts': len({row[t][0] for row in prompts}),
+            'mean_prompt_tokens': sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else 0.0,
+            **result["means"],
+            **{f"corpus_{name}": value for name, value in result["corpus"].items()},
+        })
+
+    with open(os.path.join(output_dir, SUMMARY_FILE_NAME), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(summary_rows[0]) if summary_rows else [], lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(summary_rows)
+    return summary_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep ambang similaritas dan model LLM dalam satu run.")
+    parser.add_argument("--thresholds", default=",".join(f"{t:g}" for t in DEFAULT_THRESHOLDS),
+                        help="Daftar ambang dipisah koma, atau rentang awal:akhir:langkah")
+    parser.add_argument("--models", default=config.LLM_MODEL, help="Daftar model LLM dipisah koma")
+    parser.add_argument("--test-data", default=batch_process.TEST_DATA_PATH, help="File CSV uji")
+    parser.add_argument("--rows", type=int, default=None, help="Batasi jumlah baris uji")
+    parser.add_argument("--metrics", default=",".join(DEFAULT_METRICS), help="Metrik skor, dipisah koma")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses worker skor")
+    parser.add_argument("--output-dir", default=SWEEP_DIR, help="Direktori hasil sweep")
+    args = parser.parse_args()
+
+    load_dotenv()
+    thresholds = parse_thresholds(args.thresholds)
+    models = [model.strip() for model in args.models.split(",") if model.strip()]
+    metrics = tuple(metric.strip() for metric in args.metrics.split(",") if metric.strip())
+
+    clients = create_clients(models)
+    if clients is None:
+        print(f"API Key untuk OpenRouter tidak ditemukan. Pastikan variabel lingkungan '{config.OPENROUTER_API_KEY_ENV}' telah diatur.")
+        return
+
+    retriever = SemanticRetriever(
+        model_name=config.MODEL_NAME,
+        csv_file_path=config.CSV_FILE_PATH,
+        use_ann_index=config.USE_ANN_INDEX,
+        ann_n_lists=config.ANN_N_LISTS,
+        ann_n_probe=config.ANN_N_PROBE,
+        embedding_precision=config.EMBEDDING_PRECISION,
+        examples_per_word=config.EXAMPLES_PER_WORD,
+        trigram_mode=config.TRIGRAM_MODE,
+        trigram_shortlist=config.TRIGRAM_SHORTLIST,
+        trigram_min_similarity=config.TRIGRAM_MIN_SIMILARITY
+    )
+    df_test = pd.read_csv(args.test_data)
+    if args.rows:
+        df_test = df_test.head(args.rows)
+    print(f"Sweep {len(thresholds)} ambang x {len(models)} model atas {len(df_test)} baris dari '{args.test_data}'.")
+
+    telemetry.reset()
+    rate_limiter = batch_process.create_rate_limiter()
+    summary_rows = run_sweep(df_test, retriever, clients, thresholds, rate_limiter,
+                             metrics=metrics, workers=args.workers, output_dir=args.output_dir)
+    if not summary_rows:
+        print("Tidak ada baris uji untuk dievaluasi.")
+        return
+
+    columns = [column for column in summary_rows[0] if column.endswith('_score') or column.startswith('corpus_')]
+    print("\n" + format_table(summary_rows, columns))
+    print(f"\nHasil per konfigurasi dan tabel perbandingan tersimpan di: {args.output_dir}")
+    print(f"Statistik penjadwal LLM: {rate_limiter.stats()}")
+    if telemetry.enabled:
+        print(f"\nTelemetri run:\n{format_snapshot(telemetry.snapshot())}")
+
+
+if __name__ == "__main__":
+    main()